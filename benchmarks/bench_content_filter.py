@@ -0,0 +1,52 @@
+"""Micro-benchmark for the outgoing message filter.
+
+Compares the previous per-phrase ``content.lower()`` loop against the
+precomputed matcher in utils.content_filter on 2000-character messages,
+the largest content TextChannel.send can carry.
+
+Run from the repository root:
+    python -m benchmarks.bench_content_filter
+"""
+import random
+import string
+import timeit
+
+from utils.content_filter import FORBIDDEN_PHRASES, find_forbidden_phrase
+
+MESSAGE_LENGTH = 2000
+ROUNDS = 5
+NUMBER = 2000
+
+def legacy_filter(content):
+    """The filter as it was: lowercase the whole message once per phrase"""
+    for phrase in FORBIDDEN_PHRASES:
+        if phrase.lower() in content.lower():
+            return phrase
+    return None
+
+def make_messages():
+    rng = random.Random(1)
+    words = ("the quick brown fox jumps over a lazy dog while the server channel "
+             "gets a new message about power energy peak stars and waves").split()
+    prose = " ".join(rng.choice(words) for _ in range(MESSAGE_LENGTH))[:MESSAGE_LENGTH]
+    noise = "".join(rng.choice(string.ascii_letters + " ") for _ in range(MESSAGE_LENGTH))
+    late_hit = prose[:MESSAGE_LENGTH - len("HYPE TRAIN")] + "HYPE TRAIN"
+    return {
+        "clean prose": prose,
+        "clean random letters": noise,
+        "phrase at the end": late_hit,
+    }
+
+def best_of(func, content):
+    return min(timeit.repeat(lambda: func(content), repeat=ROUNDS, number=NUMBER)) / NUMBER
+
+def main():
+    print(f"{'message':<24}{'legacy':>12}{'matcher':>12}{'speedup':>10}")
+    for name, content in make_messages().items():
+        assert (legacy_filter(content) is None) == (find_forbidden_phrase(content) is None)
+        legacy = best_of(legacy_filter, content)
+        compiled = best_of(find_forbidden_phrase, content)
+        print(f"{name:<24}{legacy * 1e6:>10.1f}us{compiled * 1e6:>10.1f}us{legacy / compiled:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
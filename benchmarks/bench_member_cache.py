@@ -0,0 +1,137 @@
+"""Memory benchmark for the gateway capability profile.
+
+Builds discord.py's connection state for one synthetic 100k-member guild
+and reports the process RSS it adds under three client configurations:
+
+- legacy: Intents.all() with the default member cache, every guild
+  chunked at startup with presences, and a 10k message cache
+- declared: the profile utils.capabilities derives from EXTENSIONS
+- declared, chunked: the same after a feature loads the member list on
+  demand (guild.chunk()), still without presences or cached messages
+
+Each configuration runs in its own interpreter so freed memory from one
+does not hide the cost of the next. Member lists arrive in 1000-member
+chunks like the gateway sends them.
+
+Run from the repository root:
+    python -m benchmarks.bench_member_cache
+"""
+import gc
+import subprocess
+import sys
+
+import discord
+import psutil
+from discord.presences import RawPresenceUpdateEvent
+from discord.state import ConnectionState
+
+from config.settings import EXTENSIONS
+from utils.activity import ActivityCounters
+from utils.capabilities import CapabilityProfile, declared_capabilities
+from utils.guild_snapshots import GuildSnapshotService
+from utils.role_jobs import RoleJobQueue
+
+MEMBERS = 100_000
+CHUNK_SIZE = 1000
+MESSAGES = 10_000
+GUILD_ID = 1 << 22
+CHANNEL_ID = GUILD_ID + 1
+SCENARIOS = ('legacy', 'declared', 'declared, chunked')
+
+def legacy_options():
+    return {
+        'intents': discord.Intents.all(),
+        'chunk_guilds_at_startup': True,
+        'max_messages': MESSAGES
+    }
+
+def declared_options():
+    declarations = declared_capabilities(EXTENSIONS, (GuildSnapshotService, ActivityCounters, RoleJobQueue))
+    return CapabilityProfile(declarations).client_options()
+
+def user_payload(user_id):
+    return {'id': str(user_id), 'username': f'member{user_id}', 'discriminator': '0',
+            'global_name': f'Member {user_id}', 'avatar': None}
+
+def member_payload(user_id):
+    return {'user': user_payload(user_id), 'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00',
+            'deaf': False, 'mute': False, 'flags': 0}
+
+def presence_payload(user_id):
+    return {'user': {'id': str(user_id)}, 'status': 'online', 'client_status': {'desktop': 'online'},
+            'activities': [{'name': 'A synthetic game', 'type': 0, 'created_at': 0}]}
+
+def guild_payload():
+    # A large guild's GUILD_CREATE carries no member list; it arrives in chunks
+    return {
+        'id': str(GUILD_ID), 'name': 'Synthetic', 'member_count': MEMBERS, 'large': True,
+        'owner_id': str(GUILD_ID + 2), 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [{'id': str(CHANNEL_ID), 'type': 0, 'name': 'general', 'position': 0,
+                      'permission_overwrites': []}],
+        'members': [], 'presences': []
+    }
+
+def message_payload(message_id, user_id):
+    return {
+        'id': str(message_id), 'channel_id': str(CHANNEL_ID), 'guild_id': str(GUILD_ID),
+        'author': user_payload(user_id), 'content': 'x' * 120, 'timestamp': '2024-01-01T00:00:00+00:00',
+        'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+        'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0
+    }
+
+def populate(scenario, options):
+    """Feed the guild through a connection state configured with ``options``"""
+    state = ConnectionState(dispatch=lambda *args: None, handlers={}, hooks={}, http=None, **options)
+    guild = discord.Guild(data=guild_payload(), state=state)
+    state._add_guild(guild)
+
+    chunked = state._chunk_guilds or scenario == 'declared, chunked'
+    if chunked:
+        for start in range(0, MEMBERS, CHUNK_SIZE):
+            user_ids = range(GUILD_ID + 10 + start, GUILD_ID + 10 + start + CHUNK_SIZE)
+            for user_id in user_ids:
+                guild._add_member(discord.Member(data=member_payload(user_id), guild=guild, state=state))
+            # Presences only come with chunks when the intent is on
+            if state._intents.presences:
+                for user_id in user_ids:
+                    presence = RawPresenceUpdateEvent(data=presence_payload(user_id), state=state)
+                    guild.get_member(user_id)._presence_update(presence, ())
+
+    if state._messages is not None:
+        channel = guild.get_channel(CHANNEL_ID)
+        for index in range(MESSAGES):
+            data = message_payload(CHANNEL_ID + 1 + index, GUILD_ID + 10 + index % MEMBERS)
+            state._messages.append(discord.Message(state=state, channel=channel, data=data))
+    return state, guild
+
+def measure(scenario):
+    # Resolved first; reading the declarations imports every cog
+    options = legacy_options() if scenario == 'legacy' else declared_options()
+    process = psutil.Process()
+    gc.collect()
+    before = process.memory_info().rss
+    state, guild = populate(scenario, options)
+    gc.collect()
+    after = process.memory_info().rss
+    cached = len(guild._members)
+    print(f"{after - before} {cached} {len(state._messages or ())} {state._intents.value}")
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--scenario':
+        measure(sys.argv[2])
+        return
+
+    print(f"{MEMBERS:,}-member guild")
+    print(f"{'profile':<20}{'intents':>10}{'members':>10}{'messages':>10}{'RSS added':>12}")
+    for scenario in SCENARIOS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_member_cache', '--scenario', scenario],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        added, members, messages, intents = map(int, output[-4:])
+        print(f"{scenario:<20}{intents:>10}{members:>10,}{messages:>10,}{added / 1024 / 1024:>10.1f}MB")
+
+if __name__ == "__main__":
+    main()
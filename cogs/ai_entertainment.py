@@ -1,18 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import openai
 import random
-import os
 from datetime import datetime, timezone
+from config.settings import AI_SETTINGS
+from utils.llm import get_llm_client
 
 class AIEntertainment(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.llm = get_llm_client()
 
-    async def get_ai_response(self, prompt: str, persona: str = None, user_context: str = None) -> str:
-        """Get AI response with optional persona and context"""
+    async def get_ai_response(self, prompt: str, persona: str = None, user_context: str = None, cache_ttl: float = None) -> str:
+        """Get AI response with optional persona and context; ``cache_ttl`` lets identical prompts reuse a response"""
         try:
             personas = {
                 'wizard': 'You are Merlin, a wise ancient wizard. Speak mystically with magical wisdom.',
@@ -31,13 +31,14 @@ class AIEntertainment(commands.Cog):
             
             messages.append({"role": "user", "content": prompt})
             
-            response = self.openai_client.chat.completions.create(
+            response = await self.llm.chat(
+                messages,
                 model="gpt-4o",
-                messages=messages,
                 max_tokens=500,
-                temperature=0.8
+                temperature=0.8,
+                cache_ttl=cache_ttl
             )
-            return response.choices[0].message.content
+            return response
         except Exception as e:
             return f"AI temporarily unavailable. Please try again later."
 
@@ -94,7 +95,10 @@ class AIEntertainment(commands.Cog):
             "horror": "Begin a thrilling horror story with suspense and mystery. Keep it spooky but not too graphic. End with options."
         }
         
-        story = await self.get_ai_response(story_prompts.get(genre, "Start an exciting interactive story."))
+        story = await self.get_ai_response(
+            story_prompts.get(genre, "Start an exciting interactive story."),
+            cache_ttl=AI_SETTINGS['response_cache_ttl']
+        )
         
         embed = discord.Embed(
             title=f"📖 {genre.title()} Story",
@@ -1,41 +1,231 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import openai
-import os
 import asyncio
-import aiosqlite
-from typing import Dict, List
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config.settings import AI_SETTINGS
+from utils.batching import WriteBehindBuffer
+from utils.llm import get_llm_client, message_tokens
 
 class AIConversationManager:
-    def __init__(self, max_context_length: int = 8):
-        self.conversations: Dict[str, List[Dict]] = {}
-        self.max_context_length = max_context_length
+    """Per user and channel conversation memory with bounded size.
 
-    def get_conversation(self, user_id: int, channel_id: int) -> List[Dict]:
-        key = f"{user_id}_{channel_id}"
-        return self.conversations.get(key, [])
+    Each conversation keeps the newest turns that fit ``context_tokens``
+    (estimated locally); with a ``summarizer`` the turns that fall out of
+    that window are folded into a running summary sent ahead of them.
+    Conversations are kept in least-recently-used order and forgotten
+    after ``idle_ttl`` seconds without use. When the text held in memory
+    exceeds ``memory_budget`` bytes the least recently used ones are
+    evicted, and with a ``spill_storage`` repository they are written to
+    SQLite and read back on their next use instead of being lost.
+    """
+
+    def __init__(self, context_tokens: int = 3000, idle_ttl: float = 3600,
+                 memory_budget: int = 4 * 1024 * 1024, spill_storage=None, summarizer=None):
+        # (user_id, channel_id) -> {"messages", "tokens", "summary", "unsummarized", "size", "last_used"}
+        self.conversations: "OrderedDict[Tuple[int, int], Dict]" = OrderedDict()
+        self.context_tokens = context_tokens
+        self.idle_ttl = idle_ttl
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+        self.spill_storage = spill_storage
+        self.spill_buffer = WriteBehindBuffer(spill_storage.save_many) if spill_storage else None
+        # async summarizer(previous_summary, dropped_messages) -> new summary
+        self.summarizer = summarizer
+        self._summary_tasks = {}
+        self.metrics = {"hits": 0, "misses": 0, "spill_hits": 0, "expired": 0, "evicted": 0, "summarized": 0}
+
+    @staticmethod
+    def _size(entry: Dict) -> int:
+        size = sum(len(message["content"].encode("utf-8")) for message in entry["messages"])
+        return size + len((entry["summary"] or "").encode("utf-8"))
+
+    def _drop(self, key: Tuple[int, int]) -> Dict:
+        entry = self.conversations.pop(key)
+        self.memory_used -= entry["size"]
+        return entry
+
+    def _evict(self, now: float):
+        """Forget idle conversations, then spill the least recently used while over budget"""
+        while self.conversations:
+            key, entry = next(iter(self.conversations.items()))
+            if now - entry["last_used"] <= self.idle_ttl:
+                break
+            self._drop(key)
+            self.metrics["expired"] += 1
+        while self.memory_used > self.memory_budget and len(self.conversations) > 1:
+            key, entry = next(iter(self.conversations.items()))
+            self._drop(key)
+            self.metrics["evicted"] += 1
+            if self.spill_buffer is not None:
+                # The summary travels as a leading system message; stored turns are never system messages
+                spilled = entry["messages"]
+                if entry["summary"]:
+                    spilled = [{"role": "system", "content": entry["summary"]}] + spilled
+                self.spill_buffer.add((*key, spilled, entry["last_used"]))
+
+    def _window(self, entry: Dict, reserve_tokens: int) -> List[Dict]:
+        """Summary plus the newest turns that fit the context budget after ``reserve_tokens``"""
+        budget = self.context_tokens - reserve_tokens
+        window = []
+        if entry["summary"]:
+            summary = {"role": "system", "content": f"Summary of the earlier conversation: {entry['summary']}"}
+            budget -= message_tokens(summary)
+            window.append(summary)
+        start = len(entry["messages"])
+        for tokens in reversed(entry["tokens"]):
+            if tokens > budget:
+                break
+            budget -= tokens
+            start -= 1
+        return window + entry["messages"][start:]
+
+    async def get_conversation(self, user_id: int, channel_id: int, reserve_tokens: int = 0) -> List[Dict]:
+        """Context to send ahead of a new prompt that itself needs ``reserve_tokens``"""
+        key = (user_id, channel_id)
+        now = time.time()
+        entry = self.conversations.get(key)
+        if entry and now - entry["last_used"] <= self.idle_ttl:
+            self.metrics["hits"] += 1
+            entry["last_used"] = now
+            self.conversations.move_to_end(key)
+            return self._window(entry, reserve_tokens)
+        if entry:
+            self._drop(key)
+            self.metrics["expired"] += 1
+
+        self.metrics["misses"] += 1
+        if not self.spill_storage:
+            return []
+        # Spilled rows may still sit in the write buffer
+        await self.spill_buffer.flush()
+        messages = await self.spill_storage.load(user_id, channel_id, now - self.idle_ttl)
+        if not messages:
+            return []
+        self.metrics["spill_hits"] += 1
+        summary = messages.pop(0)["content"] if messages[0]["role"] == "system" else None
+        entry = self._store(key, messages, summary, now)
+        return self._window(entry, reserve_tokens)
+
+    def _store(self, key: Tuple[int, int], messages: List[Dict], summary: Optional[str], now: float) -> Dict:
+        previous = self._drop(key) if key in self.conversations else None
+        entry = {
+            "messages": messages,
+            "tokens": [message_tokens(message) for message in messages],
+            "summary": summary,
+            "unsummarized": previous["unsummarized"] if previous else [],
+            "last_used": now
+        }
+        self._trim(key, entry)
+        entry["size"] = self._size(entry)
+        self.conversations[key] = entry
+        self.memory_used += entry["size"]
+        self._evict(now)
+        return entry
+
+    def _trim(self, key: Tuple[int, int], entry: Dict):
+        """Drop the oldest turns beyond the context budget, queueing them for the summary"""
+        total = sum(entry["tokens"])
+        if entry["summary"]:
+            total += message_tokens({"content": entry["summary"]})
+        dropped = 0
+        while total > self.context_tokens and dropped < len(entry["messages"]) - 1:
+            total -= entry["tokens"][dropped]
+            dropped += 1
+        if not dropped:
+            return
+        if self.summarizer:
+            entry["unsummarized"].extend(entry["messages"][:dropped])
+            if key not in self._summary_tasks:
+                task = asyncio.create_task(self._summarize(key))
+                self._summary_tasks[key] = task
+                task.add_done_callback(lambda _: self._summary_tasks.pop(key, None))
+        del entry["messages"][:dropped]
+        del entry["tokens"][:dropped]
+
+    async def _summarize(self, key: Tuple[int, int]):
+        while True:
+            entry = self.conversations.get(key)
+            if not entry or not entry["unsummarized"]:
+                return
+            dropped, entry["unsummarized"] = entry["unsummarized"], []
+            try:
+                summary = await self.summarizer(entry["summary"], dropped)
+            except Exception as e:
+                logging.warning(f"Could not summarize {len(dropped)} conversation turns: {e}")
+                return
+            # The entry may have been replaced or evicted while the summary was generated
+            entry = self.conversations.get(key)
+            if entry:
+                entry["summary"] = summary
+                size = self._size(entry)
+                self.memory_used += size - entry["size"]
+                entry["size"] = size
+                self.metrics["summarized"] += len(dropped)
 
     def add_message(self, user_id: int, channel_id: int, role: str, content: str):
-        key = f"{user_id}_{channel_id}"
-        if key not in self.conversations:
-            self.conversations[key] = []
-        
-        self.conversations[key].append({"role": role, "content": content})
-        
-        if len(self.conversations[key]) > self.max_context_length:
-            self.conversations[key] = self.conversations[key][-self.max_context_length:]
+        key = (user_id, channel_id)
+        entry = self.conversations.get(key)
+        messages = entry["messages"] if entry else []
+        messages.append({"role": role, "content": content})
+        self._store(key, messages, entry["summary"] if entry else None, time.time())
 
-    def clear_conversation(self, user_id: int, channel_id: int):
-        key = f"{user_id}_{channel_id}"
+    async def clear_conversation(self, user_id: int, channel_id: int):
+        key = (user_id, channel_id)
         if key in self.conversations:
-            del self.conversations[key]
+            self._drop(key)
+        if self.spill_storage:
+            await self.spill_buffer.flush()
+            await self.spill_storage.delete(user_id, channel_id)
+
+    def stats(self) -> Dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0,
+            "conversations": len(self.conversations),
+            "memory_used": self.memory_used
+        }
+
+    async def close(self):
+        """Write out pending spills and drop expired spilled conversations"""
+        for task in list(self._summary_tasks.values()):
+            task.cancel()
+        if self.spill_storage:
+            await self.spill_buffer.close()
+            await self.spill_storage.purge(time.time() - self.idle_ttl)
 
 class AIFeatures(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.conversation_manager = AIConversationManager()
-        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.conversation_manager = AIConversationManager(
+            context_tokens=AI_SETTINGS['conversation_context_tokens'],
+            idle_ttl=AI_SETTINGS['conversation_idle_ttl'],
+            memory_budget=AI_SETTINGS['conversation_memory_budget'],
+            spill_storage=bot.storage.conversations if AI_SETTINGS['conversation_spill'] else None,
+            summarizer=self.summarize_turns if AI_SETTINGS['conversation_summarize'] else None
+        )
+        self.llm = get_llm_client()
+
+    async def summarize_turns(self, summary: Optional[str], messages: List[Dict]) -> str:
+        """Fold conversation turns that left the context window into the running summary"""
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        if summary:
+            transcript = f"Summary so far: {summary}\n\n{transcript}"
+        return await self.llm.chat(
+            [
+                {"role": "system", "content": "Condense this conversation into a short summary that keeps names, facts, decisions and open questions. Reply with the summary only."},
+                {"role": "user", "content": transcript}
+            ],
+            max_tokens=AI_SETTINGS['conversation_summary_tokens'],
+            temperature=0.3
+        )
+
+    async def cog_unload(self):
+        await self.conversation_manager.close()
 
     @app_commands.command(name="ai", description="Chat with AI assistant")
     @app_commands.describe(
@@ -51,8 +241,10 @@ class AIFeatures(commands.Cog):
         
         try:
             if remember:
-                conversation = self.conversation_manager.get_conversation(
-                    interaction.user.id, interaction.channel.id
+                # The new prompt and system message share the context budget with the history
+                reserve_tokens = message_tokens({"content": prompt}) + (message_tokens({"content": system}) if system else 0)
+                conversation = await self.conversation_manager.get_conversation(
+                    interaction.user.id, interaction.channel.id, reserve_tokens
                 )
             else:
                 conversation = []
@@ -64,15 +256,13 @@ class AIFeatures(commands.Cog):
             messages.extend(conversation)
             messages.append({"role": "user", "content": prompt})
 
-            response = self.client.chat.completions.create(
+            ai_response = await self.llm.chat(
+                messages,
                 model=model,
-                messages=messages,
                 max_tokens=2000,
                 temperature=0.7
             )
 
-            ai_response = response.choices[0].message.content
-
             if remember:
                 self.conversation_manager.add_message(
                     interaction.user.id, interaction.channel.id, "user", prompt
@@ -94,8 +284,26 @@ class AIFeatures(commands.Cog):
 
     @app_commands.command(name="clear-conversation", description="Clear AI conversation memory")
     async def clear_conversation(self, interaction: discord.Interaction):
-        self.conversation_manager.clear_conversation(interaction.user.id, interaction.channel.id)
+        await self.conversation_manager.clear_conversation(interaction.user.id, interaction.channel.id)
         await interaction.response.send_message("Conversation memory cleared!", ephemeral=True)
 
+    @app_commands.command(name="ai-memory-stats", description="Show AI conversation memory usage")
+    @app_commands.default_permissions(administrator=True)
+    async def ai_memory_stats(self, interaction: discord.Interaction):
+        stats = self.conversation_manager.stats()
+        embed = discord.Embed(title="🧠 AI Conversation Memory", color=discord.Color.blue())
+        embed.add_field(name="Conversations", value=stats["conversations"], inline=True)
+        embed.add_field(
+            name="Memory",
+            value=f"{stats['memory_used'] / 1024:.1f} / {self.conversation_manager.memory_budget / 1024:.0f} KiB",
+            inline=True
+        )
+        embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="Restored From Disk", value=stats["spill_hits"], inline=True)
+        embed.add_field(name="Expired", value=stats["expired"], inline=True)
+        embed.add_field(name="Evicted For Space", value=stats["evicted"], inline=True)
+        embed.add_field(name="Turns Summarized", value=stats["summarized"], inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(AIFeatures(bot))
\ No newline at end of file
@@ -1,32 +1,33 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import openai
 import random
-import os
 from datetime import datetime, timezone
+from config.settings import AI_SETTINGS
+from utils.llm import get_llm_client
 
 class AIGames(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.llm = get_llm_client()
         self.active_games = {}
 
-    async def get_ai_response(self, prompt: str, system_prompt: str = None) -> str:
-        """Get AI response for games"""
+    async def get_ai_response(self, prompt: str, system_prompt: str = None, cache_ttl: float = None) -> str:
+        """Get AI response for games; ``cache_ttl`` lets identical prompts reuse a response"""
         try:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            response = self.openai_client.chat.completions.create(
+            response = await self.llm.chat(
+                messages,
                 model="gpt-4o",
-                messages=messages,
                 max_tokens=400,
-                temperature=0.8
+                temperature=0.8,
+                cache_ttl=cache_ttl
             )
-            return response.choices[0].message.content or "AI response unavailable"
+            return response or "AI response unavailable"
         except Exception as e:
             return f"AI temporarily unavailable. Please try again later."
 
@@ -70,7 +71,7 @@ class AIGames(commands.Cog):
             "hard": "Create a challenging riddle with complex wordplay and metaphors. Include the answer at the end marked with 'Answer:'"
         }
         
-        riddle_text = await self.get_ai_response(difficulty_prompts[difficulty])
+        riddle_text = await self.get_ai_response(difficulty_prompts[difficulty], cache_ttl=AI_SETTINGS['response_cache_ttl'])
         
         # Split riddle and answer
         if "Answer:" in riddle_text:
@@ -143,7 +144,7 @@ class AIGames(commands.Cog):
         
         prompt = f"Create a {category} trivia question with 4 multiple choice answers (A, B, C, D). Format it clearly with the question, then the four options, then state which letter is correct and provide a brief explanation."
         
-        trivia_content = await self.get_ai_response(prompt)
+        trivia_content = await self.get_ai_response(prompt, cache_ttl=AI_SETTINGS['response_cache_ttl'])
         
         # Try to extract the correct answer
         correct_answer = "A"  # Default fallback
@@ -1,201 +1,94 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import json
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any
 import logging
-import os
-from openai import OpenAI
+from utils.llm import get_llm_client
+from config.settings import ANALYTICS_SETTINGS
+from utils.batching import WriteBehindBuffer
+from utils.capabilities import Capabilities
 
 class ServerAnalytics:
     """Handles server data collection and analysis"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = 'autonomous_ai.db'
+        self.storage = bot.storage.analytics
+        self.activity_buffer = WriteBehindBuffer(
+            self._write_activity,
+            max_rows=ANALYTICS_SETTINGS['activity_batch_size'],
+            interval=ANALYTICS_SETTINGS['activity_flush_interval']
+        )
         
-    async def init_database(self):
-        """Initialize the analytics database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS server_activity (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    channel_id INTEGER,
-                    user_id INTEGER,
-                    message_count INTEGER DEFAULT 1,
-                    timestamp DATETIME,
-                    activity_type TEXT
-                )
-            ''')
-            
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS channel_analytics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    channel_id INTEGER,
-                    channel_name TEXT,
-                    total_messages INTEGER DEFAULT 0,
-                    active_users INTEGER DEFAULT 0,
-                    last_activity DATETIME,
-                    engagement_score REAL DEFAULT 0.0
-                )
-            ''')
-            
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS user_analytics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    username TEXT,
-                    total_messages INTEGER DEFAULT 0,
-                    last_seen DATETIME,
-                    engagement_level TEXT DEFAULT 'inactive',
-                    join_date DATETIME
-                )
-            ''')
-            
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS ai_actions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    action_type TEXT,
-                    action_details TEXT,
-                    reasoning TEXT,
-                    confidence_score REAL,
-                    timestamp DATETIME,
-                    result_metrics TEXT
-                )
-            ''')
-            
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS server_metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    date_recorded DATE,
-                    total_members INTEGER,
-                    active_members INTEGER,
-                    message_volume INTEGER,
-                    boost_count INTEGER,
-                    join_rate REAL,
-                    leave_rate REAL
-                )
-            ''')
-            
-            await db.commit()
-    
     async def log_message_activity(self, message):
         """Log message activity for analytics"""
         if message.author.bot:
             return
             
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO server_activity 
-                (guild_id, channel_id, user_id, timestamp, activity_type)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                message.guild.id,
-                message.channel.id,
-                message.author.id,
-                datetime.now(timezone.utc),
-                'message'
-            ))
-            await db.commit()
+        self.activity_buffer.add((
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            datetime.now(timezone.utc),
+            'message'
+        ))
+    
+    async def _write_activity(self, rows: List[tuple]):
+        """Insert a batch of buffered activity rows in a single transaction"""
+        await self.storage.add_activity(rows)
     
     async def update_channel_analytics(self, guild_id: int):
         """Update channel engagement analytics"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Get message counts per channel from last 24 hours
-            yesterday = datetime.now(timezone.utc) - timedelta(days=1)
-            
-            cursor = await db.execute('''
-                SELECT channel_id, COUNT(*) as msg_count, COUNT(DISTINCT user_id) as unique_users
-                FROM server_activity 
-                WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
-                GROUP BY channel_id
-            ''', (guild_id, yesterday))
-            
-            channel_data = await cursor.fetchall()
-            
-            for channel_id, msg_count, unique_users in channel_data:
-                # Calculate engagement score
-                engagement_score = (msg_count * 0.7) + (unique_users * 0.3)
-                
-                guild = self.bot.get_guild(guild_id)
-                channel = guild.get_channel(channel_id) if guild else None
-                channel_name = channel.name if channel else "Unknown"
-                
-                await db.execute('''
-                    INSERT OR REPLACE INTO channel_analytics 
-                    (guild_id, channel_id, channel_name, total_messages, active_users, 
-                     last_activity, engagement_score)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    guild_id, channel_id, channel_name, msg_count, unique_users,
-                    datetime.now(timezone.utc), engagement_score
-                ))
-            
-            await db.commit()
+        await self.activity_buffer.flush()
+        # Get message counts per channel from last 24 hours
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        channel_data = await self.storage.channel_activity(guild_id, yesterday)
+        
+        guild = self.bot.get_guild(guild_id)
+        rows = []
+        for channel_id, msg_count, unique_users in channel_data:
+            # Calculate engagement score
+            engagement_score = (msg_count * 0.7) + (unique_users * 0.3)
+            
+            channel = guild.get_channel(channel_id) if guild else None
+            channel_name = channel.name if channel else "Unknown"
+            
+            rows.append((
+                guild_id, channel_id, channel_name, msg_count, unique_users,
+                datetime.now(timezone.utc), engagement_score
+            ))
+        
+        await self.storage.save_channel_analytics(rows)
     
     async def get_server_insights(self, guild_id: int) -> Dict[str, Any]:
         """Generate comprehensive server insights"""
-        async with aiosqlite.connect(self.db_path) as db:
-            insights = {}
-            
-            # Get top channels by engagement
-            cursor = await db.execute('''
-                SELECT channel_name, engagement_score, total_messages, active_users
-                FROM channel_analytics 
-                WHERE guild_id = ? 
-                ORDER BY engagement_score DESC 
-                LIMIT 5
-            ''', (guild_id,))
-            insights['top_channels'] = await cursor.fetchall()
-            
-            # Get least active channels
-            cursor = await db.execute('''
-                SELECT channel_name, engagement_score, total_messages, active_users
-                FROM channel_analytics 
-                WHERE guild_id = ? 
-                ORDER BY engagement_score ASC 
-                LIMIT 5
-            ''', (guild_id,))
-            insights['least_active_channels'] = await cursor.fetchall()
-            
-            # Get message volume trends (last 7 days)
-            week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-            cursor = await db.execute('''
-                SELECT DATE(timestamp) as day, COUNT(*) as messages
-                FROM server_activity 
-                WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
-                GROUP BY DATE(timestamp)
-                ORDER BY day
-            ''', (guild_id, week_ago))
-            insights['daily_message_trends'] = await cursor.fetchall()
-            
-            # Get most active users
-            cursor = await db.execute('''
-                SELECT user_id, COUNT(*) as msg_count
-                FROM server_activity 
-                WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
-                GROUP BY user_id
-                ORDER BY msg_count DESC
-                LIMIT 10
-            ''', (guild_id, week_ago))
-            insights['most_active_users'] = await cursor.fetchall()
-            
-            return insights
+        await self.activity_buffer.flush()
+        insights = {}
+        
+        # Get top channels by engagement
+        insights['top_channels'] = await self.storage.channels_by_engagement(guild_id, 5)
+        
+        # Get least active channels
+        insights['least_active_channels'] = await self.storage.channels_by_engagement(guild_id, 5, descending=False)
+        
+        # Get message volume trends (last 7 days)
+        week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+        insights['daily_message_trends'] = await self.storage.daily_message_counts(guild_id, week_ago)
+        
+        # Get most active users
+        insights['most_active_users'] = await self.storage.most_active_users(guild_id, week_ago, 10)
+        
+        return insights
 
 class AIDecisionEngine:
     """AI-powered decision making system"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.llm = get_llm_client()
         self.confidence_threshold = 0.75
         
     async def analyze_and_decide(self, guild_id: int, insights: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -205,7 +98,7 @@ class AIDecisionEngine:
         analysis_prompt = self._create_analysis_prompt(insights)
         
         try:
-            response = self.openai_client.chat.completions.create(
+            content = await self.llm.chat(
                 model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
                 messages=[
                     {
@@ -227,10 +120,10 @@ class AIDecisionEngine:
                         "content": analysis_prompt
                     }
                 ],
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                cache_ttl=ANALYTICS_SETTINGS['analysis_cache_ttl']
             )
             
-            content = response.choices[0].message.content
             if content:
                 recommendations = json.loads(content)
                 return recommendations.get('recommendations', [])
@@ -266,6 +159,9 @@ class AIDecisionEngine:
 
 class AutonomousAI(commands.Cog):
     """Autonomous AI system for intelligent server management"""
+
+    # Message activity logging reads ids only, never message content
+    capabilities = Capabilities(intents=('guild_messages',))
     
     def __init__(self, bot):
         self.bot = bot
@@ -275,14 +171,14 @@ class AutonomousAI(commands.Cog):
         
     async def cog_load(self):
         """Initialize the AI system"""
-        await self.analytics.init_database()
         self.daily_analysis.start()
         self.hourly_data_collection.start()
     
-    def cog_unload(self):
+    async def cog_unload(self):
         """Clean up when cog is unloaded"""
         self.daily_analysis.cancel()
         self.hourly_data_collection.cancel()
+        await self.analytics.activity_buffer.close()
     
     @commands.Cog.listener()
     async def on_message(self, message):
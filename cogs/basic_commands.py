@@ -6,7 +6,13 @@ import time
 import psutil
 import platform
 
+from utils.capabilities import Capabilities
+from utils.system_stats import sparkline
+
 class BasicCommands(commands.Cog):
+    # Member status in /userinfo
+    capabilities = Capabilities(optional_intents=('presences',))
+
     def __init__(self, bot):
         self.bot = bot
 
@@ -21,8 +27,10 @@ class BasicCommands(commands.Cog):
             title="🤖 Bot Information",
             color=discord.Color.blue()
         )
-        embed.add_field(name="Servers", value=len(self.bot.guilds), inline=True)
-        embed.add_field(name="Users", value=sum(guild.member_count for guild in self.bot.guilds), inline=True)
+        totals = await self.bot.cluster_stats.totals()
+        embed.add_field(name="Servers", value=totals['guilds'], inline=True)
+        embed.add_field(name="Users", value=totals['members'], inline=True)
+        embed.add_field(name="Shards", value=totals['shards'], inline=True)
         embed.add_field(name="Commands", value=len([cmd for cmd in self.bot.tree.walk_commands()]), inline=True)
         embed.add_field(name="Python", value=platform.python_version(), inline=True)
         embed.add_field(name="Discord.py", value=discord.__version__, inline=True)
@@ -42,6 +50,64 @@ class BasicCommands(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="system-stats", description="Show bot resource usage and recent trends")
+    async def system_stats(self, interaction: discord.Interaction):
+        stats = await self.bot.get_system_stats()
+        if not stats:
+            # get_system_stats returns {} when sampling fails
+            await interaction.response.send_message("System stats are unavailable right now, try again shortly.", ephemeral=True)
+            return
+        history = self.bot.system_stats.history()
+        latency = stats['latency_ms']
+
+        embed = discord.Embed(
+            title="🖥️ System Stats",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="CPU", value=f"{stats['cpu_percent']:.1f}% (bot {stats['process_cpu_percent']:.1f}%)", inline=True)
+        embed.add_field(name="Memory", value=f"{stats['memory_usage_mb']:.0f} MB ({stats['memory_percent']:.0f}% of host)", inline=True)
+        embed.add_field(name="Gateway", value=f"{latency:.0f} ms" if latency is not None else "Connecting", inline=True)
+        embed.add_field(name="Loop Lag", value=f"{stats['loop_lag_ms']:.1f} ms", inline=True)
+        embed.add_field(name="Servers", value=stats['guilds'], inline=True)
+        embed.add_field(name="Uptime", value=f"{stats['uptime_hours']:.1f} h", inline=True)
+        if len(history) > 1:
+            minutes = (history[-1]['timestamp'] - history[0]['timestamp']) / 60
+            trends = "\n".join(
+                f"`{label:<6}` {sparkline([sample[key] for sample in history])}"
+                for label, key in (("CPU", 'cpu_percent'), ("Memory", 'memory_usage_mb'), ("Lag", 'loop_lag_ms'))
+            )
+            embed.add_field(name=f"Last {minutes:.0f} min", value=trends, inline=False)
+
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="loop-stats", description="Show event loop lag and recent blocking calls")
+    @app_commands.default_permissions(administrator=True)
+    async def loop_stats(self, interaction: discord.Interaction):
+        monitor = self.bot.loop_monitor
+        stats = monitor.stats()
+
+        embed = discord.Embed(
+            title="⏱️ Event Loop",
+            description=f"{stats['samples']} pings every {monitor.interval * 1000:.0f} ms",
+            color=discord.Color.green() if stats['p99_ms'] < monitor.threshold * 1000 else discord.Color.orange()
+        )
+        embed.add_field(name="p50", value=f"{stats['p50_ms']:.1f} ms", inline=True)
+        embed.add_field(name="p95", value=f"{stats['p95_ms']:.1f} ms", inline=True)
+        embed.add_field(name="p99", value=f"{stats['p99_ms']:.1f} ms", inline=True)
+        embed.add_field(name="Max", value=f"{stats['max_ms']:.1f} ms", inline=True)
+        embed.add_field(name="Stalls", value=stats['slow_total'], inline=True)
+
+        recent = list(monitor.slow_events)[-5:]
+        if recent:
+            lines = [
+                f"<t:{int(event['timestamp'])}:R> **{event['duration_ms']:.0f} ms** "
+                f"{event['source'] or ''} `{event['location']}`"
+                for event in reversed(recent)
+            ]
+            embed.add_field(name="Recent Stalls", value="\n".join(lines)[:1024], inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="serverinfo", description="Get server information")
     async def serverinfo(self, interaction: discord.Interaction):
         guild = interaction.guild
@@ -79,7 +145,8 @@ class BasicCommands(commands.Cog):
         embed.set_thumbnail(url=target.display_avatar.url)
         embed.add_field(name="Username", value=str(target), inline=True)
         embed.add_field(name="ID", value=target.id, inline=True)
-        embed.add_field(name="Status", value=str(target.status).title(), inline=True)
+        status = str(target.status).title() if self.bot.intents.presences else "Unknown"
+        embed.add_field(name="Status", value=status, inline=True)
         embed.add_field(name="Joined Server", value=f"<t:{int(target.joined_at.timestamp())}:R>" if target.joined_at else "Unknown", inline=True)
         embed.add_field(name="Account Created", value=f"<t:{int(target.created_at.timestamp())}:R>", inline=True)
         embed.add_field(name="Top Role", value=target.top_role.mention, inline=True)
@@ -1,14 +1,12 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import json
 import asyncio
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import logging
-import os
-from openai import OpenAI
+from utils.llm import get_llm_client
 import statistics
 import random
 
@@ -17,123 +15,27 @@ class CognitiveMemory:
     
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = 'cognitive_memory.db'
+        self.storage = bot.storage.cognitive
         self.memory_cache = {}
         
-    async def init_memory_database(self):
-        """Initialize the cognitive memory database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Decision tracking table
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS decisions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    decision_type TEXT,
-                    action_taken TEXT,
-                    reasoning TEXT,
-                    confidence_score REAL,
-                    timestamp DATETIME,
-                    success_metrics TEXT,
-                    feedback_score REAL DEFAULT 0.0,
-                    learned_insights TEXT
-                )
-            ''')
-            
-            # Pattern recognition table
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS patterns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    pattern_type TEXT,
-                    pattern_data TEXT,
-                    frequency INTEGER DEFAULT 1,
-                    last_seen DATETIME,
-                    effectiveness REAL DEFAULT 0.0
-                )
-            ''')
-            
-            # User behavior predictions
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS user_predictions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    predicted_behavior TEXT,
-                    prediction_confidence REAL,
-                    actual_outcome TEXT,
-                    prediction_accuracy REAL
-                )
-            ''')
-            
-            # Learning insights
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS learning_insights (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    insight_category TEXT,
-                    insight_text TEXT,
-                    evidence_strength REAL,
-                    timestamp DATETIME,
-                    applied_successfully BOOLEAN DEFAULT 0
-                )
-            ''')
-            
-            await db.commit()
-    
     async def record_decision(self, guild_id: int, decision_data: Dict):
         """Record a decision for future learning"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO decisions 
-                (guild_id, decision_type, action_taken, reasoning, confidence_score, timestamp, success_metrics)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                guild_id,
-                decision_data.get('type', 'unknown'),
-                json.dumps(decision_data.get('action', {})),
-                decision_data.get('reasoning', ''),
-                decision_data.get('confidence', 0.0),
-                datetime.now(timezone.utc),
-                json.dumps(decision_data.get('metrics', {}))
-            ))
-            await db.commit()
+        await self.storage.record_decision(guild_id, decision_data)
     
     async def learn_from_outcome(self, decision_id: int, feedback_score: float, insights: str):
         """Update decision with outcome feedback for learning"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                UPDATE decisions 
-                SET feedback_score = ?, learned_insights = ?
-                WHERE id = ?
-            ''', (feedback_score, insights, decision_id))
-            await db.commit()
+        await self.storage.record_feedback(decision_id, feedback_score, insights)
     
     async def get_decision_history(self, guild_id: int, decision_type: str = None) -> List[Dict]:
         """Retrieve decision history for pattern analysis"""
-        async with aiosqlite.connect(self.db_path) as db:
-            if decision_type:
-                cursor = await db.execute('''
-                    SELECT * FROM decisions 
-                    WHERE guild_id = ? AND decision_type = ?
-                    ORDER BY timestamp DESC LIMIT 50
-                ''', (guild_id, decision_type))
-            else:
-                cursor = await db.execute('''
-                    SELECT * FROM decisions 
-                    WHERE guild_id = ?
-                    ORDER BY timestamp DESC LIMIT 100
-                ''', (guild_id,))
-            
-            rows = await cursor.fetchall()
-            columns = [description[0] for description in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
+        return await self.storage.decision_history(guild_id, decision_type)
 
 class AdvancedCognitiveEngine:
     """Enhanced AI cognitive reasoning system"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.llm = get_llm_client()
         self.memory = CognitiveMemory(bot)
         self.confidence_threshold = 0.8
         self.learning_rate = 0.1
@@ -148,7 +50,7 @@ class AdvancedCognitiveEngine:
         analysis_prompt = self._create_cognitive_prompt(server_data, decision_history)
         
         try:
-            response = self.openai_client.chat.completions.create(
+            content = await self.llm.chat(
                 model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
                 messages=[
                     {
@@ -183,7 +85,6 @@ class AdvancedCognitiveEngine:
                 temperature=0.3  # Lower temperature for more consistent reasoning
             )
             
-            content = response.choices[0].message.content
             if content:
                 analysis = json.loads(content)
                 return analysis
@@ -323,7 +224,6 @@ class SelfImprovingAgent(commands.Cog):
         
     async def cog_load(self):
         """Initialize the cognitive system"""
-        await self.cognitive_engine.memory.init_memory_database()
         self.cognitive_analysis_loop.start()
         self.learning_feedback_loop.start()
         self.trust_score_updater.start()
@@ -385,40 +285,26 @@ class SelfImprovingAgent(commands.Cog):
     
     async def gather_comprehensive_data(self, guild: discord.Guild) -> Dict:
         """Gather comprehensive server data for cognitive analysis"""
+        snapshot = self.bot.snapshots.snapshot(guild)
         data = {
-            'server_name': guild.name,
-            'member_count': guild.member_count,
-            'channel_count': len(guild.channels),
-            'role_count': len(guild.roles),
-            'boost_level': guild.premium_tier,
-            'boost_count': guild.premium_subscription_count or 0,
-            'created_at': guild.created_at.isoformat(),
-            'owner_id': guild.owner_id,
+            key: snapshot[key]
+            for key in ('server_name', 'member_count', 'channel_count', 'role_count',
+                        'boost_level', 'boost_count', 'created_at', 'owner_id', 'online_ratio')
         }
         
-        # Channel activity analysis
+        # Channel activity analysis from the rolling counters
         active_channels = []
         for channel in guild.text_channels:
-            try:
-                # Get recent message count (approximate)
-                messages = []
-                async for message in channel.history(limit=50, after=datetime.now(timezone.utc) - timedelta(days=1)):
-                    messages.append(message)
-                
-                active_channels.append({
-                    'name': channel.name,
-                    'recent_messages': len(messages),
-                    'member_count': len(channel.members) if hasattr(channel, 'members') else 0
-                })
-            except:
-                continue
+            stats = self.bot.channel_activity.channel_stats(channel.id)
+            active_channels.append({
+                'name': channel.name,
+                'recent_messages': stats['messages_last_day'],
+                'messages_per_hour': stats['messages_per_hour'],
+                'unique_authors': stats['unique_authors_last_day']
+            })
         
         data['channel_activity'] = active_channels
         
-        # Member activity patterns
-        online_members = sum(1 for member in guild.members if member.status != discord.Status.offline)
-        data['online_ratio'] = online_members / guild.member_count if guild.member_count > 0 else 0
-        
         return data
     
     async def get_or_create_ai_logs(self, guild: discord.Guild) -> discord.TextChannel:
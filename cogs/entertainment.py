@@ -6,7 +6,15 @@ import asyncio
 import aiohttp
 import json
 
+from config.settings import CAPABILITY_SETTINGS
+from utils.capabilities import Capabilities
+
 class Entertainment(commands.Cog):
+    # /riddle and /trivia wait for reactions, which discord.py only reports on cached messages
+    capabilities = Capabilities(
+        intents=('guild_reactions',), messages=CAPABILITY_SETTINGS['reaction_prompt_messages']
+    )
+
     def __init__(self, bot):
         self.bot = bot
 
@@ -1,14 +1,32 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import math
 import random
 import asyncio
+from config.settings import CAPABILITY_SETTINGS, LEVELING_SETTINGS
+from utils.batching import DeltaAccumulator
+from utils.capabilities import Capabilities
+from utils.ranking import RankIndex
 
 class Leveling(commands.Cog):
+    # /reset-levels confirms with a reaction, which discord.py only reports on cached messages
+    capabilities = Capabilities(
+        intents=('guild_reactions',), messages=CAPABILITY_SETTINGS['reaction_prompt_messages']
+    )
+
     def __init__(self, bot):
         self.bot = bot
+        self.ranks = RankIndex(self.load_guild_xp)
+        # XP deltas per (guild_id, user_id), written in batches by write_xp
+        self.pending_xp = DeltaAccumulator(
+            self.write_xp,
+            interval=LEVELING_SETTINGS['xp_flush_interval'],
+            max_keys=LEVELING_SETTINGS['xp_flush_max_users']
+        )
+
+    async def cog_unload(self):
+        await self.pending_xp.close()
 
     def calculate_level(self, xp):
         return int(math.sqrt(xp / 100))
@@ -16,95 +34,79 @@ class Leveling(commands.Cog):
     def calculate_xp_for_level(self, level):
         return (level ** 2) * 100
 
+    async def load_guild_xp(self, guild_id):
+        return await self.bot.storage.levels.guild_xp(guild_id)
+
+    async def write_xp(self, deltas):
+        # Levels come from the in-memory totals, which already include these deltas
+        rows = []
+        for (guild_id, user_id), delta in deltas.items():
+            ranks = await self.ranks.guild(guild_id)
+            rows.append((guild_id, user_id, delta, self.calculate_level(ranks.get(user_id) or 0)))
+        await self.bot.storage.levels.add_xp(rows)
+
     async def add_xp(self, guild_id, user_id, amount):
-        async with aiosqlite.connect('ultrabot.db') as db:
-            # Get current XP and level
-            async with db.execute(
-                'SELECT xp, level FROM levels WHERE guild_id = ? AND user_id = ?',
-                (guild_id, user_id)
-            ) as cursor:
-                result = await cursor.fetchone()
-                
-            current_xp = result[0] if result else 0
-            current_level = result[1] if result else 0
-            
-            new_xp = current_xp + amount
-            new_level = self.calculate_level(new_xp)
-            
-            # Update database
-            await db.execute('''
-                INSERT OR REPLACE INTO levels (guild_id, user_id, xp, level)
-                VALUES (?, ?, ?, ?)
-            ''', (guild_id, user_id, new_xp, new_level))
-            await db.commit()
-            
-            return current_level, new_level, new_xp
+        """Add XP using the cached total; the database write is batched"""
+        ranks = await self.ranks.guild(guild_id)
+        current_xp = ranks.get(user_id) or 0
+        current_level = self.calculate_level(current_xp)
+        
+        new_xp = current_xp + amount
+        new_level = self.calculate_level(new_xp)
+        
+        ranks.update(user_id, new_xp)
+        self.pending_xp.add((guild_id, user_id), amount)
+        return current_level, new_level, new_xp
 
     @app_commands.command(name="rank", description="Check your or someone's rank and level")
     @app_commands.describe(user="User to check rank for")
     async def rank(self, interaction: discord.Interaction, user: discord.Member = None):
         target = user or interaction.user
+        ranks = await self.ranks.guild(interaction.guild.id)
+        xp = ranks.get(target.id)
         
-        async with aiosqlite.connect('ultrabot.db') as db:
-            # Get user's stats
-            async with db.execute(
-                'SELECT xp, level FROM levels WHERE guild_id = ? AND user_id = ?',
-                (interaction.guild.id, target.id)
-            ) as cursor:
-                result = await cursor.fetchone()
-                
-            if not result:
-                embed = discord.Embed(
-                    title="📊 Rank",
-                    description=f"{target.display_name} hasn't earned any XP yet!",
-                    color=discord.Color.gray()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
-            xp, level = result
-            
-            # Get user's rank
-            async with db.execute(
-                'SELECT COUNT(*) + 1 FROM levels WHERE guild_id = ? AND xp > ?',
-                (interaction.guild.id, xp)
-            ) as cursor:
-                rank = (await cursor.fetchone())[0]
-            
-            # Calculate XP for current and next level
-            current_level_xp = self.calculate_xp_for_level(level)
-            next_level_xp = self.calculate_xp_for_level(level + 1)
-            progress_xp = xp - current_level_xp
-            needed_xp = next_level_xp - current_level_xp
-            
-            # Create progress bar
-            progress = progress_xp / needed_xp
-            bar_length = 20
-            filled = int(progress * bar_length)
-            bar = "█" * filled + "░" * (bar_length - filled)
-            
+        if xp is None:
             embed = discord.Embed(
-                title="📊 Rank Card",
-                color=target.color if target.color != discord.Color.default() else discord.Color.blue()
+                title="📊 Rank",
+                description=f"{target.display_name} hasn't earned any XP yet!",
+                color=discord.Color.gray()
             )
-            embed.set_thumbnail(url=target.display_avatar.url)
-            embed.add_field(name="User", value=target.display_name, inline=True)
-            embed.add_field(name="Rank", value=f"#{rank}", inline=True)
-            embed.add_field(name="Level", value=level, inline=True)
-            embed.add_field(name="XP", value=f"{xp:,}", inline=True)
-            embed.add_field(name="Progress", value=f"{progress_xp}/{needed_xp}", inline=True)
-            embed.add_field(name="Progress Bar", value=f"`{bar}` {progress:.1%}", inline=False)
-            
             await interaction.response.send_message(embed=embed)
+            return
+        
+        level = self.calculate_level(xp)
+        rank = ranks.rank(target.id)
+        
+        # Calculate XP for current and next level
+        current_level_xp = self.calculate_xp_for_level(level)
+        next_level_xp = self.calculate_xp_for_level(level + 1)
+        progress_xp = xp - current_level_xp
+        needed_xp = next_level_xp - current_level_xp
+        
+        # Create progress bar
+        progress = progress_xp / needed_xp
+        bar_length = 20
+        filled = int(progress * bar_length)
+        bar = "█" * filled + "░" * (bar_length - filled)
+        
+        embed = discord.Embed(
+            title="📊 Rank Card",
+            color=target.color if target.color != discord.Color.default() else discord.Color.blue()
+        )
+        embed.set_thumbnail(url=target.display_avatar.url)
+        embed.add_field(name="User", value=target.display_name, inline=True)
+        embed.add_field(name="Rank", value=f"#{rank}", inline=True)
+        embed.add_field(name="Level", value=level, inline=True)
+        embed.add_field(name="XP", value=f"{xp:,}", inline=True)
+        embed.add_field(name="Progress", value=f"{progress_xp}/{needed_xp}", inline=True)
+        embed.add_field(name="Progress Bar", value=f"`{bar}` {progress:.1%}", inline=False)
+        
+        await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="leaderboard-xp", description="View the XP leaderboard")
     async def leaderboard_xp(self, interaction: discord.Interaction):
-        async with aiosqlite.connect('ultrabot.db') as db:
-            async with db.execute(
-                'SELECT user_id, xp, level FROM levels WHERE guild_id = ? ORDER BY xp DESC LIMIT 10',
-                (interaction.guild.id,)
-            ) as cursor:
-                results = await cursor.fetchall()
+        ranks = await self.ranks.guild(interaction.guild.id)
+        results = ranks.top(10)
         
         if not results:
             embed = discord.Embed(
@@ -123,11 +125,11 @@ class Leveling(commands.Cog):
         medals = ["🥇", "🥈", "🥉"]
         description = ""
         
-        for i, (user_id, xp, level) in enumerate(results):
+        for i, (user_id, xp) in enumerate(results):
             user = self.bot.get_user(user_id)
             if user:
                 medal = medals[i] if i < 3 else f"{i+1}."
-                description += f"{medal} **{user.display_name}** - Level {level} ({xp:,} XP)\n"
+                description += f"{medal} **{user.display_name}** - Level {self.calculate_level(xp)} ({xp:,} XP)\n"
         
         embed.description = description
         await interaction.response.send_message(embed=embed)
@@ -176,9 +178,9 @@ class Leveling(commands.Cog):
             reaction, user = await self.bot.wait_for('reaction_add', check=check, timeout=30)
             
             if str(reaction.emoji) == "✅":
-                async with aiosqlite.connect('ultrabot.db') as db:
-                    await db.execute('DELETE FROM levels WHERE guild_id = ?', (interaction.guild.id,))
-                    await db.commit()
+                await self.pending_xp.discard_where(lambda key: key[0] == interaction.guild.id)
+                await self.bot.storage.levels.reset_guild(interaction.guild.id)
+                self.ranks.reset(interaction.guild.id)
                 
                 success_embed = discord.Embed(
                     title="✅ Levels Reset",
@@ -1,11 +1,71 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
+
+from config.settings import PERMISSION_SETTINGS
+from utils.permissions import BulkPermissionEngine
 
 class PermissionFixer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.engine = BulkPermissionEngine(
+            concurrency=PERMISSION_SETTINGS['edit_concurrency'],
+            progress_interval=PERMISSION_SETTINGS['progress_interval']
+        )
+
+    async def get_members_role(self, guild):
+        """Find or create the Members role; None if the bot may not create it"""
+        members_role = discord.utils.get(guild.roles, name="Members")
+        if not members_role:
+            try:
+                members_role = await guild.create_role(
+                    name="Members",
+                    color=discord.Color.blue(),
+                    reason="Created by bot for permission management"
+                )
+            except discord.Forbidden:
+                return None
+        return members_role
+
+    def bot_access_updates(self, channel, members_role):
+        """Overwrites that let the bot and members use commands in a channel"""
+        guild = channel.guild
+        is_voice = isinstance(channel, discord.VoiceChannel)
+        bot_permissions = dict(
+            view_channel=True,
+            send_messages=True,
+            use_application_commands=True,
+            embed_links=True,
+            read_message_history=True
+        )
+        member_permissions = dict(view_channel=True, send_messages=True, use_application_commands=True)
+        if is_voice:
+            bot_permissions.update(connect=True, speak=True)
+            member_permissions.update(connect=True, speak=True)
+        return {
+            guild.me: bot_permissions,
+            guild.default_role: {'use_application_commands': True},
+            members_role: member_permissions
+        }
+
+    def voice_unlock_updates(self, channel, members_role):
+        """Overwrites that open a voice channel to the Members role"""
+        return {
+            members_role: dict(view_channel=True, connect=True, speak=True, use_voice_activation=True)
+        }
+
+    def progress_reporter(self, message, title):
+        """Progress callback that edits ``message`` with a running count"""
+        async def report(stats):
+            await message.edit(embed=discord.Embed(
+                title=title,
+                description=(
+                    f"Processed **{stats['done']}/{stats['total']}** channels\n"
+                    f"Updated: {stats['updated']} • Already set: {stats['unchanged']} • Errors: {stats['failed']}"
+                ),
+                color=discord.Color.blue()
+            ))
+        return report
 
     @app_commands.command(name="fix-bot-permissions", description="Enable bot commands for all members in all channels")
     @app_commands.default_permissions(administrator=True)
@@ -17,80 +77,34 @@ class PermissionFixer(commands.Cog):
             description="Starting to configure all channels for bot access...",
             color=discord.Color.blue()
         )
-        await interaction.followup.send(embed=embed)
+        message = await interaction.followup.send(embed=embed, wait=True)
         
         guild = interaction.guild
-        bot_member = guild.me
-        
-        success_count = 0
-        error_count = 0
-        total_channels = len(guild.channels)
-        
-        # Find or create Members role
-        members_role = discord.utils.get(guild.roles, name="Members")
+        members_role_existed = discord.utils.get(guild.roles, name="Members") is not None
+        members_role = await self.get_members_role(guild)
         if not members_role:
-            try:
-                members_role = await guild.create_role(
-                    name="Members",
-                    color=discord.Color.blue(),
-                    reason="Created by bot for permission management"
-                )
-            except discord.Forbidden:
-                await interaction.followup.send("❌ Cannot create Members role - insufficient permissions")
-                return
+            await interaction.followup.send("❌ Cannot create Members role - insufficient permissions")
+            return
         
-        # Process all channels
-        for channel in guild.channels:
-            try:
-                # Set bot permissions
-                await channel.set_permissions(
-                    bot_member,
-                    view_channel=True,
-                    send_messages=True,
-                    use_application_commands=True,
-                    embed_links=True,
-                    read_message_history=True,
-                    connect=True if isinstance(channel, discord.VoiceChannel) else None,
-                    speak=True if isinstance(channel, discord.VoiceChannel) else None,
-                    reason="Bot permission fix"
-                )
-                
-                # Set @everyone permissions for bot commands
-                await channel.set_permissions(
-                    guild.default_role,
-                    use_application_commands=True,
-                    reason="Enable bot commands for everyone"
-                )
-                
-                # Set Members role permissions
-                await channel.set_permissions(
-                    members_role,
-                    view_channel=True,
-                    send_messages=True,
-                    use_application_commands=True,
-                    connect=True if isinstance(channel, discord.VoiceChannel) else None,
-                    speak=True if isinstance(channel, discord.VoiceChannel) else None,
-                    reason="Members role permissions"
-                )
-                
-                success_count += 1
-                
-            except discord.Forbidden:
-                error_count += 1
-            except Exception:
-                error_count += 1
+        stats = await self.engine.apply(
+            guild.channels,
+            lambda channel: self.bot_access_updates(channel, members_role),
+            reason="Bot permission fix",
+            progress=self.progress_reporter(message, "🔧 Fixing Bot Permissions")
+        )
         
         # Final result
         result_embed = discord.Embed(
             title="✅ Bot Permission Fix Complete",
             color=discord.Color.green()
         )
-        result_embed.add_field(name="Channels Fixed", value=success_count, inline=True)
-        result_embed.add_field(name="Errors", value=error_count, inline=True)
-        result_embed.add_field(name="Total Channels", value=total_channels, inline=True)
+        result_embed.add_field(name="Channels Fixed", value=stats['updated'], inline=True)
+        result_embed.add_field(name="Already Set", value=stats['unchanged'], inline=True)
+        result_embed.add_field(name="Errors", value=stats['failed'], inline=True)
+        result_embed.add_field(name="Total Channels", value=stats['total'], inline=True)
         result_embed.add_field(
             name="Members Role", 
-            value=f"{'Created' if not discord.utils.get(guild.roles, name='Members') else 'Updated'}: {members_role.mention}",
+            value=f"{'Updated' if members_role_existed else 'Created'}: {members_role.mention}",
             inline=False
         )
         
@@ -108,42 +122,17 @@ class PermissionFixer(commands.Cog):
             await interaction.followup.send("❌ Members role not found. Run `/fix-bot-permissions` first.")
             return
         
-        success_count = 0
-        error_count = 0
-        already_has = 0
+        job_id, total = await self.bot.role_jobs.submit(
+            guild, members_role, "add", interaction.user.id, interaction.channel_id
+        )
         
         embed = discord.Embed(
             title="👥 Assigning Members Role",
-            description=f"Adding {members_role.mention} to all users...",
+            description=f"Adding {members_role.mention} to {total} users in the background as job **#{job_id}**.",
             color=discord.Color.blue()
         )
+        embed.set_footer(text="Check progress with /jobs — a summary is posted here when it finishes")
         await interaction.followup.send(embed=embed)
-        
-        for member in guild.members:
-            if member.bot:
-                continue
-                
-            try:
-                if members_role in member.roles:
-                    already_has += 1
-                else:
-                    await member.add_roles(members_role, reason="Auto-assign Members role")
-                    success_count += 1
-                    
-            except discord.Forbidden:
-                error_count += 1
-            except Exception:
-                error_count += 1
-        
-        result_embed = discord.Embed(
-            title="✅ Members Role Assignment Complete",
-            color=discord.Color.green()
-        )
-        result_embed.add_field(name="Assigned", value=success_count, inline=True)
-        result_embed.add_field(name="Already Had Role", value=already_has, inline=True)
-        result_embed.add_field(name="Errors", value=error_count, inline=True)
-        
-        await interaction.followup.send(embed=result_embed)
 
     @app_commands.command(name="unlock-voice-channels", description="Unlock all voice channels for Members role")
     @app_commands.default_permissions(administrator=True)
@@ -157,9 +146,6 @@ class PermissionFixer(commands.Cog):
             await interaction.followup.send("❌ Members role not found. Run `/fix-bot-permissions` first.")
             return
         
-        success_count = 0
-        error_count = 0
-        
         voice_channels = [ch for ch in guild.channels if isinstance(ch, discord.VoiceChannel)]
         
         embed = discord.Embed(
@@ -167,31 +153,21 @@ class PermissionFixer(commands.Cog):
             description=f"Configuring {len(voice_channels)} voice channels...",
             color=discord.Color.blue()
         )
-        await interaction.followup.send(embed=embed)
+        message = await interaction.followup.send(embed=embed, wait=True)
         
-        for channel in voice_channels:
-            try:
-                await channel.set_permissions(
-                    members_role,
-                    view_channel=True,
-                    connect=True,
-                    speak=True,
-                    use_voice_activation=True,
-                    reason="Unlock voice channel for members"
-                )
-                success_count += 1
-                
-            except discord.Forbidden:
-                error_count += 1
-            except Exception:
-                error_count += 1
+        stats = await self.engine.apply(
+            voice_channels,
+            lambda channel: self.voice_unlock_updates(channel, members_role),
+            reason="Unlock voice channel for members",
+            progress=self.progress_reporter(message, "🔊 Unlocking Voice Channels")
+        )
         
         result_embed = discord.Embed(
             title="✅ Voice Channels Unlocked",
             color=discord.Color.green()
         )
-        result_embed.add_field(name="Unlocked", value=success_count, inline=True)
-        result_embed.add_field(name="Errors", value=error_count, inline=True)
+        result_embed.add_field(name="Unlocked", value=stats['updated'] + stats['unchanged'], inline=True)
+        result_embed.add_field(name="Errors", value=stats['failed'], inline=True)
         result_embed.add_field(name="Total Voice Channels", value=len(voice_channels), inline=True)
         
         await interaction.followup.send(embed=result_embed)
@@ -206,18 +182,31 @@ class PermissionFixer(commands.Cog):
             description="Running all setup commands in sequence...",
             color=discord.Color.gold()
         )
-        await interaction.followup.send(embed=embed)
+        message = await interaction.followup.send(embed=embed, wait=True)
         
-        # Step 1: Fix bot permissions
-        await self.fix_bot_permissions(interaction)
-        await asyncio.sleep(2)
+        guild = interaction.guild
+        members_role = await self.get_members_role(guild)
+        if not members_role:
+            await interaction.followup.send("❌ Cannot create Members role - insufficient permissions")
+            return
         
-        # Step 2: Assign members role
-        await self.assign_members_role(interaction)
-        await asyncio.sleep(2)
+        # Bot access and voice unlock are merged so each channel is edited once
+        def setup_updates(channel):
+            updates = self.bot_access_updates(channel, members_role)
+            if isinstance(channel, discord.VoiceChannel):
+                updates[members_role].update(self.voice_unlock_updates(channel, members_role)[members_role])
+            return updates
+        
+        stats = await self.engine.apply(
+            guild.channels,
+            setup_updates,
+            reason="Complete server setup",
+            progress=self.progress_reporter(message, "🚀 Complete Server Setup")
+        )
         
-        # Step 3: Unlock voice channels
-        await self.unlock_voice_channels(interaction)
+        job_id, total = await self.bot.role_jobs.submit(
+            guild, members_role, "add", interaction.user.id, interaction.channel_id
+        )
         
         final_embed = discord.Embed(
             title="🎉 Server Setup Complete!",
@@ -226,7 +215,17 @@ class PermissionFixer(commands.Cog):
         )
         final_embed.add_field(
             name="✅ Completed Tasks",
-            value="• Bot permissions fixed in all channels\n• Members role created and assigned\n• Voice channels unlocked\n• Bot commands enabled for everyone",
+            value="• Bot permissions fixed in all channels\n• Members role created and queued for assignment\n• Voice channels unlocked\n• Bot commands enabled for everyone",
+            inline=False
+        )
+        final_embed.add_field(
+            name="Channels",
+            value=f"{stats['updated']} updated • {stats['unchanged']} already set • {stats['failed']} errors",
+            inline=False
+        )
+        final_embed.add_field(
+            name="Members Role",
+            value=f"Adding to {total} users as job #{job_id} — see /jobs",
             inline=False
         )
         
@@ -1,14 +1,15 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import json
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 import logging
-import os
-from openai import OpenAI
+import time
+from config.settings import INVITE_TRACKING_SETTINGS
+from utils.llm import get_llm_client
+from utils.capabilities import Capabilities
 import random
 
 class PromotionalContentGenerator:
@@ -16,71 +17,9 @@ class PromotionalContentGenerator:
     
     def __init__(self, bot):
         self.bot = bot
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.db_path = 'promotional_data.db'
+        self.llm = get_llm_client()
+        self.storage = bot.storage.promotion
         
-    async def init_promotional_database(self):
-        """Initialize promotional content database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Generated content tracking
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS generated_content (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    content_type TEXT,
-                    platform TEXT,
-                    content_text TEXT,
-                    hashtags TEXT,
-                    image_prompt TEXT,
-                    generated_at DATETIME,
-                    used BOOLEAN DEFAULT 0,
-                    performance_score REAL DEFAULT 0.0
-                )
-            ''')
-            
-            # Invite tracking
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS invite_tracking (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    inviter_id INTEGER,
-                    invited_user_id INTEGER,
-                    invite_code TEXT,
-                    joined_at DATETIME,
-                    still_member BOOLEAN DEFAULT 1
-                )
-            ''')
-            
-            # Growth campaigns
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS growth_campaigns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    campaign_name TEXT,
-                    campaign_type TEXT,
-                    target_invites INTEGER,
-                    reward_description TEXT,
-                    start_date DATETIME,
-                    end_date DATETIME,
-                    active BOOLEAN DEFAULT 1
-                )
-            ''')
-            
-            # Server highlights
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS server_highlights (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    highlight_type TEXT,
-                    description TEXT,
-                    timestamp DATETIME,
-                    metrics TEXT,
-                    converted_to_promo BOOLEAN DEFAULT 0
-                )
-            ''')
-            
-            await db.commit()
-    
     async def generate_promotional_content(self, guild: discord.Guild, platform: str, content_type: str = "general") -> Dict[str, Any]:
         """Generate AI-powered promotional content for specific platforms"""
         
@@ -91,7 +30,7 @@ class PromotionalContentGenerator:
         prompt = self._create_promotional_prompt(server_context, platform, content_type)
         
         try:
-            response = self.openai_client.chat.completions.create(
+            content = await self.llm.chat(
                 model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
                 messages=[
                     {
@@ -123,7 +62,6 @@ class PromotionalContentGenerator:
                 temperature=0.7
             )
             
-            content = response.choices[0].message.content
             if content:
                 promo_data = json.loads(content)
                 
@@ -139,32 +77,26 @@ class PromotionalContentGenerator:
     
     async def _gather_server_context(self, guild: discord.Guild) -> Dict[str, Any]:
         """Gather comprehensive server context for promotional content"""
+        snapshot = self.bot.snapshots.snapshot(guild)
         context = {
-            'server_name': guild.name,
-            'member_count': guild.member_count,
-            'boost_level': guild.premium_tier,
-            'boost_count': guild.premium_subscription_count or 0,
-            'channel_count': len(guild.text_channels),
-            'voice_channels': len(guild.voice_channels),
-            'roles_count': len(guild.roles),
+            'server_name': snapshot['server_name'],
+            'member_count': snapshot['member_count'],
+            'boost_level': snapshot['boost_level'],
+            'boost_count': snapshot['boost_count'],
+            'channel_count': snapshot['text_channel_count'],
+            'voice_channels': snapshot['voice_channel_count'],
+            'roles_count': snapshot['role_count'],
             'features': []
         }
         
         # Analyze server features
-        if guild.premium_tier > 0:
-            context['features'].append(f"Level {guild.premium_tier} Boosted Server")
-        
-        # Check for special channels
-        special_channels = []
-        for channel in guild.text_channels:
-            if any(keyword in channel.name.lower() for keyword in ['game', 'music', 'art', 'meme', 'event']):
-                special_channels.append(channel.name)
+        if snapshot['boost_level'] > 0:
+            context['features'].append(f"Level {snapshot['boost_level']} Boosted Server")
         
-        context['special_channels'] = special_channels[:5]  # Top 5 special channels
+        context['special_channels'] = list(snapshot['special_channels'][:5])  # Top 5 special channels
         
         # Check for bots and features
-        bot_count = sum(1 for member in guild.members if member.bot)
-        context['bot_features'] = bot_count > 5  # Indicates feature-rich server
+        context['bot_features'] = snapshot['bot_count'] > 5  # Indicates feature-rich server
         
         return context
     
@@ -206,87 +138,137 @@ class PromotionalContentGenerator:
     
     async def _store_generated_content(self, guild_id: int, content_type: str, platform: str, promo_data: Dict):
         """Store generated promotional content"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO generated_content 
-                (guild_id, content_type, platform, content_text, hashtags, image_prompt, generated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                guild_id,
-                content_type,
-                platform,
-                promo_data.get('caption', ''),
-                json.dumps(promo_data.get('hashtags', [])),
-                promo_data.get('image_prompt', ''),
-                datetime.now(timezone.utc)
-            ))
-            await db.commit()
+        await self.storage.store_generated_content(guild_id, content_type, platform, promo_data)
     
-    async def generate_dalle_image(self, image_prompt: str) -> Optional[str]:
-        """Generate promotional image using DALL-E"""
-        try:
-            response = self.openai_client.images.generate(
-                model="dall-e-3",
-                prompt=f"Professional Discord server promotional image: {image_prompt}",
-                size="1024x1024",
-                quality="standard",
-                n=1
-            )
-            return response.data[0].url
-        except Exception as e:
-            logging.error(f"DALL-E image generation failed: {e}")
-            return None
-
 class InviteTracker:
     """Advanced invite tracking and growth gamification"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = 'promotional_data.db'
+        self.storage = bot.storage.promotion
+        # guild_id -> {code: [uses, max_uses, inviter_id]}, kept current by invite events
         self.invite_cache = {}
+        # guild_id -> codes deleted right after reaching max_uses, i.e. probably just used by a join
+        self.exhausted_invites = {}
+        # guild_id -> members waiting for the next attribution pass
+        self.pending_joins = {}
     
     async def setup_invite_tracking(self, guild: discord.Guild):
         """Setup invite tracking for a guild"""
         try:
             invites = await guild.invites()
-            self.invite_cache[guild.id] = {invite.code: invite.uses for invite in invites}
+            self.invite_cache[guild.id] = {
+                invite.code: [invite.uses or 0, invite.max_uses or 0, invite.inviter.id if invite.inviter else None]
+                for invite in invites
+            }
         except discord.Forbidden:
             logging.warning(f"Missing permissions to view invites in {guild.name}")
+        except discord.HTTPException as e:
+            logging.warning(f"Could not load invites for {guild.name}: {e}")
+    
+    async def warm_up(self, guilds):
+        """Load the invites of every guild, a few requests at a time"""
+        slots = asyncio.Semaphore(INVITE_TRACKING_SETTINGS['warmup_concurrency'])
+        
+        async def load(guild):
+            async with slots:
+                await self.setup_invite_tracking(guild)
+        
+        await asyncio.gather(*(load(guild) for guild in guilds))
+    
+    def invite_created(self, invite: discord.Invite):
+        cache = self.invite_cache.get(invite.guild.id)
+        if cache is not None:
+            cache[invite.code] = [invite.uses or 0, invite.max_uses or 0, invite.inviter.id if invite.inviter else None]
+    
+    def invite_deleted(self, invite: discord.Invite):
+        cache = self.invite_cache.get(invite.guild.id)
+        if cache is None:
+            return
+        cached = cache.pop(invite.code, None)
+        if cached and cached[1] and cached[0] + 1 >= cached[1]:
+            self.exhausted_invites.setdefault(invite.guild.id, []).append((invite.code, cached[2], time.monotonic()))
     
     async def track_new_member(self, member: discord.Member):
-        """Track which invite was used for new member"""
+        """Track which invite was used for new member.
+        
+        Joins landing within ``join_coalesce_window`` seconds of each other
+        share one attribution pass, which gives the matching on_invite_delete
+        time to arrive for single-use invites.
+        """
         guild = member.guild
+        if guild.id not in self.invite_cache:
+            return
         
+        joins = self.pending_joins.setdefault(guild.id, [])
+        joins.append(member)
+        if len(joins) == 1:
+            await asyncio.sleep(INVITE_TRACKING_SETTINGS['join_coalesce_window'])
+            await self._attribute_joins(guild)
+    
+    async def _attribute_joins(self, guild: discord.Guild):
+        members = self.pending_joins.pop(guild.id, [])
+        # Only deletions around these joins; older ones were expired or revoked invites
+        horizon = time.monotonic() - 2 * INVITE_TRACKING_SETTINGS['join_coalesce_window']
+        exhausted = [
+            (code, inviter_id) for code, inviter_id, deleted_at in self.exhausted_invites.pop(guild.id, [])
+            if deleted_at >= horizon
+        ]
+        cache = self.invite_cache.get(guild.id)
+        if not members or cache is None:
+            return
+        
+        # Invites that explain the joins without a REST fetch
+        if len(members) == 1 and len(exhausted) == 1:
+            await self._credit(guild, members, *exhausted[0])
+            return
+        can_use_other_paths = 'VANITY_URL' in guild.features or 'DISCOVERABLE' in guild.features
+        if len(members) == 1 and not exhausted and len(cache) == 1 and not can_use_other_paths:
+            code, cached = next(iter(cache.items()))
+            cached[0] += 1
+            await self._credit(guild, members, code, cached[2])
+            return
+        
+        # Ambiguous: diff a fresh fetch against the cache
         try:
             current_invites = await guild.invites()
-            cached_invites = self.invite_cache.get(guild.id, {})
-            
-            # Find which invite was used
-            for invite in current_invites:
-                cached_uses = cached_invites.get(invite.code, 0)
-                if invite.uses > cached_uses:
-                    # This invite was used
-                    await self._record_invite_use(guild.id, invite.inviter.id, member.id, invite.code)
-                    await self._update_inviter_rewards(guild, invite.inviter)
-                    
-                    # Update cache
-                    cached_invites[invite.code] = invite.uses
-                    break
-            
-            self.invite_cache[guild.id] = {invite.code: invite.uses for invite in current_invites}
-            
-        except discord.Forbidden:
-            logging.warning(f"Cannot track invites in {guild.name} - missing permissions")
+        except discord.HTTPException as e:
+            logging.warning(f"Cannot track invites in {guild.name}: {e}")
+            return
+        
+        used = [(code, inviter_id) for code, inviter_id in exhausted]
+        for invite in current_invites:
+            cached_uses = cache.get(invite.code, [0])[0]
+            if invite.uses and invite.uses > cached_uses and invite.inviter:
+                used.extend([(invite.code, invite.inviter.id)] * (invite.uses - cached_uses))
+        self.invite_cache[guild.id] = {
+            invite.code: [invite.uses or 0, invite.max_uses or 0, invite.inviter.id if invite.inviter else None]
+            for invite in current_invites
+        }
+        
+        if len({code for code, _ in used}) == 1:
+            await self._credit(guild, members[:len(used)], *used[0])
+        elif used:
+            logging.info(f"Could not tell which of {len(used)} invite uses belong to {len(members)} joins in {guild.name}")
+    
+    async def _credit(self, guild: discord.Guild, members: List[discord.Member], invite_code: str, inviter_id: Optional[int]):
+        """Record joins through one invite and update the inviter's rewards"""
+        if inviter_id is None:
+            return
+        for member in members:
+            await self._record_invite_use(guild.id, inviter_id, member.id, invite_code)
+        inviter = guild.get_member(inviter_id)
+        if inviter is None:
+            # Member lists are not cached unless a guild was chunked
+            try:
+                inviter = await guild.fetch_member(inviter_id)
+            except discord.HTTPException:
+                return
+        await self._update_inviter_rewards(guild, inviter)
     
     async def _record_invite_use(self, guild_id: int, inviter_id: int, invited_user_id: int, invite_code: str):
         """Record invite usage in database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO invite_tracking 
-                (guild_id, inviter_id, invited_user_id, invite_code, joined_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (guild_id, inviter_id, invited_user_id, invite_code, datetime.now(timezone.utc)))
-            await db.commit()
+        await self.storage.record_invite(guild_id, inviter_id, invited_user_id, invite_code)
     
     async def _update_inviter_rewards(self, guild: discord.Guild, inviter: discord.Member):
         """Update rewards for successful inviter"""
@@ -331,29 +313,17 @@ class InviteTracker:
     
     async def get_user_invite_count(self, guild_id: int, user_id: int) -> int:
         """Get total invite count for a user"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('''
-                SELECT COUNT(*) FROM invite_tracking 
-                WHERE guild_id = ? AND inviter_id = ? AND still_member = 1
-            ''', (guild_id, user_id))
-            result = await cursor.fetchone()
-            return result[0] if result else 0
+        return await self.storage.invite_count(guild_id, user_id)
     
     async def get_invite_leaderboard(self, guild_id: int, limit: int = 10) -> List[tuple]:
-        """Get invite leaderboard for guild"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('''
-                SELECT inviter_id, COUNT(*) as invite_count
-                FROM invite_tracking 
-                WHERE guild_id = ? AND still_member = 1
-                GROUP BY inviter_id
-                ORDER BY invite_count DESC
-                LIMIT ?
-            ''', (guild_id, limit))
-            return await cursor.fetchall()
+        """Get invite leaderboard for guild with each inviter's XP"""
+        return await self.storage.inviters_with_xp(guild_id, limit)
 
 class PromotionalEngine(commands.Cog):
     """Comprehensive promotional and growth system"""
+
+    # Invite attribution of new members
+    capabilities = Capabilities(intents=('members', 'invites'))
     
     def __init__(self, bot):
         self.bot = bot
@@ -362,11 +332,15 @@ class PromotionalEngine(commands.Cog):
         
     async def cog_load(self):
         """Initialize promotional systems"""
-        await self.content_generator.init_promotional_database()
-        
-        # Setup invite tracking for all guilds
-        for guild in self.bot.guilds:
-            await self.invite_tracker.setup_invite_tracking(guild)
+        # Invites are fetched once the guild list is known
+        self.warm_up_task = asyncio.create_task(self.warm_up_invites())
+    
+    async def cog_unload(self):
+        self.warm_up_task.cancel()
+    
+    async def warm_up_invites(self):
+        await self.bot.wait_until_ready()
+        await self.invite_tracker.warm_up(self.bot.guilds)
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -378,6 +352,14 @@ class PromotionalEngine(commands.Cog):
         """Setup invite tracking for new guilds"""
         await self.invite_tracker.setup_invite_tracking(guild)
     
+    @commands.Cog.listener()
+    async def on_invite_create(self, invite):
+        self.invite_tracker.invite_created(invite)
+    
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite):
+        self.invite_tracker.invite_deleted(invite)
+    
     @app_commands.command(name="promote", description="Generate AI-powered promotional content for social media")
     @app_commands.describe(
         platform="Social media platform (reddit, tiktok, twitter, instagram)",
@@ -478,11 +460,11 @@ class PromotionalEngine(commands.Cog):
                 leaderboard_text = ""
                 medals = ["🥇", "🥈", "🥉"]
                 
-                for i, (user_id, invite_count) in enumerate(leaderboard):
+                for i, (user_id, invite_count, xp) in enumerate(leaderboard):
                     user = interaction.guild.get_member(user_id)
                     username = user.display_name if user else f"User {user_id}"
                     medal = medals[i] if i < 3 else "🏅"
-                    leaderboard_text += f"{medal} **{username}**: {invite_count} invites\n"
+                    leaderboard_text += f"{medal} **{username}**: {invite_count} invites ({xp:,} XP)\n"
                 
                 embed.description = leaderboard_text
             
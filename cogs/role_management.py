@@ -2,10 +2,27 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
+from utils.capabilities import Capabilities
+
 class RoleManagement(commands.Cog):
+    # Member lists are loaded on demand and kept current from then on
+    capabilities = Capabilities(intents=('members',), member_cache=('joined',))
+
     def __init__(self, bot):
         self.bot = bot
 
+    async def ensure_members_cached(self, interaction: discord.Interaction):
+        """Load the member list of a guild that was not chunked at startup, deferring the response meanwhile"""
+        if not interaction.guild.chunked:
+            await interaction.response.defer()
+            await interaction.guild.chunk()
+
+    async def respond(self, interaction: discord.Interaction, embed: discord.Embed):
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed)
+        else:
+            await interaction.response.send_message(embed=embed)
+
     @app_commands.command(name="role-add", description="Add a role to a user")
     @app_commands.describe(user="User to give the role to", role="Role to add")
     @app_commands.default_permissions(manage_roles=True)
@@ -73,45 +90,50 @@ class RoleManagement(commands.Cog):
             return
         
         await interaction.response.defer()
-        
-        success_count = 0
-        error_count = 0
-        total_members = len([m for m in interaction.guild.members if not m.bot])
+        job_id, total = await self.bot.role_jobs.submit(
+            interaction.guild, role, action, interaction.user.id, interaction.channel_id
+        )
         
         embed = discord.Embed(
             title="🔄 Processing Role Changes",
-            description=f"{'Adding' if action == 'add' else 'Removing'} {role.mention} {'to' if action == 'add' else 'from'} all members...",
+            description=f"{'Adding' if action == 'add' else 'Removing'} {role.mention} {'to' if action == 'add' else 'from'} {total} members in the background as job **#{job_id}**.",
             color=discord.Color.blue()
         )
+        embed.set_footer(text="Check progress with /jobs — a summary is posted here when it finishes")
         await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="jobs", description="Show background mass role jobs in this server")
+    @app_commands.default_permissions(manage_roles=True)
+    async def jobs(self, interaction: discord.Interaction):
+        jobs = await self.bot.storage.role_jobs.for_guild(interaction.guild.id)
+        if not jobs:
+            await interaction.response.send_message("No role jobs have run in this server.", ephemeral=True)
+            return
         
-        for member in interaction.guild.members:
-            if member.bot:
-                continue
-                
-            try:
-                if action == "add" and role not in member.roles:
-                    await member.add_roles(role, reason=f"Mass role assignment by {interaction.user}")
-                    success_count += 1
-                elif action == "remove" and role in member.roles:
-                    await member.remove_roles(role, reason=f"Mass role removal by {interaction.user}")
-                    success_count += 1
-            except:
-                error_count += 1
-        
-        result_embed = discord.Embed(
-            title="✅ Role Operation Complete",
-            color=discord.Color.green()
-        )
-        result_embed.add_field(name="Successful", value=success_count, inline=True)
-        result_embed.add_field(name="Errors", value=error_count, inline=True)
-        result_embed.add_field(name="Total Members", value=total_members, inline=True)
+        status_icons = {'pending': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌'}
+        embed = discord.Embed(title="🗂️ Role Jobs", color=discord.Color.blue())
+        for job in jobs:
+            role = interaction.guild.get_role(job['role_id'])
+            # Running jobs report live counters, the rest their last checkpoint
+            live = self.bot.role_jobs.progress.get(job['id'])
+            succeeded = live['succeeded'] if live else job['succeeded']
+            failed = live['failed'] if live else job['failed']
+            value = (
+                f"{'Add' if job['action'] == 'add' else 'Remove'} {role.mention if role else 'deleted role'}\n"
+                f"{succeeded + failed}/{job['total']} done • {failed} errors • started <t:{int(job['created_at'])}:R>"
+            )
+            embed.add_field(
+                name=f"{status_icons.get(job['status'], '•')} Job #{job['id']} — {job['status']}",
+                value=value,
+                inline=False
+            )
         
-        await interaction.followup.send(embed=result_embed)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="role-info", description="Get information about a role")
     @app_commands.describe(role="Role to get information about")
     async def role_info(self, interaction: discord.Interaction, role: discord.Role):
+        await self.ensure_members_cached(interaction)
         embed = discord.Embed(
             title=f"📋 Role Information: {role.name}",
             color=role.color if role.color != discord.Color.default() else discord.Color.blue()
@@ -127,10 +149,11 @@ class RoleManagement(commands.Cog):
         if role.permissions.administrator:
             embed.add_field(name="⚠️ Administrator", value="This role has administrator permissions", inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        await self.respond(interaction, embed)
 
     @app_commands.command(name="role-list", description="List all roles in the server")
     async def role_list(self, interaction: discord.Interaction):
+        await self.ensure_members_cached(interaction)
         roles = sorted(interaction.guild.roles, key=lambda r: r.position, reverse=True)
         
         embed = discord.Embed(
@@ -150,7 +173,7 @@ class RoleManagement(commands.Cog):
         embed.description = role_text
         embed.set_footer(text=f"Total roles: {len(roles)-1}")  # -1 to exclude @everyone
         
-        await interaction.response.send_message(embed=embed)
+        await self.respond(interaction, embed)
 
 async def setup(bot):
     await bot.add_cog(RoleManagement(bot))
\ No newline at end of file
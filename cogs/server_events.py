@@ -4,44 +4,86 @@ from discord import app_commands
 from datetime import datetime, timezone
 import logging
 
+from config.settings import MEMBER_EVENT_SETTINGS
+from utils.batching import BurstCoalescer
+from utils.capabilities import Capabilities
+
+# Category holding the welcome/leaves/boosts channels
+WELCOME_CATEGORY_ID = 1377685666972041296
+
+# Event channel name -> topic used when the bot has to create it
+EVENT_CHANNELS = {
+    "welcome": "👋 New members join here",
+    "leaves": "👋 Member departures logged here",
+    "boosts": "🚀 Server boosts celebrated here"
+}
+
 class ServerEvents(commands.Cog):
+    # Join, leave and boost announcements. Boosts are seen through on_member_update,
+    # which only fires for cached members, so guilds with a boosts channel are chunked
+    capabilities = Capabilities(intents=('members',), member_cache=('joined',))
+
     def __init__(self, bot):
         self.bot = bot
         self.welcome_channel = None
+        # guild_id -> {channel name: channel or None}, kept current by the channel listeners
+        self.channel_maps = {}
+        # Joins and leaves above the burst rate are announced together per (guild_id, channel name)
+        self.announcements = BurstCoalescer(
+            self.send_batched_announcement,
+            threshold=MEMBER_EVENT_SETTINGS['burst_threshold'],
+            window=MEMBER_EVENT_SETTINGS['burst_window'],
+            interval=MEMBER_EVENT_SETTINGS['batch_interval']
+        )
+
+    async def cog_unload(self):
+        await self.announcements.close()
+
+    def index_channels(self, guild):
+        """Resolve the event channels of a guild from the local cache (no REST calls)"""
+        category = guild.get_channel(WELCOME_CATEGORY_ID)
+        channels = {
+            name: discord.utils.get(category.channels, name=name) if category else None
+            for name in EVENT_CHANNELS
+        }
+        self.channel_maps[guild.id] = channels
+        return channels
+
+    async def watch_boosts(self, guild):
+        """Load the member list of a guild that announces boosts, so every booster is cached"""
+        if self.get_event_channel(guild, "boosts") and not guild.chunked:
+            await guild.chunk()
+
+    def get_event_channel(self, guild, name):
+        """Cached event channel lookup for the member event hot path"""
+        channels = self.channel_maps.get(guild.id)
+        if channels is None:
+            channels = self.index_channels(guild)
+        return channels[name]
+
+    def affects_event_channels(self, channel):
+        return channel.id == WELCOME_CATEGORY_ID or (
+            channel.category_id == WELCOME_CATEGORY_ID and channel.name in EVENT_CHANNELS
+        )
         
     async def setup_channels(self, guild):
         """Setup welcome, leaves, and boosts channels in specified category"""
         try:
-            # Use the specific category ID
-            category_id = 1377685666972041296
-            category = guild.get_channel(category_id)
+            category = guild.get_channel(WELCOME_CATEGORY_ID)
+            channels = self.index_channels(guild)
             
             if not category:
-                logging.warning(f"Category with ID {category_id} not found in {guild.name}")
+                logging.warning(f"Category with ID {WELCOME_CATEGORY_ID} not found in {guild.name}")
                 return None, None, None
             
-            # Create/find welcome channel
-            welcome_channel = discord.utils.get(category.channels, name="welcome")
-            if not welcome_channel:
-                welcome_channel = await guild.create_text_channel("welcome", category=category, 
-                    topic="👋 New members join here")
-                print(f"Created 'welcome' channel in {guild.name}")
-            
-            # Create/find leaves channel  
-            leaves_channel = discord.utils.get(category.channels, name="leaves")
-            if not leaves_channel:
-                leaves_channel = await guild.create_text_channel("leaves", category=category,
-                    topic="👋 Member departures logged here")
-                print(f"Created 'leaves' channel in {guild.name}")
-                
-            # Create/find boosts channel
-            boosts_channel = discord.utils.get(category.channels, name="boosts")
-            if not boosts_channel:
-                boosts_channel = await guild.create_text_channel("boosts", category=category,
-                    topic="🚀 Server boosts celebrated here")
-                print(f"Created 'boosts' channel in {guild.name}")
+            # Create whichever of welcome/leaves/boosts is missing
+            for name, topic in EVENT_CHANNELS.items():
+                if not channels[name]:
+                    channels[name] = await guild.create_text_channel(name, category=category, topic=topic)
+                    print(f"Created '{name}' channel in {guild.name}")
             
-            return welcome_channel, leaves_channel, boosts_channel
+            await self.watch_boosts(guild)
+            return channels["welcome"], channels["leaves"], channels["boosts"]
             
         except discord.Forbidden:
             logging.warning(f"Missing permissions to create channels in {guild.name}")
@@ -61,13 +103,36 @@ class ServerEvents(commands.Cog):
         """Setup channels when joining new guild"""
         await self.setup_channels(guild)
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.channel_maps.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if self.affects_event_channels(channel):
+            self.index_channels(channel.guild)
+            await self.watch_boosts(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self.affects_event_channels(channel):
+            self.index_channels(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        # Renames and moves in or out of the category change which channel is used
+        if self.affects_event_channels(before) or self.affects_event_channels(after):
+            self.index_channels(after.guild)
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Send welcome message when member joins"""
         try:
-            welcome_channel, _, _ = await self.setup_channels(member.guild)
+            welcome_channel = self.get_event_channel(member.guild, "welcome")
             if not welcome_channel:
                 return
+            if not self.announcements.add((member.guild.id, "welcome"), member.mention):
+                return
                 
             # Get user avatar with fallback
             avatar_url = member.avatar.url if member.avatar else member.default_avatar.url
@@ -88,12 +153,18 @@ class ServerEvents(commands.Cog):
             logging.error(f"Error sending welcome message: {e}")
 
     @commands.Cog.listener()
-    async def on_member_remove(self, member):
-        """Send leave message when member leaves"""
+    async def on_raw_member_remove(self, payload):
+        """Send leave message when member leaves, whether or not they were cached"""
         try:
-            _, leave_channel, _ = await self.setup_channels(member.guild)
+            guild = self.bot.get_guild(payload.guild_id)
+            if not guild:
+                return
+            member = payload.user
+            leave_channel = self.get_event_channel(guild, "leaves")
             if not leave_channel:
                 return
+            if not self.announcements.add((guild.id, "leaves"), member.name):
+                return
                 
             # Get user avatar with fallback
             avatar_url = member.avatar.url if member.avatar else member.default_avatar.url
@@ -108,18 +179,56 @@ class ServerEvents(commands.Cog):
             embed.set_footer(text=f"Left on {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC")
             
             await leave_channel.send(embed=embed)
-            print(f"User left: {member.name} from {member.guild.name}")
+            print(f"User left: {member.name} from {guild.name}")
             
         except Exception as e:
             logging.error(f"Error sending leave message: {e}")
 
+    async def send_batched_announcement(self, key, names):
+        """Announce a burst of joins or leaves in a single embed"""
+        guild_id, channel_name = key
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+        channel = self.get_event_channel(guild, channel_name)
+        if not channel:
+            return
+        
+        max_names = MEMBER_EVENT_SETTINGS['batch_max_names']
+        shown = names[:max_names]
+        if channel_name == "leaves":
+            shown = [f"**{name}**" for name in shown]
+        listed = ", ".join(shown)
+        if len(names) > max_names:
+            listed += f" and {len(names) - max_names} more"
+        
+        if channel_name == "welcome":
+            embed = discord.Embed(
+                title=f"{len(names)} New Arrivals 🚀",
+                description=f"Yoooo welcome in {listed}",
+                color=0x57F287,  # Discord green
+                timestamp=datetime.now(timezone.utc)
+            )
+        else:
+            embed = discord.Embed(
+                title=f"{len(names)} Departures 🌿",
+                description=f"{listed} went to go touch some grass",
+                color=0xED4245,  # Discord red
+                timestamp=datetime.now(timezone.utc)
+            )
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+        
+        await channel.send(embed=embed)
+        print(f"Announced {len(names)} batched {channel_name} events in {guild.name}")
+
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
         """Detect server boosts"""
         try:
             # Check if user started boosting
             if before.premium_since is None and after.premium_since is not None:
-                _, _, boost_channel = await self.setup_channels(after.guild)
+                boost_channel = self.get_event_channel(after.guild, "boosts")
                 if not boost_channel:
                     return
                     
@@ -2,11 +2,15 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
-import aiosqlite
-from datetime import datetime, timedelta
+import time as clock
 import random
 
+from utils.capabilities import Capabilities
+
 class Utility(commands.Cog):
+    # Online count in /membercount
+    capabilities = Capabilities(optional_intents=('presences',))
+
     def __init__(self, bot):
         self.bot = bot
 
@@ -17,14 +21,10 @@ class Utility(commands.Cog):
             await interaction.response.send_message("Time must be between 1 minute and 7 days (10080 minutes)!", ephemeral=True)
             return
             
-        remind_time = datetime.now() + timedelta(minutes=time)
-        
-        async with aiosqlite.connect('ultrabot.db') as db:
-            await db.execute('''
-                INSERT INTO reminders (user_id, guild_id, channel_id, message, remind_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (interaction.user.id, interaction.guild.id, interaction.channel.id, message, remind_time))
-            await db.commit()
+        await self.bot.scheduler.schedule_reminder(
+            interaction.user.id, interaction.guild.id, interaction.channel.id, message,
+            clock.time() + time * 60
+        )
         
         embed = discord.Embed(
             title="⏰ Reminder Set",
@@ -159,6 +159,23 @@ class Utility(commands.Cog):
         except discord.Forbidden:
             await interaction.response.send_message("I don't have permission to send messages in that channel!", ephemeral=True)
 
+    @app_commands.command(name="schedule-message", description="Send a message to a channel later")
+    @app_commands.describe(minutes="Minutes from now", message="Message to send", channel="Channel to send to")
+    @app_commands.default_permissions(manage_messages=True)
+    async def schedule_message(self, interaction: discord.Interaction, minutes: int, message: str, channel: discord.TextChannel = None):
+        if minutes <= 0 or minutes > 43200:  # Max 30 days
+            await interaction.response.send_message("Time must be between 1 minute and 30 days (43200 minutes)!", ephemeral=True)
+            return
+
+        target_channel = channel or interaction.channel
+        send_at = clock.time() + minutes * 60
+        await self.bot.scheduler.schedule_message(
+            interaction.guild.id, target_channel.id, message, send_at, interaction.user.id
+        )
+        await interaction.response.send_message(
+            f"Message scheduled for {target_channel.mention} <t:{int(send_at)}:R>.", ephemeral=True
+        )
+
     @app_commands.command(name="embed", description="Create an embed message")
     @app_commands.describe(title="Embed title", description="Embed description", color="Hex color code")
     @app_commands.default_permissions(manage_messages=True)
@@ -185,11 +202,11 @@ class Utility(commands.Cog):
 
     @app_commands.command(name="membercount", description="Get server member count")
     async def membercount(self, interaction: discord.Interaction):
-        guild = interaction.guild
-        total = guild.member_count
-        online = sum(1 for member in guild.members if member.status != discord.Status.offline)
-        bots = sum(1 for member in guild.members if member.bot)
-        humans = total - bots
+        snapshot = self.bot.snapshots.snapshot(interaction.guild)
+        total = snapshot['member_count']
+        online = snapshot['online_count']
+        bots = snapshot['bot_count']
+        humans = snapshot['human_count']
         
         embed = discord.Embed(
             title="👥 Member Count",
@@ -198,7 +215,7 @@ class Utility(commands.Cog):
         embed.add_field(name="Total Members", value=total, inline=True)
         embed.add_field(name="Humans", value=humans, inline=True)
         embed.add_field(name="Bots", value=bots, inline=True)
-        embed.add_field(name="Online", value=online, inline=True)
+        embed.add_field(name="Online", value=online if online is not None else "Unknown", inline=True)
         
         await interaction.response.send_message(embed=embed)
 
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import json
 import asyncio
 from datetime import datetime, timedelta, timezone
@@ -13,79 +12,17 @@ import aiohttp
 import aiofiles
 from pathlib import Path
 import random
+from utils.llm import get_llm_client
 
 class ViralContentScraper:
     """Advanced viral content discovery and downloading system"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = 'viral_content.db'
+        self.storage = bot.storage.viral
         self.download_dir = 'viral_streamer_clips'
         self.supported_platforms = ['twitter', 'youtube', 'twitch']
         
-    async def init_content_database(self):
-        """Initialize viral content tracking database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Downloaded content tracking
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS downloaded_content (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    platform TEXT,
-                    original_url TEXT UNIQUE,
-                    local_path TEXT,
-                    title TEXT,
-                    engagement_score INTEGER,
-                    download_date DATETIME,
-                    uploaded_to_tiktok BOOLEAN DEFAULT 0,
-                    caption_used TEXT,
-                    performance_metrics TEXT
-                )
-            ''')
-            
-            # Content search keywords
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS search_keywords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    keyword TEXT,
-                    platform TEXT,
-                    min_engagement INTEGER DEFAULT 100,
-                    active BOOLEAN DEFAULT 1
-                )
-            ''')
-            
-            # Upload queue
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS upload_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    content_id INTEGER,
-                    scheduled_time DATETIME,
-                    custom_caption TEXT,
-                    status TEXT DEFAULT 'pending',
-                    upload_attempt_count INTEGER DEFAULT 0,
-                    FOREIGN KEY (content_id) REFERENCES downloaded_content (id)
-                )
-            ''')
-            
-            # Performance tracking
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS content_performance (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content_id INTEGER,
-                    views INTEGER DEFAULT 0,
-                    likes INTEGER DEFAULT 0,
-                    shares INTEGER DEFAULT 0,
-                    comments INTEGER DEFAULT 0,
-                    engagement_rate REAL DEFAULT 0.0,
-                    tracked_date DATETIME,
-                    FOREIGN KEY (content_id) REFERENCES downloaded_content (id)
-                )
-            ''')
-            
-            await db.commit()
-    
     async def search_viral_content(self, platform: str, keywords: List[str], min_engagement: int = 100) -> List[Dict]:
         """Search for viral content on specified platform"""
         results = []
@@ -185,21 +122,7 @@ class ViralContentScraper:
     
     async def store_downloaded_content(self, guild_id: int, content_data: Dict, local_path: str):
         """Store downloaded content information in database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT OR REPLACE INTO downloaded_content 
-                (guild_id, platform, original_url, local_path, title, engagement_score, download_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                guild_id,
-                content_data.get('platform', 'unknown'),
-                content_data.get('url', ''),
-                local_path,
-                content_data.get('title', ''),
-                content_data.get('engagement', 0),
-                datetime.now(timezone.utc)
-            ))
-            await db.commit()
+        await self.storage.store_downloaded_content(guild_id, content_data, local_path)
 
 class TikTokUploader:
     """TikTok upload automation using browser automation"""
@@ -281,9 +204,6 @@ if __name__ == "__main__":
     async def generate_custom_caption(self, content_data: Dict) -> str:
         """Generate AI-powered custom caption for content"""
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            
             prompt = f"""Create a viral TikTok caption for this gaming/streamer content:
             
             Title: {content_data.get('title', 'Gaming clip')}
@@ -299,14 +219,14 @@ if __name__ == "__main__":
             
             Return just the caption text."""
             
-            response = client.chat.completions.create(
+            response = await get_llm_client().chat(
+                [{"role": "user", "content": prompt}],
                 model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
                 max_tokens=100,
                 temperature=0.8
             )
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
             
         except Exception as e:
             logging.error(f"Caption generation failed: {e}")
@@ -322,7 +242,6 @@ class ViralContentAutomation(commands.Cog):
         
     async def cog_load(self):
         """Initialize the viral content system"""
-        await self.scraper.init_content_database()
         # Start automated content discovery
         # self.daily_content_discovery.start()  # Uncomment to enable automation
     
@@ -480,52 +399,41 @@ class ViralContentAutomation(commands.Cog):
         
         try:
             # Find matching content in database
-            async with aiosqlite.connect(self.scraper.db_path) as db:
-                cursor = await db.execute('''
-                    SELECT * FROM downloaded_content 
-                    WHERE guild_id = ? AND title LIKE ? 
-                    ORDER BY download_date DESC LIMIT 1
-                ''', (interaction.guild.id, f'%{content_title}%'))
-                
-                content_row = await cursor.fetchone()
-                
-                if not content_row:
-                    await interaction.followup.send(f"No downloaded content found matching: {content_title}", ephemeral=True)
-                    return
-                
-                # Get column names
-                columns = [description[0] for description in cursor.description]
-                content_data = dict(zip(columns, content_row))
-                
-                # Generate custom caption
-                caption = await self.uploader.generate_custom_caption(content_data)
-                
-                # Generate upload script
-                script = await self.uploader.prepare_upload_script(content_data['local_path'], caption)
-                
-                # Save script to file
-                script_filename = f"tiktok_upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
-                script_path = os.path.join(self.scraper.download_dir, str(interaction.guild.id), script_filename)
-                
-                os.makedirs(os.path.dirname(script_path), exist_ok=True)
-                with open(script_path, 'w') as f:
-                    f.write(script)
-                
-                embed = discord.Embed(
-                    title="🎬 TikTok Upload Script Generated",
-                    color=0xff6b6b,
-                    timestamp=datetime.now(timezone.utc)
-                )
-                embed.add_field(name="Content", value=content_data['title'], inline=False)
-                embed.add_field(name="Generated Caption", value=caption, inline=False)
-                embed.add_field(name="Script Path", value=script_path, inline=False)
-                embed.add_field(
-                    name="Instructions", 
-                    value="1. Install playwright: `pip install playwright`\n2. Run: `python " + script_filename + "`\n3. Login to TikTok when prompted\n4. Script will handle the upload", 
-                    inline=False
-                )
-                
-                await interaction.followup.send(embed=embed)
+            content_data = await self.scraper.storage.find_by_title(interaction.guild.id, content_title)
+            
+            if not content_data:
+                await interaction.followup.send(f"No downloaded content found matching: {content_title}", ephemeral=True)
+                return
+            
+            # Generate custom caption
+            caption = await self.uploader.generate_custom_caption(content_data)
+            
+            # Generate upload script
+            script = await self.uploader.prepare_upload_script(content_data['local_path'], caption)
+            
+            # Save script to file
+            script_filename = f"tiktok_upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
+            script_path = os.path.join(self.scraper.download_dir, str(interaction.guild.id), script_filename)
+            
+            os.makedirs(os.path.dirname(script_path), exist_ok=True)
+            with open(script_path, 'w') as f:
+                f.write(script)
+            
+            embed = discord.Embed(
+                title="🎬 TikTok Upload Script Generated",
+                color=0xff6b6b,
+                timestamp=datetime.now(timezone.utc)
+            )
+            embed.add_field(name="Content", value=content_data['title'], inline=False)
+            embed.add_field(name="Generated Caption", value=caption, inline=False)
+            embed.add_field(name="Script Path", value=script_path, inline=False)
+            embed.add_field(
+                name="Instructions", 
+                value="1. Install playwright: `pip install playwright`\n2. Run: `python " + script_filename + "`\n3. Login to TikTok when prompted\n4. Script will handle the upload", 
+                inline=False
+            )
+            
+            await interaction.followup.send(embed=embed)
             
         except Exception as e:
             await interaction.followup.send(f"Script generation failed: {e}", ephemeral=True)
@@ -602,35 +510,27 @@ class ViralContentAutomation(commands.Cog):
         await interaction.response.defer()
         
         try:
-            async with aiosqlite.connect(self.scraper.db_path) as db:
-                cursor = await db.execute('''
-                    SELECT title, platform, engagement_score, download_date, uploaded_to_tiktok
-                    FROM downloaded_content 
-                    WHERE guild_id = ?
-                    ORDER BY download_date DESC LIMIT 10
-                ''', (interaction.guild.id,))
-                
-                content_list = await cursor.fetchall()
-                
-                if not content_list:
-                    await interaction.followup.send("No content downloaded yet. Use `/search-viral-content` to get started!", ephemeral=True)
-                    return
-                
-                embed = discord.Embed(
-                    title="📚 Viral Content Library",
-                    color=0x9932cc,
-                    timestamp=datetime.now(timezone.utc)
+            content_list = await self.scraper.storage.library(interaction.guild.id, 10)
+            
+            if not content_list:
+                await interaction.followup.send("No content downloaded yet. Use `/search-viral-content` to get started!", ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title="📚 Viral Content Library",
+                color=0x9932cc,
+                timestamp=datetime.now(timezone.utc)
+            )
+            
+            for i, (title, platform, engagement, date, uploaded) in enumerate(content_list, 1):
+                status = "✅ Uploaded" if uploaded else "📁 Ready"
+                embed.add_field(
+                    name=f"{i}. {title[:50]}",
+                    value=f"**Platform:** {platform}\n**Engagement:** {engagement}\n**Status:** {status}",
+                    inline=True
                 )
-                
-                for i, (title, platform, engagement, date, uploaded) in enumerate(content_list, 1):
-                    status = "✅ Uploaded" if uploaded else "📁 Ready"
-                    embed.add_field(
-                        name=f"{i}. {title[:50]}",
-                        value=f"**Platform:** {platform}\n**Engagement:** {engagement}\n**Status:** {status}",
-                        inline=True
-                    )
-                
-                await interaction.followup.send(embed=embed)
+            
+            await interaction.followup.send(embed=embed)
             
         except Exception as e:
             await interaction.followup.send(f"Library access failed: {e}", ephemeral=True)
@@ -250,7 +250,93 @@ LEVELING_SETTINGS = {
             100: 'Level 100'
         }
     },
-    'blacklisted_channels': []
+    'blacklisted_channels': [],
+    'xp_flush_interval': 10.0,  # seconds accumulated XP may wait before it is written
+    'xp_flush_max_users': 500  # pending users that trigger an early flush
+}
+
+# Welcome and leave announcements
+MEMBER_EVENT_SETTINGS = {
+    'burst_threshold': 10,  # joins or leaves per burst_window announced one by one
+    'burst_window': 60.0,  # seconds
+    'batch_interval': 15.0,  # seconds between combined announcements during a burst
+    'batch_max_names': 50  # members listed by name in one combined announcement
+}
+
+# Bulk permission edits (/fix-bot-permissions, /unlock-voice-channels)
+PERMISSION_SETTINGS = {
+    'edit_concurrency': 4,  # channel edits in flight at once
+    'progress_interval': 2.0  # seconds between progress message edits
+}
+
+# Background process and bot statistics (get_system_stats, /system-stats)
+SYSTEM_STATS_SETTINGS = {
+    'sample_interval': 5.0,  # seconds between samples
+    'history_size': 720  # samples kept for trends; one hour at the default interval
+}
+
+# Event loop lag tracking and blocked-loop watchdog (/loop-stats)
+LOOP_MONITOR_SETTINGS = {
+    'ping_interval': 0.1,  # seconds between loop pings
+    'slow_threshold': 0.1,  # seconds a ping may wait before the loop counts as blocked
+    'history_size': 3000,  # pings kept for percentiles; five minutes at the default interval
+    'slow_events_kept': 50  # recent stalls listed by /loop-stats
+}
+
+# Prometheus endpoint; clustered processes listen on port + cluster id
+METRICS_SETTINGS = {
+    'enabled': False,
+    'host': '127.0.0.1',
+    'port': 9102
+}
+
+# Gateway sharding; launcher.py splits the shards across processes
+SHARDING_SETTINGS = {
+    'shard_count': None,  # None uses the count Discord recommends
+    'clusters': 1,  # processes launcher.py starts when --clusters is not given
+    'stats_interval': 30.0,  # seconds between cross-cluster stats writes
+    'stats_stale_after': 120.0,  # clusters silent this long are left out of totals
+    'restart_delay': 5.0  # seconds before launcher.py restarts a crashed cluster
+}
+
+# Cog extensions loaded at startup, in order
+EXTENSIONS = [
+    'cogs.ai_features',
+    'cogs.basic_commands',
+    'cogs.moderation',
+    'cogs.economy',
+    'cogs.utility',
+    'cogs.entertainment',
+    'cogs.leveling',
+    'cogs.role_management',
+    'cogs.permission_fixer',
+    'cogs.server_events',
+    'cogs.autonomous_ai',
+    'cogs.promotional_engine'
+]
+
+# Gateway intents and caches are derived from what the loaded cogs declare
+CAPABILITY_SETTINGS = {
+    'optional_intents': (),  # e.g. ('presences',) for online counts; presence updates cost the most CPU
+    'reaction_prompt_messages': 1000  # message cache for cogs waiting on reactions to their own prompts
+}
+
+# Background mass role jobs (/role-all, /assign-members-role)
+ROLE_JOB_SETTINGS = {
+    'concurrency': 3,  # role edits in flight per job
+    'checkpoint_every': 50  # members handled between progress checkpoints
+}
+
+# Reminder and scheduled message delivery
+SCHEDULER_SETTINGS = {
+    'load_limit': 500,  # earliest pending items of each kind held in memory
+    'max_batch': 50  # items due in the same second delivered together
+}
+
+# Invite attribution for new members
+INVITE_TRACKING_SETTINGS = {
+    'warmup_concurrency': 5,  # guilds whose invites are fetched at once on startup
+    'join_coalesce_window': 1.0  # seconds joins are collected before one attribution pass
 }
 
 # Music settings
@@ -340,6 +426,32 @@ FEATURE_FLAGS = {
     'error_reporting': True
 }
 
+# OpenAI request handling shared by every AI cog
+AI_SETTINGS = {
+    'model': 'gpt-4o',
+    'max_concurrency': 4,  # completions in flight at once across the whole bot
+    'request_timeout': 60.0,  # seconds before a single request is abandoned
+    'max_retries': 1,
+    # Response cache for commands that opt in with cache_ttl
+    'response_cache_entries': 512,  # responses kept in memory
+    'response_cache_persist': True,  # also keep them in SQLite across restarts
+    'response_cache_ttl': 6 * 3600,  # seconds an opted-in command reuses a response
+    # /ai conversation memory
+    'conversation_context_tokens': 3000,  # estimated history tokens sent with each /ai prompt
+    'conversation_summarize': False,  # fold turns that fall out of the window into a running summary
+    'conversation_summary_tokens': 250,  # length cap of that summary
+    'conversation_idle_ttl': 3600,  # seconds without use before a conversation is forgotten
+    'conversation_memory_budget': 4 * 1024 * 1024,  # bytes of message text held in memory
+    'conversation_spill': True  # keep conversations evicted for space in SQLite until they expire
+}
+
+# Analytics write batching
+ANALYTICS_SETTINGS = {
+    'activity_batch_size': 100,  # buffered activity rows that trigger a flush
+    'activity_flush_interval': 2.0,  # seconds a buffered row may wait before it is written
+    'analysis_cache_ttl': 3600  # seconds an AI analysis of unchanged insights is reused; they refresh hourly
+}
+
 # Database settings
 DATABASE_CONFIG = {
     'type': 'sqlite',
@@ -349,6 +461,20 @@ DATABASE_CONFIG = {
     'retain_logs': 2592000  # 30 days
 }
 
+# Every SQLite file is opened through one storage.Storage pool; the extra
+# files are attached under these schema names and keep their existing data
+STORAGE_CONFIG = {
+    'path': 'ultrabot.db',
+    'readers': 4,
+    'attach': {
+        'core': 'bot_database.db',
+        'analytics': 'autonomous_ai.db',
+        'promotion': 'promotional_data.db',
+        'viral': 'viral_content.db',
+        'cognitive': 'cognitive_memory.db'
+    }
+}
+
 # Security settings
 SECURITY_CONFIG = {
     'owner_only_commands': ['eval', 'exec', 'shutdown', 'restart'],
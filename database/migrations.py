@@ -0,0 +1,734 @@
+import logging
+
+# ultrabot.db schema as it stood before versioning. Every statement uses
+# IF NOT EXISTS so databases created by the old init_database upgrade cleanly.
+BASELINE_SCHEMA = [
+    # Core tables
+    '''
+        CREATE TABLE IF NOT EXISTS guilds (
+            guild_id INTEGER PRIMARY KEY,
+            prefix TEXT DEFAULT '/',
+            settings TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER,
+            guild_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            coins INTEGER DEFAULT 100,
+            warnings INTEGER DEFAULT 0,
+            messages_sent INTEGER DEFAULT 0,
+            voice_time INTEGER DEFAULT 0,
+            last_daily TIMESTAMP,
+            last_work TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, guild_id)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS economy (
+            guild_id INTEGER,
+            user_id INTEGER,
+            balance INTEGER DEFAULT 0,
+            last_daily REAL DEFAULT 0,
+            daily_streak INTEGER DEFAULT 0,
+            last_work REAL DEFAULT 0,
+            last_crime REAL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS levels (
+            guild_id INTEGER,
+            user_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS moderation_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            moderator_id INTEGER,
+            action TEXT,
+            reason TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS automod_settings (
+            guild_id INTEGER PRIMARY KEY,
+            spam_protection BOOLEAN DEFAULT 1,
+            link_filter BOOLEAN DEFAULT 1,
+            word_filter BOOLEAN DEFAULT 1,
+            caps_filter BOOLEAN DEFAULT 1,
+            emoji_spam_filter BOOLEAN DEFAULT 1,
+            banned_words TEXT DEFAULT '[]',
+            immune_roles TEXT DEFAULT '[]'
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS chat_analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            user_id INTEGER,
+            message_length INTEGER,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sentiment_score REAL,
+            toxicity_score REAL,
+            has_mentions BOOLEAN DEFAULT FALSE,
+            has_attachments BOOLEAN DEFAULT FALSE,
+            reaction_count INTEGER DEFAULT 0,
+            is_thread BOOLEAN DEFAULT FALSE
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS voice_analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            user_id INTEGER,
+            join_time TIMESTAMP,
+            leave_time TIMESTAMP,
+            duration_seconds INTEGER,
+            was_muted BOOLEAN DEFAULT FALSE,
+            was_deafened BOOLEAN DEFAULT FALSE
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS server_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            date DATE,
+            total_messages INTEGER DEFAULT 0,
+            active_users INTEGER DEFAULT 0,
+            new_members INTEGER DEFAULT 0,
+            left_members INTEGER DEFAULT 0,
+            voice_minutes INTEGER DEFAULT 0,
+            channels_created INTEGER DEFAULT 0,
+            channels_deleted INTEGER DEFAULT 0,
+            avg_message_length REAL DEFAULT 0
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS user_activity_summary (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            date DATE,
+            messages_sent INTEGER DEFAULT 0,
+            voice_minutes INTEGER DEFAULT 0,
+            reactions_given INTEGER DEFAULT 0,
+            reactions_received INTEGER DEFAULT 0,
+            commands_used INTEGER DEFAULT 0,
+            first_activity TIMESTAMP,
+            last_activity TIMESTAMP,
+            UNIQUE(guild_id, user_id, date)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS channel_analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            date DATE,
+            message_count INTEGER DEFAULT 0,
+            unique_users INTEGER DEFAULT 0,
+            avg_message_length REAL DEFAULT 0,
+            peak_hour INTEGER DEFAULT 0,
+            UNIQUE(guild_id, channel_id, date)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            reminder_text TEXT,
+            remind_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS custom_commands (
+            guild_id INTEGER,
+            command_name TEXT,
+            response TEXT,
+            created_by INTEGER,
+            usage_count INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, command_name)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS starboard (
+            message_id INTEGER PRIMARY KEY,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            author_id INTEGER,
+            star_count INTEGER DEFAULT 0,
+            starboard_message_id INTEGER
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS scheduled_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            send_at TIMESTAMP NOT NULL,
+            created_by INTEGER NOT NULL,
+            sent BOOLEAN DEFAULT FALSE
+        )
+    ''',
+    # Create role menus table for customization hub
+    '''
+        CREATE TABLE IF NOT EXISTS role_menus (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            title TEXT,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # Create role menu options table
+    '''
+        CREATE TABLE IF NOT EXISTS role_menu_options (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            menu_id INTEGER NOT NULL,
+            role_id INTEGER NOT NULL,
+            emoji TEXT,
+            description TEXT,
+            FOREIGN KEY (menu_id) REFERENCES role_menus (id)
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS auto_roles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            trigger_type TEXT NOT NULL,
+            trigger_value TEXT NOT NULL,
+            role_id INTEGER NOT NULL,
+            condition_value INTEGER DEFAULT 1
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS auto_reactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            trigger_type TEXT NOT NULL,
+            trigger_value TEXT NOT NULL,
+            emojis TEXT NOT NULL
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS welcome_config (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            message TEXT,
+            auto_role_id INTEGER
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS ai_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            command_name TEXT NOT NULL,
+            tokens_used INTEGER DEFAULT 0,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''
+]
+
+INDEXES = [
+    # Economy leaderboard: WHERE guild_id = ? ORDER BY balance DESC, user_id read from the index
+    'CREATE INDEX IF NOT EXISTS idx_economy_guild_balance ON economy (guild_id, balance, user_id)',
+    # Due-item lookups for reminder and scheduled message delivery
+    'CREATE INDEX IF NOT EXISTS idx_reminders_remind_at ON reminders (remind_at)',
+    'CREATE INDEX IF NOT EXISTS idx_scheduled_messages_pending ON scheduled_messages (send_at) WHERE sent = 0'
+]
+
+ROLE_JOBS_SCHEMA = [
+    # Mass role edits run in the background; cursor is the highest user_id already handled
+    '''
+        CREATE TABLE IF NOT EXISTS role_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            role_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            requested_by INTEGER,
+            channel_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending',
+            total INTEGER DEFAULT 0,
+            cursor INTEGER DEFAULT 0,
+            succeeded INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_role_jobs_guild ON role_jobs (guild_id, id)',
+    'CREATE INDEX IF NOT EXISTS idx_role_jobs_active ON role_jobs (status) WHERE status IN (\'pending\', \'running\')'
+]
+
+AI_CONVERSATIONS_SCHEMA = [
+    # Conversations pushed out of memory by the size budget, read back on their next use
+    '''
+        CREATE TABLE IF NOT EXISTS ai_conversations (
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            messages TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (user_id, channel_id)
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_ai_conversations_updated ON ai_conversations (updated_at)'
+]
+
+LLM_CACHE_SCHEMA = [
+    # Completions of commands that opted into response caching, keyed by a hash of the request
+    '''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)'
+]
+
+SCHEDULE_EPOCH_TIMES = [
+    # Due times are compared as epoch seconds; convert rows written as ISO text (read as UTC)
+    '''
+        UPDATE reminders SET remind_at = (julianday(remind_at) - 2440587.5) * 86400.0
+        WHERE typeof(remind_at) = 'text' AND julianday(remind_at) IS NOT NULL
+    ''',
+    '''
+        UPDATE scheduled_messages SET send_at = (julianday(send_at) - 2440587.5) * 86400.0
+        WHERE typeof(send_at) = 'text' AND julianday(send_at) IS NOT NULL
+    '''
+]
+
+CLUSTER_STATS_SCHEMA = [
+    # One row per cluster process, refreshed periodically so /info can add them up
+    '''
+        CREATE TABLE IF NOT EXISTS cluster_stats (
+            cluster_id INTEGER PRIMARY KEY,
+            shard_ids TEXT NOT NULL,
+            guilds INTEGER DEFAULT 0,
+            members INTEGER DEFAULT 0,
+            latency REAL,
+            updated_at REAL NOT NULL
+        )
+    '''
+]
+
+# (version, description, statements); append new entries, never edit applied ones
+MIGRATIONS = [
+    (1, "Baseline schema", BASELINE_SCHEMA),
+    (2, "Secondary indexes for the economy leaderboard and due-time lookups", INDEXES),
+    (3, "Background mass role jobs", ROLE_JOBS_SCHEMA),
+    (4, "Spilled AI conversations", AI_CONVERSATIONS_SCHEMA),
+    (5, "Persistent LLM response cache", LLM_CACHE_SCHEMA),
+    (6, "Epoch due times for reminders and scheduled messages", SCHEDULE_EPOCH_TIMES),
+    (7, "Cross-cluster stats", CLUSTER_STATS_SCHEMA)
+]
+
+# Schemas of the other database files, attached next to ultrabot.db by storage.Storage
+
+CORE_SCHEMA = [
+    # Server settings
+    '''
+        CREATE TABLE IF NOT EXISTS server_settings (
+            guild_id INTEGER PRIMARY KEY,
+            prefix TEXT DEFAULT '!',
+            automod_enabled BOOLEAN DEFAULT FALSE,
+            xp_multiplier REAL DEFAULT 1.0,
+            settings_json TEXT DEFAULT '{}'
+        )
+    ''',
+    # User profiles and economy
+    '''
+        CREATE TABLE IF NOT EXISTS user_economy (
+            guild_id INTEGER,
+            user_id INTEGER,
+            balance INTEGER DEFAULT 0,
+            bank INTEGER DEFAULT 0,
+            last_daily TIMESTAMP,
+            last_work TIMESTAMP,
+            last_crime TIMESTAMP,
+            last_rob TIMESTAMP,
+            daily_streak INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''',
+    # User XP and leveling
+    '''
+        CREATE TABLE IF NOT EXISTS user_levels (
+            guild_id INTEGER,
+            user_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 0,
+            messages INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''',
+    # Moderation warnings
+    '''
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            moderator_id INTEGER,
+            reason TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # Reaction roles
+    '''
+        CREATE TABLE IF NOT EXISTS reaction_roles (
+            guild_id INTEGER,
+            message_id INTEGER,
+            emoji TEXT,
+            role_name TEXT,
+            PRIMARY KEY (guild_id, message_id, emoji)
+        )
+    ''',
+    # Tickets
+    '''
+        CREATE TABLE IF NOT EXISTS tickets (
+            guild_id INTEGER,
+            user_id INTEGER,
+            channel_id INTEGER PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            closed_at TIMESTAMP,
+            status TEXT DEFAULT 'open'
+        )
+    ''',
+    # Ticket messages for setup
+    '''
+        CREATE TABLE IF NOT EXISTS ticket_messages (
+            guild_id INTEGER PRIMARY KEY,
+            message_id INTEGER,
+            category_id INTEGER
+        )
+    ''',
+    # Channel blacklist for XP
+    '''
+        CREATE TABLE IF NOT EXISTS xp_blacklist (
+            guild_id INTEGER,
+            channel_id INTEGER,
+            PRIMARY KEY (guild_id, channel_id)
+        )
+    ''',
+    # Automod settings
+    '''
+        CREATE TABLE IF NOT EXISTS automod_settings (
+            guild_id INTEGER PRIMARY KEY,
+            spam_protection BOOLEAN DEFAULT TRUE,
+            link_protection BOOLEAN DEFAULT FALSE,
+            word_filter BOOLEAN DEFAULT FALSE,
+            banned_words TEXT DEFAULT '[]'
+        )
+    '''
+]
+
+CORE_MIGRATIONS = [
+    (1, "Baseline schema", CORE_SCHEMA)
+]
+
+ANALYTICS_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS server_activity (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            user_id INTEGER,
+            message_count INTEGER DEFAULT 1,
+            timestamp DATETIME,
+            activity_type TEXT
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS channel_analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            channel_name TEXT,
+            total_messages INTEGER DEFAULT 0,
+            active_users INTEGER DEFAULT 0,
+            last_activity DATETIME,
+            engagement_score REAL DEFAULT 0.0
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS user_analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            username TEXT,
+            total_messages INTEGER DEFAULT 0,
+            last_seen DATETIME,
+            engagement_level TEXT DEFAULT 'inactive',
+            join_date DATETIME
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS ai_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            action_type TEXT,
+            action_details TEXT,
+            reasoning TEXT,
+            confidence_score REAL,
+            timestamp DATETIME,
+            result_metrics TEXT
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS server_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            date_recorded DATE,
+            total_members INTEGER,
+            active_members INTEGER,
+            message_volume INTEGER,
+            boost_count INTEGER,
+            join_rate REAL,
+            leave_rate REAL
+        )
+    '''
+]
+
+ANALYTICS_MIGRATIONS = [
+    (1, "Baseline schema", ANALYTICS_SCHEMA),
+    (2, "Activity range index", [
+        'CREATE INDEX IF NOT EXISTS idx_server_activity_guild_time ON server_activity (guild_id, activity_type, timestamp, channel_id, user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_channel_analytics_guild ON channel_analytics (guild_id, engagement_score)'
+    ])
+]
+
+PROMOTION_SCHEMA = [
+    # Generated content tracking
+    '''
+        CREATE TABLE IF NOT EXISTS generated_content (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            content_type TEXT,
+            platform TEXT,
+            content_text TEXT,
+            hashtags TEXT,
+            image_prompt TEXT,
+            generated_at DATETIME,
+            used BOOLEAN DEFAULT 0,
+            performance_score REAL DEFAULT 0.0
+        )
+    ''',
+    # Invite tracking
+    '''
+        CREATE TABLE IF NOT EXISTS invite_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            inviter_id INTEGER,
+            invited_user_id INTEGER,
+            invite_code TEXT,
+            joined_at DATETIME,
+            still_member BOOLEAN DEFAULT 1
+        )
+    ''',
+    # Growth campaigns
+    '''
+        CREATE TABLE IF NOT EXISTS growth_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            campaign_name TEXT,
+            campaign_type TEXT,
+            target_invites INTEGER,
+            reward_description TEXT,
+            start_date DATETIME,
+            end_date DATETIME,
+            active BOOLEAN DEFAULT 1
+        )
+    ''',
+    # Server highlights
+    '''
+        CREATE TABLE IF NOT EXISTS server_highlights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            highlight_type TEXT,
+            description TEXT,
+            timestamp DATETIME,
+            metrics TEXT,
+            converted_to_promo BOOLEAN DEFAULT 0
+        )
+    '''
+]
+
+PROMOTION_MIGRATIONS = [
+    (1, "Baseline schema", PROMOTION_SCHEMA),
+    (2, "Invite count index", [
+        'CREATE INDEX IF NOT EXISTS idx_invite_tracking_guild_inviter ON invite_tracking (guild_id, still_member, inviter_id)'
+    ])
+]
+
+VIRAL_SCHEMA = [
+    # Downloaded content tracking
+    '''
+        CREATE TABLE IF NOT EXISTS downloaded_content (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            platform TEXT,
+            original_url TEXT UNIQUE,
+            local_path TEXT,
+            title TEXT,
+            engagement_score INTEGER,
+            download_date DATETIME,
+            uploaded_to_tiktok BOOLEAN DEFAULT 0,
+            caption_used TEXT,
+            performance_metrics TEXT
+        )
+    ''',
+    # Content search keywords
+    '''
+        CREATE TABLE IF NOT EXISTS search_keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            keyword TEXT,
+            platform TEXT,
+            min_engagement INTEGER DEFAULT 100,
+            active BOOLEAN DEFAULT 1
+        )
+    ''',
+    # Upload queue
+    '''
+        CREATE TABLE IF NOT EXISTS upload_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            content_id INTEGER,
+            scheduled_time DATETIME,
+            custom_caption TEXT,
+            status TEXT DEFAULT 'pending',
+            upload_attempt_count INTEGER DEFAULT 0,
+            FOREIGN KEY (content_id) REFERENCES downloaded_content (id)
+        )
+    ''',
+    # Performance tracking
+    '''
+        CREATE TABLE IF NOT EXISTS content_performance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_id INTEGER,
+            views INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            engagement_rate REAL DEFAULT 0.0,
+            tracked_date DATETIME,
+            FOREIGN KEY (content_id) REFERENCES downloaded_content (id)
+        )
+    '''
+]
+
+VIRAL_MIGRATIONS = [
+    (1, "Baseline schema", VIRAL_SCHEMA),
+    (2, "Content library index", [
+        'CREATE INDEX IF NOT EXISTS idx_downloaded_content_guild_date ON downloaded_content (guild_id, download_date)'
+    ])
+]
+
+COGNITIVE_SCHEMA = [
+    # Decision tracking table
+    '''
+        CREATE TABLE IF NOT EXISTS decisions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            decision_type TEXT,
+            action_taken TEXT,
+            reasoning TEXT,
+            confidence_score REAL,
+            timestamp DATETIME,
+            success_metrics TEXT,
+            feedback_score REAL DEFAULT 0.0,
+            learned_insights TEXT
+        )
+    ''',
+    # Pattern recognition table
+    '''
+        CREATE TABLE IF NOT EXISTS patterns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            pattern_type TEXT,
+            pattern_data TEXT,
+            frequency INTEGER DEFAULT 1,
+            last_seen DATETIME,
+            effectiveness REAL DEFAULT 0.0
+        )
+    ''',
+    # User behavior predictions
+    '''
+        CREATE TABLE IF NOT EXISTS user_predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            predicted_behavior TEXT,
+            prediction_confidence REAL,
+            actual_outcome TEXT,
+            prediction_accuracy REAL
+        )
+    ''',
+    # Learning insights
+    '''
+        CREATE TABLE IF NOT EXISTS learning_insights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            insight_category TEXT,
+            insight_text TEXT,
+            evidence_strength REAL,
+            timestamp DATETIME,
+            applied_successfully BOOLEAN DEFAULT 0
+        )
+    '''
+]
+
+COGNITIVE_MIGRATIONS = [
+    (1, "Baseline schema", COGNITIVE_SCHEMA),
+    (2, "Decision history index", [
+        'CREATE INDEX IF NOT EXISTS idx_decisions_guild_time ON decisions (guild_id, timestamp)'
+    ])
+]
+
+async def get_schema_version(db):
+    async with db.execute('PRAGMA user_version') as cursor:
+        return (await cursor.fetchone())[0]
+
+async def migrate(db, migrations=MIGRATIONS):
+    """Apply every migration newer than the database's ``PRAGMA user_version``.
+
+    Each migration runs in its own transaction together with the version bump,
+    so a failed migration leaves the database at the previous version.
+    Returns the resulting schema version.
+    """
+    version = await get_schema_version(db)
+    for target, description, statements in migrations:
+        if target <= version:
+            continue
+        await db.execute('BEGIN')
+        try:
+            for statement in statements:
+                await db.execute(statement)
+            # PRAGMA does not accept bound parameters
+            await db.execute(f'PRAGMA user_version = {int(target)}')
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        logging.info(f"Applied schema migration {target}: {description}")
+        version = target
+    return version
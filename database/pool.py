@@ -0,0 +1,78 @@
+import aiosqlite
+import asyncio
+from contextlib import asynccontextmanager
+
+class ConnectionPool:
+    """Bounded pool of persistent aiosqlite connections for one database file.
+
+    A single writer connection serialises every write, while up to ``readers``
+    additional connections serve reads concurrently. Connections are opened
+    lazily in WAL mode and reused until ``close()`` is called, so a query only
+    pays for the query itself instead of a new worker thread and file handle.
+
+    ``attach`` maps schema names to further database files that every
+    connection attaches, so their tables can be queried (and joined) as
+    ``schema.table`` through the same connections.
+    """
+
+    def __init__(self, db_path, readers=4, attach=None):
+        self.db_path = db_path
+        self.attach = dict(attach or {})
+        self.max_readers = max(1, readers)
+        self._writer = None
+        self._writer_lock = asyncio.Lock()
+        self._reader_slots = asyncio.Semaphore(self.max_readers)
+        self._idle_readers = []
+        self._all_readers = []
+
+    async def _connect(self, read_only=False):
+        """Open a connection configured for concurrent WAL access"""
+        db = await aiosqlite.connect(self.db_path)
+        await db.execute("PRAGMA busy_timeout=5000")
+        for schema, path in self.attach.items():
+            await db.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        # Journal mode and sync level are per database file
+        for schema in ('main', *self.attach):
+            await db.execute(f"PRAGMA {schema}.journal_mode=WAL")
+            await db.execute(f"PRAGMA {schema}.synchronous=NORMAL")
+        if read_only:
+            await db.execute("PRAGMA query_only=1")
+        return db
+
+    @asynccontextmanager
+    async def writer(self):
+        """Acquire the single writer connection; callers commit their own work"""
+        async with self._writer_lock:
+            if self._writer is None:
+                self._writer = await self._connect()
+            try:
+                yield self._writer
+            except BaseException:
+                # Never hand a half-finished transaction to the next writer
+                await self._writer.rollback()
+                raise
+
+    @asynccontextmanager
+    async def reader(self):
+        """Acquire one of the pooled read-only connections"""
+        async with self._reader_slots:
+            if self._idle_readers:
+                db = self._idle_readers.pop()
+            else:
+                db = await self._connect(read_only=True)
+                self._all_readers.append(db)
+            try:
+                yield db
+            finally:
+                self._idle_readers.append(db)
+
+    async def close(self):
+        """Close every pooled connection"""
+        async with self._writer_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        for db in self._all_readers:
+            await db.close()
+        self._all_readers.clear()
+        self._idle_readers.clear()
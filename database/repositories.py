@@ -0,0 +1,511 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+class Repository:
+    """Data access for one domain, sharing the storage connection pool.
+
+    Tables outside ultrabot.db are always schema-qualified (for example
+    ``analytics.channel_analytics``) because several files reuse table names.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def _fetchall(self, query: str, params: tuple = ()) -> List[tuple]:
+        async with self.pool.reader() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def _fetchone(self, query: str, params: tuple = ()) -> Optional[tuple]:
+        async with self.pool.reader() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchone()
+
+    async def _fetchdicts(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        async with self.pool.reader() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+                columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    async def _write(self, query: str, params: tuple = ()) -> int:
+        """Run one write statement and commit; returns the affected row count"""
+        async with self.pool.writer() as db:
+            cursor = await db.execute(query, params)
+            await db.commit()
+            return cursor.rowcount
+
+    async def _write_many(self, query: str, rows: List[tuple]):
+        async with self.pool.writer() as db:
+            await db.executemany(query, rows)
+            await db.commit()
+
+class GuildRepository(Repository):
+    """Guild rows and prefixes in ultrabot.db"""
+
+    async def prefixes(self) -> List[Tuple[int, str]]:
+        return await self._fetchall('SELECT guild_id, prefix FROM guilds')
+
+    async def set_prefix(self, guild_id: int, prefix: str):
+        await self._write('''
+            INSERT INTO guilds (guild_id, prefix) VALUES (?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET prefix = excluded.prefix
+        ''', (guild_id, prefix))
+
+    async def ensure(self, guild_id: int):
+        await self._write('INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)', (guild_id,))
+
+class EconomyRepository(Repository):
+    """Balances and command cooldowns in ultrabot.db"""
+
+    COOLDOWN_COLUMNS = ('last_daily', 'last_work', 'last_crime')
+
+    async def get_balance(self, guild_id: int, user_id: int) -> int:
+        result = await self._fetchone(
+            'SELECT balance FROM economy WHERE guild_id = ? AND user_id = ?',
+            (guild_id, user_id)
+        )
+        return result[0] if result else 0
+
+    async def get_account(self, guild_id: int, user_id: int) -> Optional[tuple]:
+        """``(balance, last_daily, daily_streak, last_work, last_crime)`` or None"""
+        return await self._fetchone('''
+            SELECT balance, last_daily, daily_streak, last_work, last_crime
+            FROM economy WHERE guild_id = ? AND user_id = ?
+        ''', (guild_id, user_id))
+
+    async def add_balance(self, guild_id: int, user_id: int, amount: int):
+        await self._write('''
+            INSERT INTO economy (guild_id, user_id, balance) VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET balance = balance + excluded.balance
+        ''', (guild_id, user_id, amount))
+
+    async def claim_cooldown(self, guild_id: int, user_id: int, column: str, now: float,
+                             cooldown: float, amount: int, streak: Optional[int] = None) -> bool:
+        """Apply a balance change and stamp a cooldown column in one statement.
+
+        The update only happens while the cooldown has elapsed, so when two
+        commands for the same user interleave only the first one is paid.
+        Returns False if the claim lost that race.
+        """
+        if column not in self.COOLDOWN_COLUMNS:
+            raise ValueError(f"Unknown cooldown column: {column}")
+        columns = f"guild_id, user_id, balance, {column}"
+        updates = f"balance = MAX(0, balance + ?), {column} = excluded.{column}"
+        params = [guild_id, user_id, max(amount, 0), now]
+        if streak is not None:
+            columns += ", daily_streak"
+            updates += ", daily_streak = excluded.daily_streak"
+            params.append(streak)
+        placeholders = ", ".join("?" * len(params))
+        changed = await self._write(f'''
+            INSERT INTO economy ({columns}) VALUES ({placeholders})
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET {updates}
+            WHERE COALESCE({column}, 0) <= ?
+        ''', (*params, amount, now - cooldown))
+        return changed > 0
+
+    async def top_balances(self, guild_id: int, limit: int = 10) -> List[Tuple[int, int]]:
+        return await self._fetchall(
+            'SELECT user_id, balance FROM economy WHERE guild_id = ? ORDER BY balance DESC LIMIT ?',
+            (guild_id, limit)
+        )
+
+class LevelsRepository(Repository):
+    """XP totals in ultrabot.db"""
+
+    async def guild_xp(self, guild_id: int) -> List[Tuple[int, int]]:
+        return await self._fetchall('SELECT user_id, xp FROM levels WHERE guild_id = ?', (guild_id,))
+
+    async def add_xp(self, rows: List[Tuple[int, int, int, int]]):
+        """Apply ``(guild_id, user_id, xp_delta, level)`` rows in one transaction"""
+        await self._write_many('''
+            INSERT INTO levels (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                xp = xp + excluded.xp, level = excluded.level
+        ''', rows)
+
+    async def reset_guild(self, guild_id: int):
+        await self._write('DELETE FROM levels WHERE guild_id = ?', (guild_id,))
+
+class AnalyticsRepository(Repository):
+    """Server activity and engagement data (autonomous_ai.db)"""
+
+    async def add_activity(self, rows: List[tuple]):
+        """Insert ``(guild_id, channel_id, user_id, timestamp, activity_type)`` rows"""
+        await self._write_many('''
+            INSERT INTO analytics.server_activity
+            (guild_id, channel_id, user_id, timestamp, activity_type)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+
+    async def channel_activity(self, guild_id: int, since: datetime) -> List[Tuple[int, int, int]]:
+        """``(channel_id, messages, unique_users)`` per channel since a point in time"""
+        return await self._fetchall('''
+            SELECT channel_id, COUNT(*) as msg_count, COUNT(DISTINCT user_id) as unique_users
+            FROM analytics.server_activity
+            WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
+            GROUP BY channel_id
+        ''', (guild_id, since))
+
+    async def hourly_channel_activity(self, since: datetime) -> List[Tuple[int, int, int, int]]:
+        """``(channel_id, user_id, hour, messages)`` across all guilds since a point in time,
+        where hour is the Unix time divided by 3600"""
+        return await self._fetchall('''
+            SELECT channel_id, user_id, CAST(strftime('%s', timestamp) AS INTEGER) / 3600 AS hour, COUNT(*)
+            FROM analytics.server_activity
+            WHERE timestamp > ? AND activity_type = 'message'
+            GROUP BY channel_id, user_id, hour
+        ''', (since,))
+
+    async def save_channel_analytics(self, rows: List[tuple]):
+        """Store ``(guild_id, channel_id, channel_name, total_messages, active_users,
+        last_activity, engagement_score)`` rows"""
+        await self._write_many('''
+            INSERT OR REPLACE INTO analytics.channel_analytics
+            (guild_id, channel_id, channel_name, total_messages, active_users,
+             last_activity, engagement_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+    async def channels_by_engagement(self, guild_id: int, limit: int = 5, descending: bool = True) -> List[tuple]:
+        order = 'DESC' if descending else 'ASC'
+        return await self._fetchall(f'''
+            SELECT channel_name, engagement_score, total_messages, active_users
+            FROM analytics.channel_analytics
+            WHERE guild_id = ?
+            ORDER BY engagement_score {order}
+            LIMIT ?
+        ''', (guild_id, limit))
+
+    async def daily_message_counts(self, guild_id: int, since: datetime) -> List[Tuple[str, int]]:
+        return await self._fetchall('''
+            SELECT DATE(timestamp) as day, COUNT(*) as messages
+            FROM analytics.server_activity
+            WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
+            GROUP BY DATE(timestamp)
+            ORDER BY day
+        ''', (guild_id, since))
+
+    async def most_active_users(self, guild_id: int, since: datetime, limit: int = 10) -> List[Tuple[int, int]]:
+        return await self._fetchall('''
+            SELECT user_id, COUNT(*) as msg_count
+            FROM analytics.server_activity
+            WHERE guild_id = ? AND timestamp > ? AND activity_type = 'message'
+            GROUP BY user_id
+            ORDER BY msg_count DESC
+            LIMIT ?
+        ''', (guild_id, since, limit))
+
+class PromotionRepository(Repository):
+    """Generated promo content and invite tracking (promotional_data.db)"""
+
+    async def store_generated_content(self, guild_id: int, content_type: str, platform: str, promo_data: Dict):
+        await self._write('''
+            INSERT INTO promotion.generated_content
+            (guild_id, content_type, platform, content_text, hashtags, image_prompt, generated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            guild_id,
+            content_type,
+            platform,
+            promo_data.get('caption', ''),
+            json.dumps(promo_data.get('hashtags', [])),
+            promo_data.get('image_prompt', ''),
+            datetime.now(timezone.utc)
+        ))
+
+    async def record_invite(self, guild_id: int, inviter_id: int, invited_user_id: int, invite_code: str):
+        await self._write('''
+            INSERT INTO promotion.invite_tracking
+            (guild_id, inviter_id, invited_user_id, invite_code, joined_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (guild_id, inviter_id, invited_user_id, invite_code, datetime.now(timezone.utc)))
+
+    async def invite_count(self, guild_id: int, user_id: int) -> int:
+        result = await self._fetchone('''
+            SELECT COUNT(*) FROM promotion.invite_tracking
+            WHERE guild_id = ? AND inviter_id = ? AND still_member = 1
+        ''', (guild_id, user_id))
+        return result[0] if result else 0
+
+    async def invite_leaderboard(self, guild_id: int, limit: int = 10) -> List[Tuple[int, int]]:
+        return await self._fetchall('''
+            SELECT inviter_id, COUNT(*) as invite_count
+            FROM promotion.invite_tracking
+            WHERE guild_id = ? AND still_member = 1
+            GROUP BY inviter_id
+            ORDER BY invite_count DESC
+            LIMIT ?
+        ''', (guild_id, limit))
+
+    async def inviters_with_xp(self, guild_id: int, limit: int = 10) -> List[Tuple[int, int, int]]:
+        """``(inviter_id, invites, xp)`` joined across invite tracking and levels"""
+        return await self._fetchall('''
+            SELECT i.inviter_id, COUNT(*) as invite_count, COALESCE(l.xp, 0)
+            FROM promotion.invite_tracking i
+            LEFT JOIN levels l ON l.guild_id = i.guild_id AND l.user_id = i.inviter_id
+            WHERE i.guild_id = ? AND i.still_member = 1
+            GROUP BY i.inviter_id
+            ORDER BY invite_count DESC
+            LIMIT ?
+        ''', (guild_id, limit))
+
+class RoleJobRepository(Repository):
+    """Checkpointed mass role edit jobs in ultrabot.db"""
+
+    async def create(self, guild_id: int, role_id: int, action: str, requested_by: int, channel_id: int, total: int) -> int:
+        now = datetime.now(timezone.utc).timestamp()
+        async with self.pool.writer() as db:
+            cursor = await db.execute('''
+                INSERT INTO role_jobs
+                (guild_id, role_id, action, requested_by, channel_id, total, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (guild_id, role_id, action, requested_by, channel_id, total, now, now))
+            await db.commit()
+            return cursor.lastrowid
+
+    async def checkpoint(self, job_id: int, cursor: int, succeeded: int, failed: int, status: str = 'running'):
+        await self._write('''
+            UPDATE role_jobs SET cursor = ?, succeeded = ?, failed = ?, status = ?, updated_at = ?
+            WHERE id = ?
+        ''', (cursor, succeeded, failed, status, datetime.now(timezone.utc).timestamp(), job_id))
+
+    async def set_status(self, job_id: int, status: str):
+        await self._write(
+            'UPDATE role_jobs SET status = ?, updated_at = ? WHERE id = ?',
+            (status, datetime.now(timezone.utc).timestamp(), job_id)
+        )
+
+    async def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        rows = await self._fetchdicts('SELECT * FROM role_jobs WHERE id = ?', (job_id,))
+        return rows[0] if rows else None
+
+    async def active(self) -> List[Dict[str, Any]]:
+        """Jobs to resume on startup, oldest first"""
+        return await self._fetchdicts(
+            "SELECT * FROM role_jobs WHERE status IN ('pending', 'running') ORDER BY id"
+        )
+
+    async def for_guild(self, guild_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        return await self._fetchdicts(
+            'SELECT * FROM role_jobs WHERE guild_id = ? ORDER BY id DESC LIMIT ?',
+            (guild_id, limit)
+        )
+
+class ScheduleRepository(Repository):
+    """Pending reminders and scheduled messages in ultrabot.db; due times are epoch seconds"""
+
+    async def add_reminder(self, user_id: int, guild_id: int, channel_id: int, text: str, remind_at: float) -> int:
+        async with self.pool.writer() as db:
+            cursor = await db.execute('''
+                INSERT INTO reminders (user_id, guild_id, channel_id, reminder_text, remind_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, guild_id, channel_id, text, remind_at, datetime.now(timezone.utc).timestamp()))
+            await db.commit()
+            return cursor.lastrowid
+
+    async def add_scheduled_message(self, guild_id: int, channel_id: int, message: str, send_at: float,
+                                    created_by: int) -> int:
+        async with self.pool.writer() as db:
+            cursor = await db.execute('''
+                INSERT INTO scheduled_messages (guild_id, channel_id, message, send_at, created_by)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (guild_id, channel_id, message, send_at, created_by))
+            await db.commit()
+            return cursor.lastrowid
+
+    @staticmethod
+    def _shard_filter(shard_count: Optional[int], shard_ids: Optional[List[int]]) -> Tuple[str, tuple]:
+        """Condition limiting rows to guilds on the given shards, for clustered processes"""
+        if not shard_ids:
+            return '', ()
+        placeholders = ', '.join('?' * len(shard_ids))
+        return f' AND (guild_id >> 22) % ? IN ({placeholders})', (shard_count, *shard_ids)
+
+    async def next_reminders(self, limit: int, shard_count: Optional[int] = None,
+                             shard_ids: Optional[List[int]] = None) -> List[Tuple[float, int]]:
+        """``(remind_at, id)`` of the earliest pending reminders, read from the remind_at index"""
+        shards, params = self._shard_filter(shard_count, shard_ids)
+        # Rows whose due time never parsed as a date are skipped rather than compared as text
+        return await self._fetchall(f'''
+            SELECT remind_at, id FROM reminders WHERE typeof(remind_at) IN ('integer', 'real'){shards}
+            ORDER BY remind_at LIMIT ?
+        ''', (*params, limit))
+
+    async def next_scheduled_messages(self, limit: int, shard_count: Optional[int] = None,
+                                      shard_ids: Optional[List[int]] = None) -> List[Tuple[float, int]]:
+        """``(send_at, id)`` of the earliest unsent messages, read from the partial pending index"""
+        shards, params = self._shard_filter(shard_count, shard_ids)
+        return await self._fetchall(f'''
+            SELECT send_at, id FROM scheduled_messages
+            WHERE sent = 0 AND typeof(send_at) IN ('integer', 'real'){shards}
+            ORDER BY send_at LIMIT ?
+        ''', (*params, limit))
+
+    async def reminders(self, ids: List[int]) -> List[Dict[str, Any]]:
+        placeholders = ', '.join('?' * len(ids))
+        return await self._fetchdicts(f'SELECT * FROM reminders WHERE id IN ({placeholders})', tuple(ids))
+
+    async def scheduled_messages(self, ids: List[int]) -> List[Dict[str, Any]]:
+        placeholders = ', '.join('?' * len(ids))
+        return await self._fetchdicts(f'SELECT * FROM scheduled_messages WHERE id IN ({placeholders})', tuple(ids))
+
+    async def complete(self, reminder_ids: List[int], message_ids: List[int]):
+        """Drop delivered reminders and mark delivered messages sent in one transaction"""
+        async with self.pool.writer() as db:
+            await db.executemany('DELETE FROM reminders WHERE id = ?', [(i,) for i in reminder_ids])
+            await db.executemany('UPDATE scheduled_messages SET sent = 1 WHERE id = ?', [(i,) for i in message_ids])
+            await db.commit()
+
+class ClusterRepository(Repository):
+    """Per-process guild and member counts in ultrabot.db, written by every cluster"""
+
+    async def publish(self, cluster_id: int, shard_ids: List[int], guilds: int, members: int,
+                      latency: float, updated_at: float):
+        await self._write('''
+            INSERT INTO cluster_stats (cluster_id, shard_ids, guilds, members, latency, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(cluster_id) DO UPDATE SET
+                shard_ids = excluded.shard_ids,
+                guilds = excluded.guilds,
+                members = excluded.members,
+                latency = excluded.latency,
+                updated_at = excluded.updated_at
+        ''', (cluster_id, json.dumps(shard_ids), guilds, members, latency, updated_at))
+
+    async def live(self, since: float) -> List[Dict[str, Any]]:
+        """Rows of clusters that published after ``since``"""
+        rows = await self._fetchdicts(
+            'SELECT * FROM cluster_stats WHERE updated_at > ? ORDER BY cluster_id', (since,)
+        )
+        for row in rows:
+            row['shard_ids'] = json.loads(row['shard_ids'])
+        return rows
+
+    async def remove(self, cluster_id: int):
+        await self._write('DELETE FROM cluster_stats WHERE cluster_id = ?', (cluster_id,))
+
+class ConversationRepository(Repository):
+    """AI conversations spilled out of memory, in ultrabot.db"""
+
+    async def save_many(self, rows: List[Tuple[int, int, List[Dict], float]]):
+        """Store ``(user_id, channel_id, messages, last_used)`` rows"""
+        await self._write_many('''
+            INSERT INTO ai_conversations (user_id, channel_id, messages, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, channel_id) DO UPDATE SET
+                messages = excluded.messages,
+                updated_at = excluded.updated_at
+        ''', [(user_id, channel_id, json.dumps(messages), last_used) for user_id, channel_id, messages, last_used in rows])
+
+    async def load(self, user_id: int, channel_id: int, since: float) -> Optional[List[Dict]]:
+        """Messages of a conversation used after ``since``, or None"""
+        result = await self._fetchone(
+            'SELECT messages FROM ai_conversations WHERE user_id = ? AND channel_id = ? AND updated_at >= ?',
+            (user_id, channel_id, since)
+        )
+        return json.loads(result[0]) if result else None
+
+    async def delete(self, user_id: int, channel_id: int):
+        await self._write('DELETE FROM ai_conversations WHERE user_id = ? AND channel_id = ?', (user_id, channel_id))
+
+    async def purge(self, before: float) -> int:
+        return await self._write('DELETE FROM ai_conversations WHERE updated_at < ?', (before,))
+
+class ResponseCacheRepository(Repository):
+    """Persisted LLM responses in ultrabot.db"""
+
+    async def save_many(self, rows: List[Tuple[str, str, float]]):
+        """Store ``(cache_key, response, expires_at)`` rows"""
+        await self._write_many('''
+            INSERT INTO llm_cache (cache_key, response, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                response = excluded.response,
+                expires_at = excluded.expires_at
+        ''', rows)
+
+    async def load(self, cache_key: str, now: float) -> Optional[Tuple[str, float]]:
+        """``(response, expires_at)`` of an unexpired entry, or None"""
+        return await self._fetchone(
+            'SELECT response, expires_at FROM llm_cache WHERE cache_key = ? AND expires_at > ?',
+            (cache_key, now)
+        )
+
+    async def purge(self, now: float) -> int:
+        return await self._write('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+
+class ViralContentRepository(Repository):
+    """Downloaded clip library (viral_content.db)"""
+
+    async def store_downloaded_content(self, guild_id: int, content_data: Dict, local_path: str):
+        await self._write('''
+            INSERT OR REPLACE INTO viral.downloaded_content
+            (guild_id, platform, original_url, local_path, title, engagement_score, download_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            guild_id,
+            content_data.get('platform', 'unknown'),
+            content_data.get('url', ''),
+            local_path,
+            content_data.get('title', ''),
+            content_data.get('engagement', 0),
+            datetime.now(timezone.utc)
+        ))
+
+    async def find_by_title(self, guild_id: int, title: str) -> Optional[Dict[str, Any]]:
+        """Most recent download whose title contains ``title``"""
+        rows = await self._fetchdicts('''
+            SELECT * FROM viral.downloaded_content
+            WHERE guild_id = ? AND title LIKE ?
+            ORDER BY download_date DESC LIMIT 1
+        ''', (guild_id, f'%{title}%'))
+        return rows[0] if rows else None
+
+    async def library(self, guild_id: int, limit: int = 10) -> List[tuple]:
+        """``(title, platform, engagement_score, download_date, uploaded_to_tiktok)`` rows"""
+        return await self._fetchall('''
+            SELECT title, platform, engagement_score, download_date, uploaded_to_tiktok
+            FROM viral.downloaded_content
+            WHERE guild_id = ?
+            ORDER BY download_date DESC LIMIT ?
+        ''', (guild_id, limit))
+
+class CognitiveRepository(Repository):
+    """Decision memory for the cognitive engine (cognitive_memory.db)"""
+
+    async def record_decision(self, guild_id: int, decision_data: Dict):
+        await self._write('''
+            INSERT INTO cognitive.decisions
+            (guild_id, decision_type, action_taken, reasoning, confidence_score, timestamp, success_metrics)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            guild_id,
+            decision_data.get('type', 'unknown'),
+            json.dumps(decision_data.get('action', {})),
+            decision_data.get('reasoning', ''),
+            decision_data.get('confidence', 0.0),
+            datetime.now(timezone.utc),
+            json.dumps(decision_data.get('metrics', {}))
+        ))
+
+    async def record_feedback(self, decision_id: int, feedback_score: float, insights: str):
+        await self._write('''
+            UPDATE cognitive.decisions
+            SET feedback_score = ?, learned_insights = ?
+            WHERE id = ?
+        ''', (feedback_score, insights, decision_id))
+
+    async def decision_history(self, guild_id: int, decision_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        if decision_type:
+            return await self._fetchdicts('''
+                SELECT * FROM cognitive.decisions
+                WHERE guild_id = ? AND decision_type = ?
+                ORDER BY timestamp DESC LIMIT 50
+            ''', (guild_id, decision_type))
+        return await self._fetchdicts('''
+            SELECT * FROM cognitive.decisions
+            WHERE guild_id = ?
+            ORDER BY timestamp DESC LIMIT 100
+        ''', (guild_id,))
@@ -0,0 +1,77 @@
+import aiosqlite
+import logging
+
+from config.settings import STORAGE_CONFIG
+from database import migrations
+from database.database import Database
+from database.pool import ConnectionPool
+from database.repositories import (
+    AnalyticsRepository,
+    ClusterRepository,
+    CognitiveRepository,
+    ConversationRepository,
+    EconomyRepository,
+    GuildRepository,
+    LevelsRepository,
+    PromotionRepository,
+    ResponseCacheRepository,
+    RoleJobRepository,
+    ScheduleRepository,
+    ViralContentRepository
+)
+
+# Migrations for each attached schema, applied to its own file on open()
+SCHEMA_MIGRATIONS = {
+    'core': migrations.CORE_MIGRATIONS,
+    'analytics': migrations.ANALYTICS_MIGRATIONS,
+    'promotion': migrations.PROMOTION_MIGRATIONS,
+    'viral': migrations.VIRAL_MIGRATIONS,
+    'cognitive': migrations.COGNITIVE_MIGRATIONS
+}
+
+class Storage:
+    """Owner of every SQLite file the bot uses.
+
+    ultrabot.db is the main database and the other files are attached to
+    each pooled connection, so the whole bot shares one writer and a small
+    set of readers instead of opening a connection per query per file.
+    Cogs reach their tables through the typed repositories below.
+    """
+
+    def __init__(self, prefix_cache, path=None, attach=None, readers=None):
+        self.path = path or STORAGE_CONFIG['path']
+        self.attach = attach if attach is not None else STORAGE_CONFIG['attach']
+        self.pool = ConnectionPool(
+            self.path,
+            readers=readers or STORAGE_CONFIG['readers'],
+            attach=self.attach
+        )
+        self.guilds = GuildRepository(self.pool)
+        self.economy = EconomyRepository(self.pool)
+        self.levels = LevelsRepository(self.pool)
+        self.role_jobs = RoleJobRepository(self.pool)
+        self.schedule = ScheduleRepository(self.pool)
+        self.clusters = ClusterRepository(self.pool)
+        self.conversations = ConversationRepository(self.pool)
+        self.llm_cache = ResponseCacheRepository(self.pool)
+        self.analytics = AnalyticsRepository(self.pool)
+        self.promotion = PromotionRepository(self.pool)
+        self.viral = ViralContentRepository(self.pool)
+        self.cognitive = CognitiveRepository(self.pool)
+        # Settings, tickets and warnings from bot_database.db; prefixes come from the bot's cache
+        self.core = Database(self.pool, prefix_cache)
+
+    async def open(self):
+        """Bring every database file up to its latest schema version"""
+        await self._migrate(self.path, migrations.MIGRATIONS)
+        for schema, path in self.attach.items():
+            await self._migrate(path, SCHEMA_MIGRATIONS[schema])
+
+    async def _migrate(self, path, schema_migrations):
+        # DDL runs against the file itself so table names need no schema prefix
+        async with aiosqlite.connect(path) as db:
+            version = await migrations.migrate(db, schema_migrations)
+        logging.info(f"{path} is at schema version {version}")
+
+    async def close(self):
+        await self.pool.close()
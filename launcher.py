@@ -0,0 +1,115 @@
+"""Run UltraBot as several processes, each owning a contiguous range of shards.
+
+Asks Discord for the recommended shard count (unless --shards is given),
+splits the shards across --clusters processes running main.py, staggers
+their start so identifies stay within the session start limit, and
+restarts any cluster that exits with an error. Cluster totals such as the
+guild count in /info are shared through the cluster_stats table.
+
+    python launcher.py --clusters 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+import aiohttp
+from dotenv import load_dotenv
+
+from config.settings import SHARDING_SETTINGS
+from utils.clustering import CLUSTER_ID_ENV, SHARD_COUNT_ENV, SHARD_IDS_ENV, shard_ranges
+
+GATEWAY_URL = 'https://discord.com/api/v10/gateway/bot'
+# Seconds Discord requires between identifies in the same rate limit bucket
+IDENTIFY_INTERVAL = 5.0
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s launcher: %(message)s')
+
+async def fetch_gateway(token):
+    """``(recommended shard count, identify max_concurrency)`` for the bot"""
+    headers = {'Authorization': f'Bot {token}'}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers=headers) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data['shards'], data['session_start_limit']['max_concurrency']
+
+class Cluster:
+    """One main.py process and the shards it runs"""
+
+    def __init__(self, cluster_id, shard_ids, shard_count):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+
+    def environment(self):
+        env = dict(os.environ)
+        env[CLUSTER_ID_ENV] = str(self.cluster_id)
+        env[SHARD_IDS_ENV] = ','.join(map(str, self.shard_ids))
+        env[SHARD_COUNT_ENV] = str(self.shard_count)
+        return env
+
+    async def spawn(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, 'main.py', env=self.environment()
+        )
+        logging.info(f"Cluster {self.cluster_id} started (pid {self.process.pid}, shards {self.shard_ids})")
+
+    async def supervise(self, restart_delay, stopping):
+        while not stopping.is_set():
+            code = await self.process.wait()
+            if stopping.is_set() or code == 0:
+                logging.info(f"Cluster {self.cluster_id} exited with code {code}")
+                return
+            logging.warning(f"Cluster {self.cluster_id} exited with code {code}; restarting in {restart_delay}s")
+            await asyncio.sleep(restart_delay)
+            if not stopping.is_set():
+                await self.spawn()
+
+    def terminate(self):
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+
+async def run(clusters, shard_count):
+    load_dotenv()
+    token = os.getenv('DISCORD_TOKEN')
+    recommended, max_concurrency = await fetch_gateway(token)
+    shard_count = shard_count or SHARDING_SETTINGS['shard_count'] or recommended
+    ranges = shard_ranges(shard_count, clusters)
+    logging.info(f"Running {shard_count} shards in {len(ranges)} clusters")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    workers = [Cluster(cluster_id, shard_ids, shard_count) for cluster_id, shard_ids in enumerate(ranges)]
+    supervisors = []
+    for worker in workers:
+        if stopping.is_set():
+            break
+        await worker.spawn()
+        supervisors.append(asyncio.create_task(worker.supervise(SHARDING_SETTINGS['restart_delay'], stopping)))
+        # Each process identifies its shards one bucket at a time; let it finish before the next starts
+        await asyncio.sleep(IDENTIFY_INTERVAL * len(worker.shard_ids) / max_concurrency)
+
+    # Until a signal arrives or every cluster has exited for good
+    finished = asyncio.gather(*supervisors, return_exceptions=True)
+    await asyncio.wait({asyncio.create_task(stopping.wait()), finished}, return_when=asyncio.FIRST_COMPLETED)
+    stopping.set()
+    for worker in workers:
+        worker.terminate()
+    await asyncio.gather(*supervisors, return_exceptions=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clusters', type=int, default=SHARDING_SETTINGS['clusters'], help="processes to run")
+    parser.add_argument('--shards', type=int, default=None, help="total shard count (default: Discord's recommendation)")
+    args = parser.parse_args()
+    asyncio.run(run(args.clusters, args.shards))
+
+if __name__ == "__main__":
+    main()
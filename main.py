@@ -4,49 +4,30 @@ from discord import app_commands
 import asyncio
 import os
 import logging
-import aiosqlite
 import json
 from datetime import datetime, timezone
 import time
 import traceback
 from collections import defaultdict
-import psutil
 import sys
+from utils.content_filter import find_forbidden_phrase
+from utils.llm import close_llm_client, get_llm_client
+from utils.activity import ActivityCounters
+from utils.guild_snapshots import GuildSnapshotService
+from utils.role_jobs import RoleJobQueue
+from utils.scheduler import DeliveryScheduler
+from utils.clustering import ClusterInfo, ClusterStats
+from utils.capabilities import CapabilityProfile, declared_capabilities
+from utils.system_stats import SystemStatsSampler
+from utils.loop_monitor import LoopMonitor
+from utils.metrics_server import MetricsServer
 
 # Middleware for filtering message generation
 def block_forbidden_messages(content: str) -> bool:
-    forbidden_phrases = [
-        "@everyone",
-        "VIRAL CHALLENGE ALERT",
-        "BREAKING",
-        "CONTROVERSIAL gaming confession",
-        "Collaboration corner",
-        "COMMUNITY PULSE",
-        "ENERGY CHECK",
-        "HYPE TRAIN",
-        "MOMENTUM ALERT",
-        "POWER SURGE",
-        "VIBE CHECK",
-        "PEAK PERFORMANCE",
-        "UNSTOPPABLE FORCE",
-        "STAR POWER",
-        "WAVE OF ENERGY",
-        "DIAMOND MINDSET",
-        "ENERGY AMPLIFICATION",
-        "ENTHUSIASM OVERDRIVE",
-        "PASSION AMPLIFIER",
-        "HYPERDRIVE",
-        "TURBOCHARGED",
-        "MAXIMUM ENGAGEMENT",
-        "NUCLEAR PARTICIPATION",
-        "CONVERSATION SPARK",
-        "conversation spark",
-        "🚀 CONVERSATION SPARK"
-    ]
-    for phrase in forbidden_phrases:
-        if phrase.lower() in content.lower():
-            logging.warning(f"Attempted to generate a blocked message containing: {phrase}")
-            return False
+    phrase = find_forbidden_phrase(content)
+    if phrase:
+        logging.warning(f"Attempted to generate a blocked message containing: {phrase}")
+        return False
     return True
 
 # Enhanced message filtering - simplified approach
@@ -73,38 +54,10 @@ def enhanced_content_filter(content: str) -> bool:
 
 # Function to filter undesired messages
 def filter_message(content: str) -> str:
-    forbidden_phrases = [
-        "@everyone",
-        "VIRAL CHALLENGE ALERT",
-        "BREAKING",
-        "CONTROVERSIAL gaming confession",
-        "Collaboration corner",
-        "COMMUNITY PULSE",
-        "ENERGY CHECK",
-        "HYPE TRAIN",
-        "MOMENTUM ALERT",
-        "POWER SURGE",
-        "VIBE CHECK",
-        "PEAK PERFORMANCE",
-        "UNSTOPPABLE FORCE",
-        "STAR POWER",
-        "WAVE OF ENERGY",
-        "DIAMOND MINDSET",
-        "ENERGY AMPLIFICATION",
-        "ENTHUSIASM OVERDRIVE",
-        "PASSION AMPLIFIER",
-        "HYPERDRIVE",
-        "TURBOCHARGED",
-        "MAXIMUM ENGAGEMENT",
-        "NUCLEAR PARTICIPATION",
-        "CONVERSATION SPARK",
-        "conversation spark",
-        "🚀 CONVERSATION SPARK"
-    ]
-    for phrase in forbidden_phrases:
-        if phrase.lower() in content.lower():
-            logging.warning(f"Blocked message containing forbidden phrase: {phrase}")
-            return "[Blocked Message]"
+    phrase = find_forbidden_phrase(content)
+    if phrase:
+        logging.warning(f"Blocked message containing forbidden phrase: {phrase}")
+        return "[Blocked Message]"
     return content
 
 # Overriding send method for all outgoing messages
@@ -118,270 +71,88 @@ async def new_send(self, content=None, **kwargs):
 discord.TextChannel.send = new_send
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-import aiosqlite
 import json
+from database.database import PrefixCache
+from database.storage import Storage
+from config.settings import (
+    AI_SETTINGS,
+    CAPABILITY_SETTINGS,
+    EXTENSIONS,
+    LOOP_MONITOR_SETTINGS,
+    METRICS_SETTINGS,
+    ROLE_JOB_SETTINGS,
+    SCHEDULER_SETTINGS,
+    SHARDING_SETTINGS,
+    SYSTEM_STATS_SETTINGS
+)
 
 load_dotenv()
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 
-# Database setup
-async def init_database():
-    async with aiosqlite.connect('ultrabot.db') as db:
-        # Core tables
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS guilds (
-                guild_id INTEGER PRIMARY KEY,
-                prefix TEXT DEFAULT '/',
-                settings TEXT DEFAULT '{}',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER,
-                guild_id INTEGER,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                coins INTEGER DEFAULT 100,
-                warnings INTEGER DEFAULT 0,
-                messages_sent INTEGER DEFAULT 0,
-                voice_time INTEGER DEFAULT 0,
-                last_daily TIMESTAMP,
-                last_work TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, guild_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS moderation_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                moderator_id INTEGER,
-                action TEXT,
-                reason TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS automod_settings (
-                guild_id INTEGER PRIMARY KEY,
-                spam_protection BOOLEAN DEFAULT 1,
-                link_filter BOOLEAN DEFAULT 1,
-                word_filter BOOLEAN DEFAULT 1,
-                caps_filter BOOLEAN DEFAULT 1,
-                emoji_spam_filter BOOLEAN DEFAULT 1,
-                banned_words TEXT DEFAULT '[]',
-                immune_roles TEXT DEFAULT '[]'
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS chat_analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                user_id INTEGER,
-                message_length INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sentiment_score REAL,
-                toxicity_score REAL,
-                has_mentions BOOLEAN DEFAULT FALSE,
-                has_attachments BOOLEAN DEFAULT FALSE,
-                reaction_count INTEGER DEFAULT 0,
-                is_thread BOOLEAN DEFAULT FALSE
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS voice_analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                user_id INTEGER,
-                join_time TIMESTAMP,
-                leave_time TIMESTAMP,
-                duration_seconds INTEGER,
-                was_muted BOOLEAN DEFAULT FALSE,
-                was_deafened BOOLEAN DEFAULT FALSE
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS server_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                date DATE,
-                total_messages INTEGER DEFAULT 0,
-                active_users INTEGER DEFAULT 0,
-                new_members INTEGER DEFAULT 0,
-                left_members INTEGER DEFAULT 0,
-                voice_minutes INTEGER DEFAULT 0,
-                channels_created INTEGER DEFAULT 0,
-                channels_deleted INTEGER DEFAULT 0,
-                avg_message_length REAL DEFAULT 0
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS user_activity_summary (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                date DATE,
-                messages_sent INTEGER DEFAULT 0,
-                voice_minutes INTEGER DEFAULT 0,
-                reactions_given INTEGER DEFAULT 0,
-                reactions_received INTEGER DEFAULT 0,
-                commands_used INTEGER DEFAULT 0,
-                first_activity TIMESTAMP,
-                last_activity TIMESTAMP,
-                UNIQUE(guild_id, user_id, date)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS channel_analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                date DATE,
-                message_count INTEGER DEFAULT 0,
-                unique_users INTEGER DEFAULT 0,
-                avg_message_length REAL DEFAULT 0,
-                peak_hour INTEGER DEFAULT 0,
-                UNIQUE(guild_id, channel_id, date)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                reminder_text TEXT,
-                remind_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS custom_commands (
-                guild_id INTEGER,
-                command_name TEXT,
-                response TEXT,
-                created_by INTEGER,
-                usage_count INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, command_name)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS starboard (
-                message_id INTEGER PRIMARY KEY,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                author_id INTEGER,
-                star_count INTEGER DEFAULT 0,
-                starboard_message_id INTEGER
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS scheduled_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                channel_id INTEGER NOT NULL,
-                message TEXT NOT NULL,
-                send_at TIMESTAMP NOT NULL,
-                created_by INTEGER NOT NULL,
-                sent BOOLEAN DEFAULT FALSE
-            )
-        ''')
-        
-        # Create role menus table for customization hub
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS role_menus (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                channel_id INTEGER NOT NULL,
-                message_id INTEGER NOT NULL,
-                title TEXT,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create role menu options table
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS role_menu_options (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                menu_id INTEGER NOT NULL,
-                role_id INTEGER NOT NULL,
-                emoji TEXT,
-                description TEXT,
-                FOREIGN KEY (menu_id) REFERENCES role_menus (id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS auto_roles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                trigger_type TEXT NOT NULL,
-                trigger_value TEXT NOT NULL,
-                role_id INTEGER NOT NULL,
-                condition_value INTEGER DEFAULT 1
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS auto_reactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                trigger_type TEXT NOT NULL,
-                trigger_value TEXT NOT NULL,
-                emojis TEXT NOT NULL
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS welcome_config (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER,
-                message TEXT,
-                auto_role_id INTEGER
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS ai_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                command_name TEXT NOT NULL,
-                tokens_used INTEGER DEFAULT 0,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.commit()
+# Bot-level services that declare gateway capabilities next to the cogs
+SERVICES = (GuildSnapshotService, ActivityCounters, RoleJobQueue)
 
-class UltraBot(commands.Bot):
+class UltraBot(commands.AutoShardedBot):
     def __init__(self):
-        intents = discord.Intents.all()
+        self.capabilities = CapabilityProfile(
+            declared_capabilities(EXTENSIONS, SERVICES),
+            enabled_optional=CAPABILITY_SETTINGS['optional_intents']
+        )
+        for line in self.capabilities.report():
+            logging.info(line)
+        # All shards in this process unless launcher.py assigned a range
+        self.cluster = ClusterInfo.from_env(SHARDING_SETTINGS['shard_count'])
         super().__init__(
             command_prefix=self.get_prefix,
-            intents=intents,
             help_command=None,
             case_insensitive=True,
-            max_messages=10000  # Increased message cache for better performance
+            shard_count=self.cluster.shard_count,
+            shard_ids=self.cluster.shard_ids,
+            **self.capabilities.client_options()
+        )
+        self.prefixes = PrefixCache('/')
+        self.storage = Storage(self.prefixes)
+        self.cluster_stats = ClusterStats(
+            self,
+            self.storage.clusters,
+            self.cluster,
+            interval=SHARDING_SETTINGS['stats_interval'],
+            stale_after=SHARDING_SETTINGS['stats_stale_after']
+        )
+        self.role_jobs = RoleJobQueue(
+            self,
+            self.storage.role_jobs,
+            concurrency=ROLE_JOB_SETTINGS['concurrency'],
+            checkpoint_every=ROLE_JOB_SETTINGS['checkpoint_every']
+        )
+        self.scheduler = DeliveryScheduler(
+            self,
+            self.storage.schedule,
+            load_limit=SCHEDULER_SETTINGS['load_limit'],
+            max_batch=SCHEDULER_SETTINGS['max_batch']
+        )
+        self.snapshots = GuildSnapshotService(self)
+        self.channel_activity = ActivityCounters(self)
+        self.system_stats = SystemStatsSampler(
+            self,
+            interval=SYSTEM_STATS_SETTINGS['sample_interval'],
+            history=SYSTEM_STATS_SETTINGS['history_size']
         )
+        self.loop_monitor = LoopMonitor(
+            interval=LOOP_MONITOR_SETTINGS['ping_interval'],
+            threshold=LOOP_MONITOR_SETTINGS['slow_threshold'],
+            history=LOOP_MONITOR_SETTINGS['history_size'],
+            slow_events=LOOP_MONITOR_SETTINGS['slow_events_kept']
+        )
+        self.metrics_server = None
+        if METRICS_SETTINGS['enabled']:
+            self.metrics_server = MetricsServer(
+                self,
+                host=METRICS_SETTINGS['host'],
+                port=METRICS_SETTINGS['port'] + self.cluster.cluster_id
+            )
         self.start_time = datetime.now(timezone.utc)
         self.command_stats = defaultdict(int)
         self.error_count = 0
@@ -395,16 +166,11 @@ class UltraBot(commands.Bot):
         }
         
     async def get_system_stats(self):
-        """Get enhanced system performance statistics"""
+        """Get enhanced system performance statistics from the latest background sample"""
         try:
-            process = psutil.Process()
             return {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_percent': psutil.virtual_memory().percent,
-                'memory_usage_mb': process.memory_info().rss / 1024 / 1024,
+                **self.system_stats.latest(),
                 'uptime_hours': (time.time() - self.last_restart) / 3600,
-                'guilds': len(self.guilds),
-                'users': sum(guild.member_count or 0 for guild in self.guilds),
                 'commands_run': self.performance_metrics['commands_executed']
             }
         except Exception:
@@ -414,48 +180,64 @@ class UltraBot(commands.Bot):
         if not message.guild:
             return '/'
         
-        async with aiosqlite.connect('ultrabot.db') as db:
-            async with db.execute('SELECT prefix FROM guilds WHERE guild_id = ?', (message.guild.id,)) as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else '/'
+        return self.prefixes.get(message.guild.id)
+
+    async def load_prefixes(self):
+        """Preload every guild prefix so get_prefix never hits the database"""
+        self.prefixes.load(await self.storage.guilds.prefixes())
+
+    async def set_prefix(self, guild_id, prefix):
+        """Persist a guild prefix and update the in-memory cache"""
+        await self.storage.core.set_prefix(guild_id, prefix)
 
     async def setup_hook(self):
+        # Watch the loop from the start so slow startup work shows up too
+        self.loop_monitor.start()
         # Initialize database
-        await init_database()
-        
-        # Load essential cogs without automated messaging
-        cogs = [
-            'cogs.ai_features',
-            'cogs.basic_commands',
-            'cogs.moderation',
-            'cogs.economy',
-            'cogs.utility',
-            'cogs.entertainment',
-            'cogs.leveling',
-            'cogs.role_management',
-            'cogs.permission_fixer',
-            'cogs.server_events',
-            'cogs.autonomous_ai',
-            'cogs.promotional_engine',
+        await self.storage.open()
+        await self.load_prefixes()
+        await self.channel_activity.seed(self.storage.analytics)
+        if AI_SETTINGS['response_cache_persist']:
+            get_llm_client().response_cache.persist_to(self.storage.llm_cache)
+        self.role_jobs.start()
+        self.scheduler.start()
+        self.system_stats.start()
+        if self.metrics_server:
+            await self.metrics_server.start()
+        if self.cluster.partial:
+            self.cluster_stats.start()
 
-        ]
-        
-        for cog in cogs:
+        # Load essential cogs without automated messaging
+        for cog in EXTENSIONS:
             try:
                 await self.load_extension(cog)
                 print(f"✅ Loaded {cog}")
             except Exception as e:
                 print(f"❌ Failed to load {cog}: {e}")
         
-        # Sync slash commands
-        try:
-            synced = await self.tree.sync()
-            print(f"✅ Synced {len(synced)} slash commands")
-        except Exception as e:
-            print(f"❌ Failed to sync commands: {e}")
+        # Sync slash commands; the tree is global, so one cluster is enough
+        if self.cluster.is_primary:
+            try:
+                synced = await self.tree.sync()
+                print(f"✅ Synced {len(synced)} slash commands")
+            except Exception as e:
+                print(f"❌ Failed to sync commands: {e}")
         
         # No background tasks to prevent automated messaging
 
+    async def close(self):
+        await self.role_jobs.close()
+        await self.scheduler.close()
+        await self.cluster_stats.close()
+        await self.system_stats.close()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        await super().close()
+        await close_llm_client()
+        # After the cogs have flushed their buffered writes on unload
+        await self.storage.close()
+        self.loop_monitor.close()
+
     async def on_ready(self):
         print(f"🤖 {self.user.name} - Ultra Multi-Functional Bot")
         print(f"📊 Connected to {len(self.guilds)} guilds")
@@ -471,12 +253,12 @@ class UltraBot(commands.Bot):
 
     async def on_guild_join(self, guild):
         # Initialize guild in database
-        async with aiosqlite.connect('ultrabot.db') as db:
-            await db.execute(
-                'INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)',
-                (guild.id,)
-            )
-            await db.commit()
+        await self.storage.guilds.ensure(guild.id)
+
+    async def on_app_command_completion(self, interaction, command):
+        # Feeds commands_run in /system-stats and ultrabot_commands_total on /metrics
+        self.performance_metrics['commands_executed'] += 1
+        self.command_stats[command.qualified_name] += 1
 
     # All automated background tasks removed to prevent unwanted messages
 
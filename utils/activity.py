@@ -0,0 +1,106 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils.capabilities import Capabilities
+
+# Hours of history the counters keep
+WINDOW_HOURS = 24
+
+def current_hour():
+    return int(time.time() // 3600)
+
+class ChannelActivity:
+    """Rolling message and author counts of one channel over the last day.
+
+    Messages are counted in a ring of hourly buckets and each author is
+    stored once with the last hour they posted in, so memory stays at 24
+    ints plus one entry per recent author however busy the channel is.
+    """
+
+    __slots__ = ('hour', 'hourly', 'authors')
+
+    def __init__(self, hour):
+        self.hour = hour
+        self.hourly = [0] * WINDOW_HOURS
+        self.authors = {}
+
+    def _advance(self, hour):
+        if hour <= self.hour:
+            return
+        if hour - self.hour >= WINDOW_HOURS:
+            self.hourly = [0] * WINDOW_HOURS
+        else:
+            for skipped in range(self.hour + 1, hour + 1):
+                self.hourly[skipped % WINDOW_HOURS] = 0
+        self.hour = hour
+
+    def record(self, author_id, hour, count=1):
+        """Count ``count`` messages by an author in the given hour"""
+        self._advance(hour)
+        if hour <= self.hour - WINDOW_HOURS:
+            return
+        self.hourly[hour % WINDOW_HOURS] += count
+        if self.authors.get(author_id, -1) < hour:
+            self.authors[author_id] = hour
+
+    def stats(self, hour):
+        self._advance(hour)
+        oldest = hour - WINDOW_HOURS + 1
+        self.authors = {author: seen for author, seen in self.authors.items() if seen >= oldest}
+        messages_last_day = sum(self.hourly)
+        return {
+            'messages_this_hour': self.hourly[hour % WINDOW_HOURS],
+            'messages_last_day': messages_last_day,
+            'messages_per_hour': round(messages_last_day / WINDOW_HOURS, 2),
+            'unique_authors_last_day': len(self.authors)
+        }
+
+class ActivityCounters:
+    """Per-channel activity fed by the bot's message stream.
+
+    Used instead of paging through ``channel.history`` when an analysis
+    needs to know how busy a channel was. Counters live in memory and are
+    seeded from the analytics activity log on startup.
+    """
+
+    capabilities = Capabilities(intents=('guild_messages',))
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._channels = {}
+        bot.add_listener(self.on_message, 'on_message')
+        bot.add_listener(self.on_guild_channel_delete, 'on_guild_channel_delete')
+
+    async def seed(self, repository):
+        """Load the last day of logged message activity"""
+        since = datetime.now(timezone.utc) - timedelta(hours=WINDOW_HOURS)
+        try:
+            rows = await repository.hourly_channel_activity(since)
+        except Exception as e:
+            logging.warning(f"Could not seed channel activity counters: {e}")
+            return
+        for channel_id, user_id, hour, count in rows:
+            self._channel(channel_id, hour).record(user_id, hour, count)
+        logging.info(f"Seeded activity counters for {len(self._channels)} channels")
+
+    def _channel(self, channel_id, hour):
+        activity = self._channels.get(channel_id)
+        if activity is None:
+            activity = self._channels[channel_id] = ChannelActivity(hour)
+        return activity
+
+    def channel_stats(self, channel_id):
+        """Rolling counts for a channel; all zero if nothing was posted in the last day"""
+        hour = current_hour()
+        activity = self._channels.get(channel_id) or ChannelActivity(hour)
+        return activity.stats(hour)
+
+    async def on_message(self, message):
+        if not message.guild or message.author.bot:
+            return
+        hour = current_hour()
+        self._channel(message.channel.id, hour).record(message.author.id, hour)
+
+    async def on_guild_channel_delete(self, channel):
+        self._channels.pop(channel.id, None)
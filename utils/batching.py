@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+class WriteBehindBuffer:
+    """Accumulate rows in memory and hand them to an async callback in batches.
+
+    A flush is started once ``max_rows`` rows are pending or ``interval``
+    seconds after the first row of a batch arrived, whichever comes first.
+    ``close()`` must be awaited on shutdown so buffered rows are not lost.
+    """
+
+    def __init__(self, flush_callback, max_rows=100, interval=2.0, max_backlog=None):
+        self.flush_callback = flush_callback
+        self.max_rows = max_rows
+        self.interval = interval
+        # Rows kept for retry after failed flushes before the oldest are dropped
+        self.max_backlog = max_backlog or max_rows * 50
+        self._rows = []
+        self._timer = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_tasks = set()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, row):
+        """Buffer a row; never blocks on I/O"""
+        self._rows.append(row)
+        if len(self._rows) >= self.max_rows:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._start_flush)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """Write every buffered row now"""
+        async with self._flush_lock:
+            if not self._rows:
+                return
+            rows, self._rows = self._rows, []
+            try:
+                await self.flush_callback(rows)
+            except Exception as e:
+                logging.error(f"Failed to flush {len(rows)} buffered rows: {e}")
+                self._rows[:0] = rows
+                if len(self._rows) > self.max_backlog:
+                    dropped = len(self._rows) - self.max_backlog
+                    del self._rows[:dropped]
+                    logging.warning(f"Dropped {dropped} buffered rows after repeated flush failures")
+
+    async def close(self):
+        """Cancel the pending timer and flush everything that is left"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+class DeltaAccumulator:
+    """Sum numeric deltas per key in memory and write the sums in batches.
+
+    ``flush_callback`` receives a ``{key: delta}`` dict. A flush starts once
+    ``max_keys`` distinct keys are pending or ``interval`` seconds after the
+    first delta of a batch; failed batches are merged back for the next try.
+    """
+
+    def __init__(self, flush_callback, interval=10.0, max_keys=500):
+        self.flush_callback = flush_callback
+        self.interval = interval
+        self.max_keys = max_keys
+        self._pending = {}
+        self._timer = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_tasks = set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key, delta):
+        """Accumulate a delta; never blocks on I/O"""
+        self._pending[key] = self._pending.get(key, 0) + delta
+        if len(self._pending) >= self.max_keys:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._start_flush)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """Write every pending delta now"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                await self.flush_callback(pending)
+            except Exception as e:
+                logging.error(f"Failed to flush {len(pending)} accumulated deltas: {e}")
+                for key, delta in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + delta
+
+    async def discard_where(self, predicate):
+        """Drop pending deltas whose key matches, after any running flush finished"""
+        async with self._flush_lock:
+            for key in [key for key in self._pending if predicate(key)]:
+                del self._pending[key]
+
+    async def close(self):
+        """Cancel the pending timer and flush everything that is left"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+class BurstCoalescer:
+    """Let events through one by one until they arrive in a burst, then batch them.
+
+    ``add()`` returns True while a key has seen at most ``threshold`` events
+    in the last ``window`` seconds, and the caller handles the event itself.
+    Past that the event is queued and ``flush_callback(key, events)`` gets
+    everything queued for the key once every ``interval`` seconds, so the
+    callback volume stays bounded however fast events arrive.
+    """
+
+    def __init__(self, flush_callback, threshold=10, window=60.0, interval=15.0):
+        self.flush_callback = flush_callback
+        self.threshold = threshold
+        self.window = window
+        self.interval = interval
+        self._recent = {}
+        self._pending = {}
+        self._timers = {}
+        self._flush_tasks = set()
+
+    def add(self, key, event):
+        """Return True if the caller should handle ``event`` now, False if it was queued"""
+        now = time.monotonic()
+        # Only the last threshold + 1 timestamps are needed to tell a burst apart
+        recent = self._recent.get(key)
+        if recent is None:
+            recent = self._recent[key] = deque(maxlen=self.threshold + 1)
+        recent.append(now)
+        while recent[0] <= now - self.window:
+            recent.popleft()
+        if key not in self._pending and len(recent) <= self.threshold:
+            return True
+        self._pending.setdefault(key, []).append(event)
+        if key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.interval, self._start_flush, key)
+        return False
+
+    def _start_flush(self, key):
+        self._timers.pop(key, None)
+        task = asyncio.create_task(self.flush(key))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self, key):
+        """Hand every event queued for ``key`` to the callback now"""
+        events = self._pending.pop(key, None)
+        recent = self._recent.get(key)
+        if recent and recent[-1] <= time.monotonic() - self.window:
+            del self._recent[key]
+        if not events:
+            return
+        try:
+            await self.flush_callback(key, events)
+        except Exception as e:
+            logging.error(f"Failed to flush {len(events)} batched events for {key}: {e}")
+
+    async def close(self):
+        """Cancel the pending timers and flush every queued event"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        for key in list(self._pending):
+            await self.flush(key)
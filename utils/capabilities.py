@@ -0,0 +1,108 @@
+import importlib
+import inspect
+import logging
+
+import discord
+from discord.ext import commands
+
+class Capabilities:
+    """Gateway intents and caches one cog or bot service depends on.
+
+    ``intents`` and ``member_cache`` name attributes of discord.Intents and
+    discord.MemberCacheFlags. ``optional_intents`` improve a feature the
+    code can run without (presence-based online counts, for example) and
+    are only requested when CAPABILITY_SETTINGS enables them.
+    ``chunk_guilds`` asks for every member list at startup and
+    ``messages`` for that many entries in the message cache. Declare them
+    as a ``capabilities`` class attribute.
+    """
+
+    __slots__ = ('intents', 'optional_intents', 'member_cache', 'chunk_guilds', 'messages')
+
+    def __init__(self, intents=(), optional_intents=(), member_cache=(), chunk_guilds=False, messages=0):
+        self.intents = frozenset(intents)
+        self.optional_intents = frozenset(optional_intents)
+        self.member_cache = frozenset(member_cache)
+        self.chunk_guilds = chunk_guilds
+        self.messages = messages
+
+# discord.py keeps guild, channel and role state from the guilds intent
+BASE_CAPABILITIES = Capabilities(intents=('guilds',))
+
+def declared_capabilities(extensions, services=()):
+    """``{owner name: Capabilities}`` for the cogs in ``extensions`` and the given service classes.
+
+    Extension modules are imported to read their cog classes; a cog
+    without a declaration needs nothing beyond the base intents.
+    """
+    declarations = {'discord.py': BASE_CAPABILITIES}
+    for extension in extensions:
+        try:
+            module = importlib.import_module(extension)
+        except Exception as e:
+            # load_extension will report the same failure
+            logging.warning(f"Could not read capabilities of {extension}: {e}")
+            continue
+        for name, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, commands.Cog) and cls.__module__ == module.__name__:
+                declarations[name] = getattr(cls, 'capabilities', None) or Capabilities()
+    for service in services:
+        declarations[service.__name__] = getattr(service, 'capabilities', None) or Capabilities()
+    return declarations
+
+class CapabilityProfile:
+    """The smallest client configuration that satisfies every declaration"""
+
+    def __init__(self, declarations, enabled_optional=()):
+        self.declarations = declarations
+        self.enabled_optional = frozenset(enabled_optional)
+
+        names = set()
+        member_cache = set()
+        for capabilities in declarations.values():
+            names |= capabilities.intents
+            names |= capabilities.optional_intents & self.enabled_optional
+            member_cache |= capabilities.member_cache
+            if capabilities.chunk_guilds:
+                # Chunked members are only kept when joined members are cached
+                names.add('members')
+                member_cache.add('joined')
+        self.intents = discord.Intents(**{name: True for name in names})
+        self.member_cache_flags = discord.MemberCacheFlags.none()
+        for flag in member_cache:
+            setattr(self.member_cache_flags, flag, True)
+        self.chunk_guilds_at_startup = any(capabilities.chunk_guilds for capabilities in declarations.values())
+        # discord.py treats 0 as its default of 1000; None turns the cache off
+        self.max_messages = max((capabilities.messages for capabilities in declarations.values()), default=0) or None
+
+    def client_options(self):
+        """Keyword arguments for the commands.Bot constructor"""
+        return {
+            'intents': self.intents,
+            'member_cache_flags': self.member_cache_flags,
+            'chunk_guilds_at_startup': self.chunk_guilds_at_startup,
+            'max_messages': self.max_messages
+        }
+
+    def _owners(self, attribute, value):
+        return ', '.join(
+            owner for owner, capabilities in self.declarations.items() if value in getattr(capabilities, attribute)
+        )
+
+    def report(self):
+        """Lines describing what is requested and which cog needs it"""
+        lines = ["Gateway intents:"]
+        for name, enabled in self.intents:
+            if enabled:
+                lines.append(f"  {name}: {self._owners('intents', name) or self._owners('optional_intents', name)}")
+        skipped = sorted({
+            name for capabilities in self.declarations.values()
+            for name in capabilities.optional_intents - self.enabled_optional
+        })
+        for name in skipped:
+            lines.append(f"  {name} (optional, not requested): {self._owners('optional_intents', name)}")
+        cached = [name for name, enabled in self.member_cache_flags if enabled]
+        lines.append(f"Member cache: {', '.join(cached) or 'none'}; "
+                     f"chunk guilds at startup: {'yes' if self.chunk_guilds_at_startup else 'no'}; "
+                     f"message cache: {self.max_messages or 'off'}")
+        return lines
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import time
+
+# Environment variables launcher.py sets for each cluster process
+CLUSTER_ID_ENV = 'ULTRABOT_CLUSTER_ID'
+SHARD_IDS_ENV = 'ULTRABOT_SHARD_IDS'
+SHARD_COUNT_ENV = 'ULTRABOT_SHARD_COUNT'
+
+def shard_id_for(guild_id, shard_count):
+    """Shard that receives a guild's events"""
+    return (guild_id >> 22) % shard_count
+
+def shard_ranges(shard_count, clusters):
+    """Split shards 0..shard_count-1 into ``clusters`` contiguous, near-equal ranges"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges = []
+    start = 0
+    for index in range(clusters):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+class ClusterInfo:
+    """The shards this process runs.
+
+    A plain ``python main.py`` is cluster 0 and lets AutoShardedBot run
+    every shard; under launcher.py each process gets its cluster id, shard
+    ids and the total shard count from the environment.
+    """
+
+    def __init__(self, cluster_id=0, shard_ids=None, shard_count=None):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+
+    @classmethod
+    def from_env(cls, default_shard_count=None):
+        shard_ids = os.getenv(SHARD_IDS_ENV)
+        shard_count = os.getenv(SHARD_COUNT_ENV)
+        return cls(
+            cluster_id=int(os.getenv(CLUSTER_ID_ENV, 0)),
+            shard_ids=[int(shard) for shard in shard_ids.split(',')] if shard_ids else None,
+            shard_count=int(shard_count) if shard_count else default_shard_count
+        )
+
+    @property
+    def is_primary(self):
+        """Whether this process does once-per-bot work such as syncing slash commands"""
+        return self.cluster_id == 0
+
+    @property
+    def partial(self):
+        """Whether other processes run some of the bot's shards"""
+        return self.shard_ids is not None
+
+    def owns_guild(self, guild_id):
+        if not self.partial:
+            return True
+        return shard_id_for(guild_id, self.shard_count) in self.shard_ids
+
+class ClusterStats:
+    """Bot-wide guild and member totals shared through SQLite.
+
+    Every cluster writes its own counts to ``cluster_stats`` each
+    ``interval`` seconds; ``totals()`` sums the rows refreshed within
+    ``stale_after`` seconds, so a crashed cluster drops out on its own.
+    """
+
+    def __init__(self, bot, repository, cluster, interval=30.0, stale_after=120.0):
+        self.bot = bot
+        self.repository = repository
+        self.cluster = cluster
+        self.interval = interval
+        self.stale_after = stale_after
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def local(self):
+        return {
+            'clusters': 1,
+            'shards': self.bot.shard_count or 1,
+            'guilds': len(self.bot.guilds),
+            'members': sum(guild.member_count or 0 for guild in self.bot.guilds)
+        }
+
+    async def publish(self):
+        await self.repository.publish(
+            self.cluster.cluster_id,
+            self.cluster.shard_ids or list(self.bot.shards),
+            len(self.bot.guilds),
+            sum(guild.member_count or 0 for guild in self.bot.guilds),
+            self.bot.latency,
+            time.time()
+        )
+
+    async def totals(self):
+        """Counts across every live cluster, or this process's own if it runs alone"""
+        if not self.cluster.partial:
+            return self.local()
+        try:
+            rows = await self.repository.live(time.time() - self.stale_after)
+        except Exception as e:
+            logging.warning(f"Could not read cluster stats: {e}")
+            rows = []
+        if not rows:
+            return self.local()
+        return {
+            'clusters': len(rows),
+            'shards': self.cluster.shard_count,
+            'guilds': sum(row['guilds'] for row in rows),
+            'members': sum(row['members'] for row in rows)
+        }
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.publish()
+            except Exception as e:
+                logging.warning(f"Could not publish cluster stats: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            try:
+                await self.repository.remove(self.cluster.cluster_id)
+            except Exception as e:
+                logging.warning(f"Could not clear cluster stats: {e}")
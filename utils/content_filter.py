@@ -0,0 +1,52 @@
+# Phrases that must never appear in anything the bot sends (matched case-insensitively)
+FORBIDDEN_PHRASES = (
+    "@everyone",
+    "VIRAL CHALLENGE ALERT",
+    "BREAKING",
+    "CONTROVERSIAL gaming confession",
+    "Collaboration corner",
+    "COMMUNITY PULSE",
+    "ENERGY CHECK",
+    "HYPE TRAIN",
+    "MOMENTUM ALERT",
+    "POWER SURGE",
+    "VIBE CHECK",
+    "PEAK PERFORMANCE",
+    "UNSTOPPABLE FORCE",
+    "STAR POWER",
+    "WAVE OF ENERGY",
+    "DIAMOND MINDSET",
+    "ENERGY AMPLIFICATION",
+    "ENTHUSIASM OVERDRIVE",
+    "PASSION AMPLIFIER",
+    "HYPERDRIVE",
+    "TURBOCHARGED",
+    "MAXIMUM ENGAGEMENT",
+    "NUCLEAR PARTICIPATION",
+    "CONVERSATION SPARK",
+    "conversation spark",
+    "🚀 CONVERSATION SPARK"
+)
+
+def compile_phrase_matcher(phrases):
+    """Precompute the lowercased phrases a message has to be checked against.
+
+    Phrases that contain another phrase are dropped since the shorter one
+    already matches, and shorter phrases are tried first. The message is then
+    lowered once per check instead of once per phrase; plain ``in`` scans
+    beat both ``re.IGNORECASE`` and a combined alternation here because the
+    phrases start with common letters, which defeats the regex prefix scan.
+    """
+    lowered = {phrase.lower() for phrase in phrases}
+    minimal = [p for p in lowered if not any(other != p and other in p for other in lowered)]
+    return tuple(sorted(minimal, key=lambda p: (len(p), p)))
+
+FORBIDDEN_MATCHER = compile_phrase_matcher(FORBIDDEN_PHRASES)
+
+def find_forbidden_phrase(content):
+    """Return the first forbidden phrase found in content, or None"""
+    lowered = content.lower()
+    for phrase in FORBIDDEN_MATCHER:
+        if phrase in lowered:
+            return phrase
+    return None
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from types import MappingProxyType
+
+import discord
+
+from utils.capabilities import Capabilities
+
+# Text channel name keywords that mark a channel worth mentioning in prompts
+SPECIAL_CHANNEL_KEYWORDS = ('game', 'music', 'art', 'meme', 'event')
+
+class GuildSnapshotService:
+    """Guild aggregates for prompts, maintained from gateway events.
+
+    Bot and online member counts are adjusted by member and presence events
+    instead of walking ``guild.members``; channel aggregates are recomputed
+    on channel events, which are rare. ``snapshot(guild)`` returns a
+    read-only mapping that is rebuilt only after something changed, so
+    building a prompt never iterates the member list.
+
+    Bot counts come from the member cache, so a guild that was not
+    chunked at startup is chunked in the background on its first
+    snapshot. Online counts need the presences intent and are None
+    without it.
+    """
+
+    capabilities = Capabilities(intents=('members',), optional_intents=('presences',), member_cache=('joined',))
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._counters = {}
+        self._snapshots = {}
+        self._chunking = {}
+        for event in ('on_ready', 'on_guild_join', 'on_guild_available', 'on_guild_remove', 'on_guild_update',
+                      'on_guild_role_create', 'on_guild_role_delete',
+                      'on_member_join', 'on_member_remove', 'on_presence_update',
+                      'on_guild_channel_create', 'on_guild_channel_delete', 'on_guild_channel_update'):
+            bot.add_listener(getattr(self, event), event)
+
+    def snapshot(self, guild):
+        """Current aggregates of a guild as a read-only mapping"""
+        snapshot = self._snapshots.get(guild.id)
+        if snapshot is None:
+            self._request_members(guild)
+            if guild.id not in self._counters:
+                self._count_members(guild)
+                self._count_channels(guild)
+            snapshot = self._snapshots[guild.id] = self._build(guild)
+        return snapshot
+
+    def _request_members(self, guild):
+        if guild.chunked or guild.id in self._chunking or not self.bot.intents.members:
+            return
+        self._chunking[guild.id] = asyncio.create_task(self._chunk(guild))
+
+    async def _chunk(self, guild):
+        try:
+            await guild.chunk()
+            self._count_members(guild)
+        except Exception as e:
+            logging.warning(f"Could not load members of {guild.name}: {e}")
+        finally:
+            self._chunking.pop(guild.id, None)
+
+    def _build(self, guild):
+        counters = self._counters[guild.id]
+        member_count = guild.member_count or 0
+        online = counters['online']
+        return MappingProxyType({
+            'server_name': guild.name,
+            'member_count': member_count,
+            'bot_count': counters['bots'],
+            'human_count': member_count - counters['bots'],
+            'online_count': online,
+            'online_ratio': None if online is None else online / member_count if member_count > 0 else 0,
+            'channel_count': counters['channels'],
+            'text_channel_count': counters['text_channels'],
+            'voice_channel_count': counters['voice_channels'],
+            'special_channels': counters['special_channels'],
+            'role_count': len(guild.roles),
+            'boost_level': guild.premium_tier,
+            'boost_count': guild.premium_subscription_count or 0,
+            'created_at': guild.created_at.isoformat(),
+            'owner_id': guild.owner_id,
+            'taken_at': time.time()
+        })
+
+    def _count_members(self, guild):
+        counters = self._counters.setdefault(guild.id, {})
+        counters['bots'] = sum(1 for member in guild.members if member.bot)
+        counters['online'] = (
+            sum(1 for member in guild.members if member.status != discord.Status.offline)
+            if self.bot.intents.presences else None
+        )
+        self._snapshots.pop(guild.id, None)
+
+    def _count_channels(self, guild):
+        counters = self._counters.setdefault(guild.id, {})
+        text_channels = guild.text_channels
+        counters['channels'] = len(guild.channels)
+        counters['text_channels'] = len(text_channels)
+        counters['voice_channels'] = len(guild.voice_channels)
+        counters['special_channels'] = tuple(
+            channel.name for channel in text_channels
+            if any(keyword in channel.name.lower() for keyword in SPECIAL_CHANNEL_KEYWORDS)
+        )
+        self._snapshots.pop(guild.id, None)
+
+    def _adjust(self, guild, bots=0, online=0):
+        counters = self._counters.get(guild.id)
+        if counters is None:
+            return
+        counters['bots'] += bots
+        if counters['online'] is not None:
+            counters['online'] += online
+        self._snapshots.pop(guild.id, None)
+
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self._count_members(guild)
+            self._count_channels(guild)
+
+    async def on_guild_join(self, guild):
+        self._count_members(guild)
+        self._count_channels(guild)
+
+    async def on_guild_available(self, guild):
+        await self.on_guild_join(guild)
+
+    async def on_guild_remove(self, guild):
+        self._counters.pop(guild.id, None)
+        self._snapshots.pop(guild.id, None)
+
+    async def on_guild_update(self, before, after):
+        # Name and boost changes; the counters are unaffected
+        self._snapshots.pop(after.id, None)
+
+    async def on_guild_role_create(self, role):
+        self._snapshots.pop(role.guild.id, None)
+
+    async def on_guild_role_delete(self, role):
+        self._snapshots.pop(role.guild.id, None)
+
+    async def on_member_join(self, member):
+        self._adjust(member.guild, bots=int(member.bot), online=int(member.status != discord.Status.offline))
+
+    async def on_member_remove(self, member):
+        self._adjust(member.guild, bots=-int(member.bot), online=-int(member.status != discord.Status.offline))
+
+    async def on_presence_update(self, before, after):
+        was_online = before.status != discord.Status.offline
+        is_online = after.status != discord.Status.offline
+        if was_online != is_online:
+            self._adjust(after.guild, online=1 if is_online else -1)
+
+    async def on_guild_channel_create(self, channel):
+        self._count_channels(channel.guild)
+
+    async def on_guild_channel_delete(self, channel):
+        self._count_channels(channel.guild)
+
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name or before.type != after.type:
+            self._count_channels(after.guild)
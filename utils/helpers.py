@@ -75,9 +75,8 @@ async def get_prefix(bot, message):
     if not message.guild:
         return '!'
     
-    # Get prefix from database
-    prefix = await bot.db.get_prefix(message.guild.id)
-    return prefix
+    # Same in-memory cache UltraBot.get_prefix reads
+    return bot.prefixes.get(message.guild.id)
 
 def clean_text(text, max_length=2000):
     """Clean and truncate text for Discord"""
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import re
+
+from openai import AsyncOpenAI
+
+from config.settings import AI_SETTINGS
+from utils.response_cache import ResponseCache
+
+# Chat format tokens OpenAI adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text):
+    """Approximate the BPE token count of ``text`` without a tokenizer.
+
+    Common English words are a single token, longer ones roughly one per
+    five characters, and punctuation is usually a token of its own.
+    Non-ASCII runs (CJK, emoji) count a token per character, which over-
+    rather than under-estimates.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        tokens += 1 + (len(piece) - 1) // 5 if piece.isascii() else len(piece)
+    return tokens
+
+def message_tokens(message):
+    """Estimated prompt tokens of one chat message"""
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+class LLMClient:
+    """Shared async OpenAI client for every cog.
+
+    Requests run on the event loop through ``AsyncOpenAI`` so a slow
+    completion never blocks the gateway heartbeat. At most
+    ``max_concurrency`` requests are in flight at once, each one is bounded
+    by ``timeout`` seconds, and cancelling the awaiting task (for example
+    when a command is aborted) cancels the HTTP request with it.
+    Callers that pass ``cache_ttl`` to ``chat`` share responses through
+    ``response_cache``.
+    """
+
+    def __init__(self, api_key=None, max_concurrency=4, timeout=60.0, max_retries=1, cache_entries=512):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.response_cache = ResponseCache(max_entries=cache_entries)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client = None
+
+    @property
+    def client(self):
+        # Created lazily so a missing key only fails the request that needs it
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key or os.getenv('OPENAI_API_KEY'),
+                timeout=self.timeout,
+                max_retries=self.max_retries
+            )
+        return self._client
+
+    async def _call(self, method, timeout, **kwargs):
+        timeout = timeout or self.timeout
+        async with self._slots:
+            try:
+                return await asyncio.wait_for(method(**kwargs), timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"OpenAI request timed out after {timeout:g}s") from None
+
+    async def chat(self, messages, model=None, timeout=None, cache_ttl=None, **kwargs):
+        """Run a chat completion and return the text of the first choice.
+
+        With ``cache_ttl`` an equivalent request made in the last
+        ``cache_ttl`` seconds is answered from the response cache.
+        """
+        model = model or AI_SETTINGS['model']
+        if cache_ttl:
+            key = ResponseCache.make_key(model, messages, **kwargs)
+            return await self.response_cache.get_or_create(
+                key, cache_ttl, lambda: self.chat(messages, model=model, timeout=timeout, **kwargs)
+            )
+        response = await self._call(
+            self.client.chat.completions.create, timeout,
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+        return response.choices[0].message.content
+
+    async def image(self, prompt, model="dall-e-3", timeout=None, **kwargs):
+        """Generate an image and return the URL of the first result"""
+        response = await self._call(self.client.images.generate, timeout, model=model, prompt=prompt, **kwargs)
+        return response.data[0].url
+
+    async def close(self):
+        """Flush the response cache and close the underlying HTTP connection pool"""
+        await self.response_cache.close()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+_shared_client = None
+
+def get_llm_client():
+    """Return the process-wide LLM client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LLMClient(
+            max_concurrency=AI_SETTINGS['max_concurrency'],
+            timeout=AI_SETTINGS['request_timeout'],
+            max_retries=AI_SETTINGS['max_retries'],
+            cache_entries=AI_SETTINGS['response_cache_entries']
+        )
+    return _shared_client
+
+async def close_llm_client():
+    """Close the shared client if one was created"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from discord import app_commands
+from discord.ext import commands, tasks
+
+# Frames under this directory are the bot's own code
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+class LoopMonitor:
+    """Event loop lag and blocking-callback watchdog.
+
+    A daemon thread schedules a no-op on the loop every ``interval``
+    seconds with ``call_soon_threadsafe`` and records how long it took to
+    run, which is the delay every other callback saw at that moment. If a
+    ping is still waiting after ``threshold`` seconds, the thread captures
+    the loop thread's stack while it is blocked, names the command, task
+    or cog code on it, and the event is logged with its full duration
+    once the loop answers.
+    """
+
+    def __init__(self, interval=0.1, threshold=0.1, history=3000, slow_events=50):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = deque(maxlen=history)
+        self.slow_events = deque(maxlen=slow_events)
+        self.slow_total = 0
+        self._loop = None
+        self._loop_thread_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching the running loop; call from a coroutine on it"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._watch, name='loop-monitor', daemon=True)
+        self._thread.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            answered = threading.Event()
+            sent = time.perf_counter()
+            event = {}
+            try:
+                self._loop.call_soon_threadsafe(self._answer, sent, answered, event)
+            except RuntimeError:
+                # Loop closed
+                return
+            if answered.wait(self.threshold):
+                continue
+            event.update(self._capture())
+            while not answered.wait(self.interval):
+                if self._stop.is_set() or self._loop.is_closed():
+                    return
+
+    def _answer(self, sent, answered, event):
+        lag = time.perf_counter() - sent
+        self.lags.append(lag)
+        answered.set()
+        if lag >= self.threshold and event:
+            event['duration_ms'] = lag * 1000
+            self.slow_events.append(event)
+            self.slow_total += 1
+            logging.warning(
+                f"Event loop blocked for {lag * 1000:.0f} ms in {event['location']}"
+                f"{' (' + event['source'] + ')' if event['source'] else ''}\n{event['stack']}"
+            )
+
+    def _capture(self):
+        """Stack of the loop thread and the command or task it is running"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame else traceback.StackSummary()
+        own = [entry for entry in stack if entry.filename.startswith(PROJECT_ROOT)]
+        location = (
+            f"{os.path.relpath(own[-1].filename, PROJECT_ROOT)}:{own[-1].lineno} in {own[-1].name}"
+            if own else "unknown code"
+        )
+        return {
+            'timestamp': time.time(),
+            'location': location,
+            'source': self._source(frame),
+            'stack': ''.join(traceback.format_list(stack[-15:]))
+        }
+
+    @staticmethod
+    def _source(frame):
+        # The nearest discord.py object on the stack that names what was running
+        while frame is not None:
+            owner = frame.f_locals.get('self')
+            if isinstance(owner, app_commands.Command):
+                return f"/{owner.qualified_name}"
+            if isinstance(owner, commands.Command):
+                return f"command {owner.qualified_name}"
+            if isinstance(owner, tasks.Loop):
+                return f"task {owner.coro.__qualname__}"
+            frame = frame.f_back
+        return None
+
+    def stats(self):
+        """Lag percentiles in milliseconds over the recorded pings"""
+        ordered = sorted(self.lags)
+        return {
+            'samples': len(ordered),
+            'p50_ms': percentile(ordered, 0.50) * 1000,
+            'p95_ms': percentile(ordered, 0.95) * 1000,
+            'p99_ms': percentile(ordered, 0.99) * 1000,
+            'max_ms': (ordered[-1] if ordered else 0.0) * 1000,
+            'slow_total': self.slow_total
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + self.threshold + 1)
@@ -0,0 +1,65 @@
+import logging
+
+from aiohttp import web
+
+class MetricsServer:
+    """Prometheus text endpoint for loop health and system stats.
+
+    Serves ``GET /metrics`` from the loop monitor and the background stats
+    sampler, so a scrape only formats numbers that are already in memory.
+    Each sample carries a ``cluster`` label so clustered processes can be
+    scraped side by side.
+    """
+
+    def __init__(self, bot, host='127.0.0.1', port=9102):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logging.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    def render(self):
+        label = f'cluster="{self.bot.cluster.cluster_id}"'
+        loop = self.bot.loop_monitor.stats()
+        system = self.bot.system_stats.latest()
+        lines = [
+            '# HELP ultrabot_loop_lag_seconds Delay before a callback scheduled on the event loop runs',
+            '# TYPE ultrabot_loop_lag_seconds summary'
+        ]
+        for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+            lines.append(f'ultrabot_loop_lag_seconds{{{label},quantile="{quantile}"}} {loop[key] / 1000:.6f}')
+        lines.append(f'ultrabot_loop_lag_seconds_count{{{label}}} {loop["samples"]}')
+        gauges = [
+            ('loop_lag_max_seconds', 'Largest recorded event loop delay', loop['max_ms'] / 1000),
+            ('cpu_percent', 'Host CPU usage', system['cpu_percent']),
+            ('process_cpu_percent', 'Bot process CPU usage', system['process_cpu_percent']),
+            ('memory_rss_bytes', 'Bot process resident memory', system['memory_usage_mb'] * 1024 * 1024),
+            ('gateway_latency_seconds', 'Average heartbeat latency', (system['latency_ms'] or 0) / 1000),
+            ('guilds', 'Guilds served by this process', system['guilds']),
+            ('members', 'Members across those guilds', system['users'])
+        ]
+        for name, description, value in gauges:
+            lines += [f'# HELP ultrabot_{name} {description}', f'# TYPE ultrabot_{name} gauge',
+                      f'ultrabot_{name}{{{label}}} {value}']
+        counters = [
+            ('slow_callbacks_total', 'Event loop stalls longer than the slow callback threshold', loop['slow_total']),
+            ('commands_total', 'Commands executed', self.bot.performance_metrics['commands_executed'])
+        ]
+        for name, description, value in counters:
+            lines += [f'# HELP ultrabot_{name} {description}', f'# TYPE ultrabot_{name} counter',
+                      f'ultrabot_{name}{{{label}}} {value}']
+        return '\n'.join(lines) + '\n'
+
+    async def handle_metrics(self, request):
+        return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+def merge_overwrites(channel, updates):
+    """Return the channel's overwrites with ``updates`` applied, or None if nothing changes.
+
+    ``updates`` maps a role or member to ``{permission: True/False}``. Each
+    target's existing overwrite is updated in place of being replaced, so
+    permissions the update does not mention keep their current value.
+    """
+    overwrites = dict(channel.overwrites)
+    changed = False
+    for target, permissions in updates.items():
+        current = overwrites.get(target, discord.PermissionOverwrite())
+        desired = discord.PermissionOverwrite(**dict(current))
+        desired.update(**permissions)
+        if desired != current:
+            overwrites[target] = desired
+            changed = True
+    return overwrites if changed else None
+
+class BulkPermissionEngine:
+    """Apply permission overwrites to many channels with one edit per channel.
+
+    The final overwrite set of each channel is computed locally just
+    before its edit, channels already in that state are skipped, and the
+    rest are written with a single ``channel.edit(overwrites=...)`` call.
+    At most ``concurrency`` edits are in flight; discord.py's HTTP client queues each request on
+    its route bucket, so the cap only has to keep the bot clear of the
+    global rate limit.
+    """
+
+    def __init__(self, concurrency=4, progress_interval=2.0):
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+
+    async def apply(self, channels, updates_for, reason=None, progress=None):
+        """Bring every channel to the overwrites returned by ``updates_for(channel)``.
+
+        ``progress(stats)`` is awaited at most once per ``progress_interval``
+        seconds while edits run. Returns counts of updated, unchanged and
+        failed channels.
+        """
+        stats = {'total': len(channels), 'done': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        slots = asyncio.Semaphore(self.concurrency)
+        last_report = time.monotonic()
+
+        async def apply_one(channel):
+            nonlocal last_report
+            async with slots:
+                # Merged against the channel's current overwrites, not the ones it had when the run started
+                overwrites = merge_overwrites(channel, updates_for(channel))
+                if overwrites is None:
+                    stats['unchanged'] += 1
+                else:
+                    try:
+                        await channel.edit(overwrites=overwrites, reason=reason)
+                        stats['updated'] += 1
+                    except discord.HTTPException as e:
+                        logging.warning(f"Failed to update permissions in #{channel.name}: {e}")
+                        stats['failed'] += 1
+            stats['done'] += 1
+
+            if progress and time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                try:
+                    await progress(dict(stats))
+                except discord.HTTPException:
+                    pass
+
+        await asyncio.gather(*(apply_one(channel) for channel in channels))
+        return stats
@@ -0,0 +1,87 @@
+import asyncio
+from bisect import bisect_left, insort
+
+class GuildRankIndex:
+    """XP standings for one guild kept sorted in memory.
+
+    Entries are ``(-xp, user_id)`` tuples in a sorted list, so a rank is a
+    binary search and the leaderboard is a slice. Ties share a rank, matching
+    the old ``COUNT(*) + 1 ... WHERE xp > ?`` query.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._xp = {}
+
+    def __len__(self):
+        return len(self._xp)
+
+    def __contains__(self, user_id):
+        return user_id in self._xp
+
+    def get(self, user_id):
+        return self._xp.get(user_id)
+
+    def update(self, user_id, xp):
+        """Record a user's new XP total"""
+        old = self._xp.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, user_id))]
+        self._xp[user_id] = xp
+        insort(self._entries, (-xp, user_id))
+
+    def discard(self, user_id):
+        old = self._xp.pop(user_id, None)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, user_id))]
+
+    def rank(self, user_id):
+        """1-based position of a user, or None if they have no XP row"""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return None
+        # (-xp,) sorts before every (-xp, user_id) entry, so this counts strictly higher XP
+        return bisect_left(self._entries, (-xp,)) + 1
+
+    def top(self, limit=10):
+        """Highest ``limit`` users as ``(user_id, xp)`` pairs"""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._entries[:limit]]
+
+class RankIndex:
+    """Per-guild rank indexes, each loaded from the database on first use.
+
+    ``loader(guild_id)`` must return ``(user_id, xp)`` rows. Updates that
+    arrive while a guild is still loading win over the loaded rows, since
+    they were written after the load started.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._guilds = {}
+        self._loaded = set()
+        self._lock = asyncio.Lock()
+
+    async def guild(self, guild_id):
+        """Return the loaded index for a guild"""
+        if guild_id not in self._loaded:
+            async with self._lock:
+                if guild_id not in self._loaded:
+                    index = self._guilds.setdefault(guild_id, GuildRankIndex())
+                    for user_id, xp in await self.loader(guild_id):
+                        if user_id not in index:
+                            index.update(user_id, xp)
+                    self._loaded.add(guild_id)
+        return self._guilds[guild_id]
+
+    def update(self, guild_id, user_id, xp):
+        """Record a new XP total; guilds nobody has asked about yet are skipped"""
+        index = self._guilds.get(guild_id)
+        if index is not None:
+            index.update(user_id, xp)
+
+    def reset(self, guild_id):
+        """Empty a guild's index after its levels were deleted"""
+        self._guilds[guild_id] = GuildRankIndex()
+        self._loaded.add(guild_id)
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from utils.batching import WriteBehindBuffer
+
+class _CreatorCancelled(Exception):
+    """Set on an in-flight entry whose creating task was cancelled, so its waiters retry"""
+
+class ResponseCache:
+    """Completion results keyed on what determines them, for commands that opt in.
+
+    The key is (model, system prompt, normalized conversation, temperature
+    rounded to 0.1, remaining request options); whitespace and case
+    differences in user turns map to the same entry. Entries expire after
+    the TTL the caller asked for and the least recently used are evicted
+    beyond ``max_entries``. Identical requests that arrive while one is in
+    flight wait for it instead of calling the API again. With a storage
+    repository attached, entries are also persisted to SQLite so they
+    survive a restart.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.storage = None
+        self._write_buffer = None
+        self.metrics = {'hits': 0, 'misses': 0}
+
+    def persist_to(self, storage):
+        """Read through to and write behind into a cache repository"""
+        self.storage = storage
+        self._write_buffer = WriteBehindBuffer(storage.save_many)
+
+    @staticmethod
+    def make_key(model, messages, temperature=None, **options):
+        system = [message['content'].strip() for message in messages if message['role'] == 'system']
+        turns = [
+            (message['role'], ' '.join(message['content'].split()).lower())
+            for message in messages if message['role'] != 'system'
+        ]
+        bucket = round(temperature, 1) if temperature is not None else None
+        payload = json.dumps([model, system, turns, bucket, sorted(options.items())], default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def get_or_create(self, key, ttl, create):
+        """Cached response for ``key``, or the result of awaiting ``create()``"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry and entry[1] > now:
+            self._entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            return entry[0]
+
+        if key in self._inflight:
+            try:
+                return await asyncio.shield(self._inflight[key])
+            except _CreatorCancelled:
+                # Only the creating task was cancelled; the next waiter to get here creates it
+                return await self.get_or_create(key, ttl, create)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._load(key, now)
+            if response is not None:
+                self.metrics['hits'] += 1
+            else:
+                self.metrics['misses'] += 1
+                response = await create()
+                if response:
+                    self._store(key, response, now + ttl)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.set_exception(_CreatorCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an unawaited failure is not logged as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key, now):
+        if not self.storage:
+            return None
+        try:
+            row = await self.storage.load(key, now)
+        except Exception as e:
+            logging.warning(f"Response cache lookup failed: {e}")
+            return None
+        if row:
+            response, expires_at = row
+            self._remember(key, response, expires_at)
+            return response
+        return None
+
+    def _remember(self, key, response, expires_at):
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, key, response, expires_at):
+        self._remember(key, response, expires_at)
+        if self._write_buffer is not None:
+            self._write_buffer.add((key, response, expires_at))
+
+    async def close(self):
+        """Write pending entries and drop expired ones from storage"""
+        if self._write_buffer is not None:
+            await self._write_buffer.close()
+            await self.storage.purge(time.time())
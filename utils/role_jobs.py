@@ -0,0 +1,157 @@
+import asyncio
+import logging
+
+import discord
+
+from utils.capabilities import Capabilities
+
+class RoleJobQueue:
+    """Mass role edits run as background jobs that survive a restart.
+
+    A job adds or removes one role for every human member that still needs
+    the change, worked through in user id order from the member cache.
+    After each ``checkpoint_every`` members the highest handled user id is
+    saved, so a job interrupted by a restart resumes where it stopped.
+    Jobs in the same guild run one after another since they share the
+    guild's member role rate limit bucket.
+    """
+
+    # Guilds are chunked when a job is submitted or resumed, not at startup
+    capabilities = Capabilities(intents=('members',), member_cache=('joined',))
+
+    def __init__(self, bot, repository, concurrency=3, checkpoint_every=50):
+        self.bot = bot
+        self.repository = repository
+        self.concurrency = concurrency
+        self.checkpoint_every = checkpoint_every
+        self.progress = {}
+        self._guild_locks = {}
+        self._tasks = {}
+        self._resume_task = None
+
+    @staticmethod
+    def pending_members(guild, role, action, cursor=0):
+        """Members after ``cursor`` whose roles differ from the job's goal, by user id"""
+        wanted = action == "add"
+        return sorted(
+            (member for member in guild.members
+             if not member.bot and member.id > cursor and (role in member.roles) != wanted),
+            key=lambda member: member.id
+        )
+
+    async def submit(self, guild, role, action, requested_by, channel_id):
+        """Queue a job and return ``(job_id, members to change)``"""
+        # The total is counted from the member cache, so it has to be complete
+        if not guild.chunked:
+            await guild.chunk()
+        total = len(self.pending_members(guild, role, action))
+        job_id = await self.repository.create(guild.id, role.id, action, requested_by, channel_id, total)
+        self._start(job_id)
+        return job_id, total
+
+    def start(self):
+        """Resume unfinished jobs once the member cache is ready"""
+        self._resume_task = asyncio.create_task(self._resume())
+
+    async def _resume(self):
+        await self.bot.wait_until_ready()
+        for job in await self.repository.active():
+            if not self.bot.cluster.owns_guild(job['guild_id']):
+                # Resumed by the cluster that runs the guild's shard
+                continue
+            logging.info(f"Resuming role job #{job['id']} in guild {job['guild_id']}")
+            self._start(job['id'])
+
+    def _start(self, job_id):
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id):
+        job = await self.repository.get(job_id)
+        guild = self.bot.get_guild(job['guild_id'])
+        role = guild.get_role(job['role_id']) if guild else None
+        if role is None or role >= guild.me.top_role:
+            logging.warning(f"Role job #{job_id} can no longer run; marking it failed")
+            await self.repository.set_status(job_id, 'failed')
+            return
+
+        lock = self._guild_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            try:
+                await self._execute(job, guild, role)
+            except asyncio.CancelledError:
+                # Left as running so the next start resumes from the last checkpoint
+                raise
+            except Exception as e:
+                logging.error(f"Role job #{job_id} failed: {e}")
+                await self.repository.set_status(job_id, 'failed')
+            finally:
+                self.progress.pop(job_id, None)
+
+    async def _execute(self, job, guild, role):
+        job_id = job['id']
+        if not guild.chunked:
+            await guild.chunk()
+
+        members = self.pending_members(guild, role, job['action'], job['cursor'])
+        stats = self.progress[job_id] = {
+            # Edits made after the last checkpoint of an interrupted run drop out of the diff, count them here
+            'succeeded': max(job['succeeded'], job['total'] - job['failed'] - len(members)),
+            'failed': job['failed'],
+            'remaining': len(members)
+        }
+        await self.repository.set_status(job_id, 'running')
+
+        slots = asyncio.Semaphore(self.concurrency)
+        reason = f"Mass role {'assignment' if job['action'] == 'add' else 'removal'} (job #{job_id})"
+        cursor = job['cursor']
+        for start in range(0, len(members), self.checkpoint_every):
+            batch = members[start:start + self.checkpoint_every]
+            results = await asyncio.gather(*(
+                self._apply(member, role, job['action'], reason, slots) for member in batch
+            ))
+            stats['succeeded'] += sum(results)
+            stats['failed'] += len(results) - sum(results)
+            stats['remaining'] -= len(batch)
+            cursor = batch[-1].id
+            await self.repository.checkpoint(job_id, cursor, stats['succeeded'], stats['failed'])
+
+        await self.repository.checkpoint(job_id, cursor, stats['succeeded'], stats['failed'], status='done')
+        await self._announce(job, guild, role, stats)
+
+    async def _apply(self, member, role, action, reason, slots):
+        async with slots:
+            try:
+                if action == "add":
+                    await member.add_roles(role, reason=reason)
+                else:
+                    await member.remove_roles(role, reason=reason)
+                return True
+            except discord.HTTPException:
+                return False
+
+    async def _announce(self, job, guild, role, stats):
+        channel = guild.get_channel(job['channel_id']) if job['channel_id'] else None
+        if not channel:
+            return
+        embed = discord.Embed(
+            title=f"✅ Role Job #{job['id']} Complete",
+            description=f"{'Added' if job['action'] == 'add' else 'Removed'} {role.mention}",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Successful", value=stats['succeeded'], inline=True)
+        embed.add_field(name="Errors", value=stats['failed'], inline=True)
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logging.warning(f"Could not announce role job #{job['id']}: {e}")
+
+    async def close(self):
+        """Stop running jobs; their last checkpoint is resumed on the next start"""
+        tasks = list(self._tasks.values())
+        if self._resume_task:
+            tasks.append(self._resume_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
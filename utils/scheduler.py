@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+
+import discord
+
+REMINDER = 'reminder'
+MESSAGE = 'message'
+
+class DeliveryScheduler:
+    """Delivers reminders and scheduled messages at their due time.
+
+    Only the earliest ``load_limit`` pending items of each kind are read,
+    from the indexed due-time columns, into a min-heap of
+    ``(due, kind, id)``; the loop sleeps until the head of the heap is due
+    or an earlier item is added, so an idle bot never touches the
+    database. Items falling in the same second are delivered together and
+    completed in one write. The next window is read once the loaded one is
+    used up, and since delivered rows leave the pending set, the same
+    query picks up where the last one stopped, including after a restart.
+    """
+
+    def __init__(self, bot, repository, load_limit=500, max_batch=50):
+        self.bot = bot
+        self.repository = repository
+        self.load_limit = load_limit
+        self.max_batch = max_batch
+        self._heap = []
+        # Due time up to which the heap holds every pending item; later ones stay in SQLite
+        self._horizon = 0.0
+        self._wake = asyncio.Event()
+        self._task = None
+        self.metrics = {'delivered': 0, 'failed': 0, 'loads': 0}
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def schedule_reminder(self, user_id, guild_id, channel_id, text, remind_at):
+        """Store a reminder due at epoch ``remind_at`` and return its id"""
+        reminder_id = await self.repository.add_reminder(user_id, guild_id, channel_id, text, remind_at)
+        self._push(remind_at, REMINDER, reminder_id)
+        return reminder_id
+
+    async def schedule_message(self, guild_id, channel_id, message, send_at, created_by):
+        """Store a channel message due at epoch ``send_at`` and return its id"""
+        message_id = await self.repository.add_scheduled_message(guild_id, channel_id, message, send_at, created_by)
+        self._push(send_at, MESSAGE, message_id)
+        return message_id
+
+    def _push(self, due, kind, item_id):
+        # Items past the horizon are read with the window they fall in
+        if due <= self._horizon:
+            heapq.heappush(self._heap, (due, kind, item_id))
+            self._wake.set()
+
+    async def _load(self):
+        # A clustered process only delivers items of guilds on its own shards
+        cluster = self.bot.cluster
+        shards = (cluster.shard_count, cluster.shard_ids) if cluster.partial else (None, None)
+        windows = {
+            REMINDER: await self.repository.next_reminders(self.load_limit, *shards),
+            MESSAGE: await self.repository.next_scheduled_messages(self.load_limit, *shards)
+        }
+        self.metrics['loads'] += 1
+        # A full window may have more rows behind it, so only trust items up to its last due time
+        horizon = min(
+            (rows[-1][0] for rows in windows.values() if len(rows) >= self.load_limit),
+            default=math.inf
+        )
+        loaded = {
+            (due, kind, item_id)
+            for kind, rows in windows.items()
+            for due, item_id in rows if due <= horizon
+        }
+        # Keep items pushed while the queries ran; they may have been committed after them
+        loaded.update(entry for entry in self._heap if entry[0] <= horizon)
+        self._heap = list(loaded)
+        heapq.heapify(self._heap)
+        self._horizon = horizon
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                if not self._heap:
+                    await self._load()
+                if not self._heap:
+                    # Everything pending is delivered; wait for something new
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+
+                await self._deliver(self._pop_due())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scheduler loop error: {e}")
+                await asyncio.sleep(5)
+
+    def _pop_due(self):
+        # Everything already due plus whatever else falls in the head item's second
+        cutoff = max(time.time(), math.floor(self._heap[0][0]) + 1)
+        batch = []
+        while self._heap and self._heap[0][0] < cutoff and len(batch) < self.max_batch:
+            batch.append(heapq.heappop(self._heap))
+        return batch
+
+    async def _deliver(self, batch):
+        reminder_ids = [item_id for _, kind, item_id in batch if kind == REMINDER]
+        message_ids = [item_id for _, kind, item_id in batch if kind == MESSAGE]
+        rows = []
+        if reminder_ids:
+            rows += [(REMINDER, row) for row in await self.repository.reminders(reminder_ids)]
+        if message_ids:
+            rows += [(MESSAGE, row) for row in await self.repository.scheduled_messages(message_ids)]
+
+        results = await asyncio.gather(*(self._send(kind, row) for kind, row in rows))
+        self.metrics['delivered'] += sum(results)
+        self.metrics['failed'] += len(results) - sum(results)
+        # Failed sends are completed too; a deleted channel would otherwise be retried forever
+        await self.repository.complete(reminder_ids, message_ids)
+
+    async def _send(self, kind, row):
+        try:
+            if kind == REMINDER:
+                return await self._send_reminder(row)
+            channel = self.bot.get_channel(row['channel_id'])
+            if channel is None:
+                logging.warning(f"Scheduled message #{row['id']} dropped: channel {row['channel_id']} is gone")
+                return False
+            await channel.send(row['message'])
+            return True
+        except discord.HTTPException as e:
+            logging.warning(f"Could not deliver {kind} #{row['id']}: {e}")
+            return False
+        except Exception as e:
+            # A channel that cannot take messages, for example; one bad row must not keep the batch from completing
+            logging.error(f"Could not deliver {kind} #{row['id']}: {e!r}")
+            return False
+
+    async def _send_reminder(self, row):
+        embed = discord.Embed(
+            title="⏰ Reminder",
+            description=row['reminder_text'],
+            color=discord.Color.blue()
+        )
+        channel = self.bot.get_channel(row['channel_id'])
+        if channel is not None:
+            await channel.send(f"<@{row['user_id']}>", embed=embed)
+            return True
+        # Channel deleted since the reminder was set; fall back to a DM
+        user = self.bot.get_user(row['user_id']) or await self.bot.fetch_user(row['user_id'])
+        await user.send(embed=embed)
+        return True
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
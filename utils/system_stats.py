@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+import psutil
+
+class SystemStatsSampler:
+    """Process and bot statistics sampled in the background.
+
+    Every ``interval`` seconds one sample is appended to a ring buffer of
+    ``history`` entries, so reading the current stats never blocks and the
+    buffer doubles as a short trend. CPU percentages are measured between
+    samples with non-blocking psutil calls, and loop lag is how late the
+    sampler's own sleep woke up.
+    """
+
+    def __init__(self, bot, interval=5.0, history=720):
+        self.bot = bot
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self._process = psutil.Process()
+        self._task = None
+
+    def start(self):
+        # Prime the counters; cpu_percent(None) reports usage since the previous call
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        self._task = asyncio.create_task(self._run())
+
+    def sample(self, loop_lag=0.0):
+        latency = self.bot.latency
+        guilds = self.bot.guilds
+        return {
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'process_cpu_percent': self._process.cpu_percent(interval=None),
+            'memory_percent': psutil.virtual_memory().percent,
+            'memory_usage_mb': self._process.memory_info().rss / 1024 / 1024,
+            'loop_lag_ms': loop_lag * 1000,
+            # NaN until the first heartbeat is acknowledged
+            'latency_ms': None if math.isnan(latency) or math.isinf(latency) else latency * 1000,
+            'guilds': len(guilds),
+            'users': sum(guild.member_count or 0 for guild in guilds)
+        }
+
+    def latest(self):
+        """The most recent sample, taken now if none has been recorded yet"""
+        return self.samples[-1] if self.samples else self.sample()
+
+    def history(self, seconds=None):
+        """Samples from the last ``seconds`` seconds, oldest first"""
+        if seconds is None:
+            return list(self.samples)
+        since = time.time() - seconds
+        return [sample for sample in self.samples if sample['timestamp'] >= since]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            try:
+                self.samples.append(self.sample(lag))
+            except Exception as e:
+                logging.warning(f"System stats sample failed: {e}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+SPARK_LEVELS = '▁▂▃▄▅▆▇█'
+
+def sparkline(values, width=30):
+    """One-line trend of ``values``, averaged down to at most ``width`` characters"""
+    values = [value for value in values if value is not None]
+    if not values:
+        return ''
+    step = max(1, math.ceil(len(values) / width))
+    points = [sum(values[i:i + step]) / len(values[i:i + step]) for i in range(0, len(values), step)]
+    low, high = min(points), max(points)
+    span = (high - low) or 1
+    return ''.join(SPARK_LEVELS[int((point - low) / span * (len(SPARK_LEVELS) - 1))] for point in points)